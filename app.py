@@ -2,10 +2,11 @@ import streamlit as st
 import pandas as pd
 import matplotlib.pyplot as plt
 
-from hypotheses.ten_am_reversal import load_5m
 from hypotheses.am_macro_range import run_am_macro_range
 from hypotheses.close_vs_wick import run_close_vs_wick_test
 from hypotheses.stairstep_acceptance import run_stairstep
+from hypotheses.snapshot import PARAMS, TRADES_PATH, equity_curves, load_snapshot, load_trades, strategy_tables
+from src.loader import content_hash, load_5m_indexed
 
 
 # -------------------------------------------------
@@ -49,31 +50,90 @@ def held_pct(held_count: float, samples: float) -> float:
         return 0.0
     return (float(held_count) / float(samples)) * 100.0
 
-from pathlib import Path
+def metric_rows(table: pd.DataFrame) -> pd.DataFrame:
+    """strategy_backtest.summary_table -> the display columns of the strategy tabs."""
+    return pd.DataFrame(
+        {
+            "Target": [f"{rt:.1f}R" for rt in table.index],
+            "Trades": table["trades"].to_numpy(),
+            "Win Rate": [fmt_pct(x) for x in table["win_rate"]],
+            "Profit Factor": [f"{x:.2f}" for x in table["profit_factor"]],
+            "Expectancy": [f"{x:+.3f}R" for x in table["expectancy"]],
+        }
+    )
+
+# -------------------------------------------------
+# Cached data + results
+# Keyed by a content hash of the processed bars, so every rerun and every
+# viewer shares one load / one computation until the data changes.
+# -------------------------------------------------
+@st.cache_resource(show_spinner="Loading 5m bars...")
+def get_bars(data_hash: str):
+    return load_5m_indexed()
+
+
+@st.cache_data(show_spinner=False)
+def get_am_macro_range(data_hash: str):
+    df, days = get_bars(data_hash)
+    return run_am_macro_range(df, days=days)
+
+
+@st.cache_data(show_spinner=False)
+def get_close_vs_wick(data_hash: str):
+    df, days = get_bars(data_hash)
+    return run_close_vs_wick_test(df, days=days)
+
+
+@st.cache_data(show_spinner=False)
+def get_stairstep(data_hash: str, steps: int):
+    df, days = get_bars(data_hash)
+    return run_stairstep(df, steps=steps, days=days)
+
+
+@st.cache_data(show_spinner=False)
+def get_strategy_tables(data_hash: str):
+    df, days = get_bars(data_hash)
+    return strategy_tables(df, days=days)
+
+
+@st.cache_data
+def load_final_trades(trades_hash: str):
+    return load_trades(TRADES_PATH)
+
 
-ROOT = Path(__file__).resolve().parent
+# -------------------------------------------------
+# Prebuilt snapshot (python -m hypotheses.snapshot)
+# Used as-is when it was built from the current data; otherwise every
+# result falls back to the cached computations above.
+# -------------------------------------------------
+@st.cache_resource(show_spinner=False)
+def get_snapshot(data_hash: str, trades_hash: str):
+    return load_snapshot(data_hash, trades_hash)
+
+
+data_hash = content_hash()
+trades_hash = content_hash(TRADES_PATH) if TRADES_PATH.exists() else None
+snapshot = get_snapshot(data_hash, trades_hash)
 
-# @st.cache_data
-def load_final_trades():
-    path = ROOT / "data" / "processed" / "final_strategy_trades.csv"
-    if not path.exists():
-        raise FileNotFoundError(f"Missing file: {path}")
-    return pd.read_csv(path)
 
+def tab_result(name: str, compute, *args):
+    if snapshot is not None:
+        return snapshot["results"][name]
+    return compute(data_hash, *args)
 
-df_trades = load_final_trades()
-r = df_trades["result_r"].reset_index(drop=True)
+
+if snapshot is not None:
+    df_trades = snapshot["trades"]
+    curves = snapshot["equity"]
+else:
+    df_trades = load_final_trades(trades_hash)
+    curves = equity_curves(df_trades["result_r"], PARAMS["rolling_window"])
 
 with center:
     st.title("Market Hypothesis Research")
     st.caption("Structured hypothesis testing on intraday NQ price action (5-minute bars).")
     st.divider()
 
-    # -------------------------------------------------
-    # Load data once
-    # -------------------------------------------------
-    df = load_5m()
-
     # -------------------------------------------------
     # Tabs (INTRO first)
     # -------------------------------------------------
@@ -161,7 +221,7 @@ Even if you don’t trade, you can read this as **time-series event analysis**.
     # TAB 1 — 10AM REVERSAL
     # =================================================
     with tabs[1]:
-        results = run_am_macro_range(df)
+        results = tab_result("am_macro_range", get_am_macro_range)
         meta = results["meta"]
 
         st.header("10AM Reversal Hypothesis")
@@ -243,7 +303,7 @@ the opposing side is unlikely to be revisited before late morning.
             "Are **close-confirmed breakouts** more reliable than **wick-only breaches**?"
         )
 
-        results = run_close_vs_wick_test(df)
+        results = tab_result("close_vs_wick", get_close_vs_wick)
 
         wick = results["wick"]
         close = results["close"]
@@ -299,8 +359,8 @@ Once a step fails, the sequence is invalidated (it does not “restart”).
 """
         )
 
-        steps = 4
-        ss = run_stairstep(df, steps=steps)
+        steps = PARAMS["stairstep_steps"]
+        ss = tab_result("stairstep", get_stairstep, steps)
 
         def build_rows(side):
             base = ss[side]["base"]
@@ -425,13 +485,8 @@ This is a **rules-based interpretation** of the research (not a full backtest):
     """
         )
 
-        baseline_df = pd.DataFrame(
-            [
-                {"Target": "1.0R", "Trades": 176, "Win Rate": "48.86%", "Profit Factor": "0.97", "Expectancy": "-0.016R"},
-                {"Target": "1.5R", "Trades": 176, "Win Rate": "39.77%", "Profit Factor": "0.94", "Expectancy": "-0.034R"},
-                {"Target": "2.0R", "Trades": 176, "Win Rate": "32.95%", "Profit Factor": "0.80", "Expectancy": "-0.123R"},
-            ]
-        )
+        strategy = tab_result("strategy", get_strategy_tables)
+        baseline_df = metric_rows(strategy["baseline"])
 
         st.dataframe(baseline_df, hide_index=True, use_container_width=True)
 
@@ -477,31 +532,7 @@ This is a **rules-based interpretation** of the research (not a full backtest):
 
             st.divider()
 
-            final_df = pd.DataFrame(
-                [
-                    {
-                        "Target": "1.0R",
-                        "Trades": 238,
-                        "Win Rate": "62.03%",
-                        "Profit Factor": "1.63",
-                        "Expectancy": "+0.239R",
-                    },
-                    {
-                        "Target": "1.5R",
-                        "Trades": 238,
-                        "Win Rate": "47.86%",
-                        "Profit Factor": "1.38",
-                        "Expectancy": "+0.193R",
-                    },
-                    {
-                        "Target": "2.0R",
-                        "Trades": 238,
-                        "Win Rate": "39.57%",
-                        "Profit Factor": "1.31",
-                        "Expectancy": "+0.181R",
-                    },
-                ]
-            )
+            final_df = metric_rows(strategy["final"])
 
             st.dataframe(final_df, hide_index=True, use_container_width=True)
 
@@ -533,7 +564,7 @@ This is a **rules-based interpretation** of the research (not a full backtest):
                     "Shows whether the edge survives trade sequencing."
                 )
 
-                cum_r = r.cumsum()
+                cum_r = curves["cum_r"]
 
                 fig, ax = plt.subplots()
                 ax.plot(cum_r, linewidth=2)
@@ -554,8 +585,7 @@ This is a **rules-based interpretation** of the research (not a full backtest):
                     "Represents the worst pain experienced while trading the strategy."
                 )
 
-                running_max = cum_r.cummax()
-                drawdown = cum_r - running_max
+                drawdown = curves["drawdown"]
 
                 fig, ax = plt.subplots()
                 ax.plot(drawdown, linewidth=2)
@@ -576,7 +606,7 @@ This is a **rules-based interpretation** of the research (not a full backtest):
                     "Helps identify whether the edge is stable or regime-dependent."
                 )
 
-                rolling_exp = r.rolling(20).mean()
+                rolling_exp = curves["rolling_exp"]
 
                 fig, ax = plt.subplots()
                 ax.plot(rolling_exp, linewidth=2)
@@ -1,7 +1,15 @@
+import sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
-DATA = Path("data/processed/nq_5m_clean.csv")
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.loader import load_5m
+from src.tensor import CLOSE, HIGH, LOW, build_day_tensor, first_slot, from_slot, slot, window_max, window_min
+
 NY_TZ = "America/New_York"
 
 # -----------------------------------
@@ -10,21 +18,8 @@ NY_TZ = "America/New_York"
 RANGE_MINUTES = 15   # set to 15 or 60
 
 
-def main():
-    # -----------------------------
-    # Load data with explicit TZ handling
-    # -----------------------------
-    df = pd.read_csv(DATA)
-
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
-    df["timestamp"] = df["timestamp"].dt.tz_convert(NY_TZ)
-    df = df.set_index("timestamp").sort_index()
-
-    df["date"] = df.index.date
-
-    # -----------------------------
-    # Define opening range timestamps
-    # -----------------------------
+def opening_range_slots():
+    """Slot span [start, stop) of the opening range bars."""
     if RANGE_MINUTES == 15:
         range_times = ["09:30", "09:35", "09:40"]
     elif RANGE_MINUTES == 60:
@@ -37,60 +32,64 @@ def main():
     else:
         raise ValueError("RANGE_MINUTES must be 15 or 60")
 
-    results = []
-
-    for d, day in df.groupby("date"):
-        # -----------------------------
-        # Opening range
-        # -----------------------------
-        opening = day[day.index.strftime("%H:%M").isin(range_times)]
-
-        if len(opening) != len(range_times):
-            continue
-
-        R_high = opening["high"].max()
-        R_low = opening["low"].min()
-
-        # -----------------------------
-        # First break AFTER range
-        # -----------------------------
-        post = day[day.index > opening.index[-1]]
-
-        break_time = None
-        direction = None
-
-        for ts, row in post.iterrows():
-            if row["close"] < R_low:
-                break_time = ts
-                direction = "bear"
-                break
-            elif row["close"] > R_high:
-                break_time = ts
-                direction = "bull"
-                break
-
-        if break_time is None:
-            continue
-
-        # -----------------------------
-        # From break → session close
-        # -----------------------------
-        rest = day.loc[break_time:]
-
-        if direction == "bear":
-            opposite_revisited = rest["high"].max() >= R_high
-        else:
-            opposite_revisited = rest["low"].min() <= R_low
-
-        results.append(
-            {
-                "date": d,
-                "direction": direction,
-                "opposite_not_revisited": not opposite_revisited,
-            }
-        )
-
-    res = pd.DataFrame(results)
+    return slot(range_times[0]), slot(range_times[-1]) + 1
+
+
+def run_or_hod_lod(df, days=None) -> pd.DataFrame:
+    """
+    One row per day with a close outside the opening range:
+    date, direction (bull/bear), opposite_not_revisited (through session close).
+    """
+    t = build_day_tensor(df, days=days)
+    s0, s1 = opening_range_slots()
+
+    # -----------------------------
+    # Opening range (every bar must be present)
+    # -----------------------------
+    complete = t["valid"][:, s0:s1].all(axis=1)
+
+    R_high = window_max(t, HIGH, s0, s1)[:, None]
+    R_low = window_min(t, LOW, s0, s1)[:, None]
+
+    # -----------------------------
+    # First break AFTER range
+    # -----------------------------
+    post = t["valid"][:, s1:] & complete[:, None]
+    ohlc = t["ohlc"][:, s1:]
+
+    bear = post & (ohlc[..., CLOSE] < R_low)
+    bull = post & (ohlc[..., CLOSE] > R_high)
+
+    first = first_slot(bear | bull)
+    has_break = first >= 0
+    is_bear = bear[np.arange(len(first)), np.maximum(first, 0)]
+
+    # -----------------------------
+    # From break → session close
+    # -----------------------------
+    rest = from_slot(first, post.shape[1]) & post
+    opposite_revisited = np.where(
+        is_bear,
+        (rest & (ohlc[..., HIGH] >= R_high)).any(axis=1),
+        (rest & (ohlc[..., LOW] <= R_low)).any(axis=1),
+    )
+
+    return pd.DataFrame(
+        {
+            "date": t["dates"][has_break],
+            "direction": np.where(is_bear, "bear", "bull")[has_break],
+            "opposite_not_revisited": ~opposite_revisited[has_break],
+        }
+    )
+
+
+def main():
+    # -----------------------------
+    # Load data (NY time)
+    # -----------------------------
+    df = load_5m()
+
+    res = run_or_hod_lod(df)
 
     if res.empty:
         print("No valid samples found.")
@@ -1,7 +1,12 @@
+import sys
 from pathlib import Path
-import pandas as pd
 
-DATA = Path("data/processed/nq_5m_clean.csv")
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.loader import load_5m
+
 NY_TZ = "America/New_York"
 
 TIMEFRAMES = {
@@ -115,11 +120,7 @@ def run_test(df, label):
 
 
 def main():
-    df = pd.read_csv(DATA)
-
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
-    df["timestamp"] = df["timestamp"].dt.tz_convert(NY_TZ)
-    df = df.set_index("timestamp").sort_index()
+    df = load_5m()
 
     for label, rule in TIMEFRAMES.items():
         ohlc = (
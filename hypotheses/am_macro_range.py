@@ -1,4 +1,15 @@
-import pandas as pd
+import sys
+from pathlib import Path
+
+import numpy as np
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.breakout import find_breakouts
+from src.day_index import any_per_day, build_day_index, hhmm_to_minute
+from src.ticks import price_array
 
 NY_TZ = "America/New_York"
 
@@ -12,7 +23,7 @@ CUTOFF_1 = "11:00"
 CUTOFF_2 = "12:00"
 
 
-def run_am_macro_range(df):
+def run_am_macro_range(df, days=None):
     """
     Hypothesis:
     The 9:50–10:10 window forms a macro range.
@@ -20,98 +31,88 @@ def run_am_macro_range(df):
     the opposite side is unlikely to be revisited
     until 11:00 or 12:00.
     """
-
-    df = df.copy()
-    df["date"] = df.index.date
-
-    stats = {
-        "break_high_first": {"samples": 0, "held_11": 0, "held_12": 0},
-        "break_low_first":  {"samples": 0, "held_11": 0, "held_12": 0},
+    return am_macro_range_rates(am_macro_range_counts(df, days=days))
+
+
+def am_macro_range_counts(df, days=None):
+    """Raw per-side counts; additive across day blocks (see src.blocks)."""
+    if days is None:
+        days = build_day_index(df.index)
+
+    # -----------------------------
+    # Macro range (9:50–10:10) + first wick break after it, all days at once
+    # -----------------------------
+    bo = find_breakouts(
+        df,
+        range_start=RANGE_START,
+        range_end=RANGE_END,
+        search_end=None,
+        range_inclusive="left",
+        days=days,
+    )
+
+    has_range = bo["range_start"].to_numpy() >= 0
+    has_break = bo["wick_pos"].to_numpy() >= 0
+    ambiguous_day = bo["wick_ambiguous"].to_numpy()
+    valid = has_break & ~ambiguous_day
+
+    no_range = int((~has_range).sum())
+    no_break = int((has_range & ~has_break).sum())
+    ambiguous = int(ambiguous_day.sum())
+
+    # -----------------------------
+    # Evaluate opposite-side revisit
+    # -----------------------------
+    codes = days["code"]
+    minute = days["minute"]
+    n_days = len(bo)
+
+    first_pos = np.where(valid, bo["wick_pos"].to_numpy(), -1)[codes]
+    direction = bo["wick_dir"].to_numpy()[codes]
+    since_break = (first_pos >= 0) & (np.arange(len(df)) >= first_pos)
+
+    # Opposite side: range LOW after a high break, range HIGH after a low break
+    revisit = np.where(
+        direction > 0,
+        price_array(df, "low") <= bo["range_low"].to_numpy()[codes],
+        price_array(df, "high") >= bo["range_high"].to_numpy()[codes],
+    )
+    revisit &= since_break & (minute >= hhmm_to_minute(RANGE_END))
+
+    revisit_11 = any_per_day(revisit & (minute < hhmm_to_minute(CUTOFF_1)), codes, n_days)
+    revisit_12 = any_per_day(revisit & (minute < hhmm_to_minute(CUTOFF_2)), codes, n_days)
+
+    day_dir = bo["wick_dir"].to_numpy()
+    out = {
+        "meta": {
+            "range_window": f"{RANGE_START}–{RANGE_END}",
+            "evaluation_cutoffs": ["11:00", "12:00"],
+        },
     }
+    for side, sign in [("break_high_first", 1), ("break_low_first", -1)]:
+        m = valid & (day_dir == sign)
+        out[side] = {
+            "samples": int(m.sum()),
+            "held_11": int((m & ~revisit_11).sum()),
+            "held_12": int((m & ~revisit_12).sum()),
+        }
+
+    out["debug"] = {
+        "no_range": no_range,
+        "no_break": no_break,
+        "ambiguous": ambiguous,
+    }
+    return out
+
 
-    no_range = 0
-    no_break = 0
-    ambiguous = 0
-
-    for d, day in df.groupby("date"):
-        day = day.sort_index()
-
-        # -----------------------------
-        # Define macro range (9:50–10:10)
-        # -----------------------------
-        macro = day.between_time(RANGE_START, RANGE_END, inclusive="left")
-
-        if macro.empty:
-            no_range += 1
-            continue
-
-        range_high = float(macro["high"].max())
-        range_low  = float(macro["low"].min())
-
-        # -----------------------------
-        # Look for first break AFTER 10:10
-        # -----------------------------
-        post = day[day.index > macro.index[-1]]
-
-        first_side = None
-        first_ts = None
-
-        for ts, row in post.iterrows():
-            hit_high = row["high"] > range_high
-            hit_low  = row["low"] < range_low
-
-            if hit_high and hit_low:
-                ambiguous += 1
-                first_side = "ambiguous"
-                break
-
-            if hit_high:
-                first_side = "break_high_first"
-                first_ts = ts
-                break
-
-            if hit_low:
-                first_side = "break_low_first"
-                first_ts = ts
-                break
-
-        if first_side is None:
-            no_break += 1
-            continue
-
-        if first_side == "ambiguous":
-            continue
-
-        stats[first_side]["samples"] += 1
-
-        # -----------------------------
-        # Evaluate opposite-side revisit
-        # -----------------------------
-        rem_11 = day.loc[first_ts:].between_time(RANGE_END, CUTOFF_1, inclusive="left")
-        rem_12 = day.loc[first_ts:].between_time(RANGE_END, CUTOFF_2, inclusive="left")
-
-        if first_side == "break_high_first":
-            # Opposite side = range LOW
-            if not (rem_11["low"] <= range_low).any():
-                stats["break_high_first"]["held_11"] += 1
-            if not (rem_12["low"] <= range_low).any():
-                stats["break_high_first"]["held_12"] += 1
-
-        if first_side == "break_low_first":
-            # Opposite side = range HIGH
-            if not (rem_11["high"] >= range_high).any():
-                stats["break_low_first"]["held_11"] += 1
-            if not (rem_12["high"] >= range_high).any():
-                stats["break_low_first"]["held_12"] += 1
+def am_macro_range_rates(stats):
+    """Counts -> the reported held rates."""
 
     def pct(x, n):
         return round(x / n, 4) if n > 0 else float("nan")
 
     return {
-        "meta": {
-            "range_window": f"{RANGE_START}–{RANGE_END}",
-            "evaluation_cutoffs": ["11:00", "12:00"],
-        },
+        "meta": stats["meta"],
         "break_high_first": {
             "samples": stats["break_high_first"]["samples"],
             "held_11": pct(
@@ -134,22 +135,11 @@ def run_am_macro_range(df):
                 stats["break_low_first"]["samples"],
             ),
         },
-        "debug": {
-            "no_range": no_range,
-            "no_break": no_break,
-            "ambiguous": ambiguous,
-        },
+        "debug": stats["debug"],
     }
 
 if __name__ == "__main__":
     # Temporary terminal output for inspection
-    import sys
-    from pathlib import Path
-
-    # Add project root to Python path
-    ROOT = Path(__file__).resolve().parents[1]
-    sys.path.append(str(ROOT))
-
     from hypotheses.ten_am_reversal import load_5m
 
     df = load_5m()
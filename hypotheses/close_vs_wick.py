@@ -1,114 +1,59 @@
-import pandas as pd
+import sys
+import numpy as np
 from pathlib import Path
-from datetime import time
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
 
-# =========================
-# Data Loader (FIXED FOR TZ)
-# =========================
-def load_data():
-    root = Path(__file__).resolve().parent.parent
-    matches = list(root.rglob("nq_5m_clean.csv"))
-
-    if not matches:
-        raise FileNotFoundError("Could not find nq_5m_clean.csv in project.")
-
-    path = matches[0]
-    print(f"Loaded: {path}")
-
-    df = pd.read_csv(path)
-
-    # FORCE UTC → then convert to NY
-    df["timestamp"] = pd.to_datetime(
-        df["timestamp"],
-        utc=True,
-        errors="coerce"
-    )
-
-    df = df.dropna(subset=["timestamp"])
-    df = df.set_index("timestamp").sort_index()
-
-    # Convert to NY time (critical for session logic)
-    df = df.tz_convert("America/New_York")
-
-    # HARD ASSERT
-    if not isinstance(df.index, pd.DatetimeIndex):
-        raise TypeError("Index is not DatetimeIndex after timezone conversion.")
-
-    return df
+from src.breakout import find_breakouts
+from src.day_index import any_per_day, build_day_index, hhmm_to_minute
+from src.loader import load_5m
+from src.ticks import price_array
 
 
 # =========================
 # Hypothesis Test
 # =========================
-def run_close_vs_wick_test(df):
+def run_close_vs_wick_test(df, days=None):
     results = {
         "wick": {"samples": 0, "held_11": 0, "held_12": 0},
         "close": {"samples": 0, "held_11": 0, "held_12": 0},
     }
 
-    # Explicit day column (safe)
-    df = df.copy()
-    df["day"] = df.index.date
+    if days is None:
+        days = build_day_index(df.index)
 
-    for _, day_df in df.groupby("day"):
-        day_df = day_df.between_time("09:30", "12:00")
+    # First breach of the 9:50–10:10 range between 10:10 and 12:00
+    bo = find_breakouts(df, range_start="09:50", range_end="10:10", search_end="12:00", days=days)
 
-        range_window = day_df.between_time("09:50", "10:10")
-        if range_window.empty:
-            continue
-
-        range_high = range_window["high"].max()
-        range_low = range_window["low"].min()
-
-        after_range = day_df[day_df.index.time > time(10, 10)]
-        if after_range.empty:
-            continue
-
-        breakout_type = None
-        direction = None
-        breakout_time = None
+    codes = days["code"]
+    minute = days["minute"]
+    n_days = len(bo)
 
-        for idx, row in after_range.iterrows():
-            if row["high"] > range_high:
-                direction = "up"
-                breakout_type = "close" if row["close"] > range_high else "wick"
-                breakout_time = idx
-                break
+    breakout_pos = bo["wick_pos"].to_numpy()
+    direction = bo["wick_dir"].to_numpy()
+    has_break = breakout_pos >= 0
 
-            if row["low"] < range_low:
-                direction = "down"
-                breakout_type = "close" if row["close"] < range_low else "wick"
-                breakout_time = idx
-                break
+    # Bars from the breakout candle to 12:00 that touch the opposite side
+    pos = np.arange(len(df))
+    bar_break = breakout_pos[codes]
+    post = (bar_break >= 0) & (pos >= bar_break) & (pos < bo["after_stop"].to_numpy()[codes])
 
-        if breakout_time is None:
-            continue
-
-        results[breakout_type]["samples"] += 1
-
-        post = after_range.loc[breakout_time:]
-
-        held_11 = True
-        held_12 = True
-
-        for idx, row in post.iterrows():
-            if idx.time() <= time(11, 0):
-                if direction == "up" and row["low"] <= range_low:
-                    held_11 = False
-                if direction == "down" and row["high"] >= range_high:
-                    held_11 = False
+    revisit = post & np.where(
+        direction[codes] > 0,
+        price_array(df, "low") <= bo["range_low"].to_numpy()[codes],
+        price_array(df, "high") >= bo["range_high"].to_numpy()[codes],
+    )
 
-            if idx.time() <= time(12, 0):
-                if direction == "up" and row["low"] <= range_low:
-                    held_12 = False
-                if direction == "down" and row["high"] >= range_high:
-                    held_12 = False
+    revisit_11 = any_per_day(revisit & (minute <= hhmm_to_minute("11:00")), codes, n_days)
+    revisit_12 = any_per_day(revisit & (minute <= hhmm_to_minute("12:00")), codes, n_days)
 
-        if held_11:
-            results[breakout_type]["held_11"] += 1
-        if held_12:
-            results[breakout_type]["held_12"] += 1
+    is_close = bo["wick_close"].to_numpy()
+    for breakout_type, m in [("wick", has_break & ~is_close), ("close", has_break & is_close)]:
+        results[breakout_type]["samples"] += int(m.sum())
+        results[breakout_type]["held_11"] += int((m & ~revisit_11).sum())
+        results[breakout_type]["held_12"] += int((m & ~revisit_12).sum())
 
     return results
 
@@ -136,6 +81,6 @@ def print_results(results):
 # Run
 # =========================
 if __name__ == "__main__":
-    df = load_data()
+    df = load_5m()
     results = run_close_vs_wick_test(df)
     print_results(results)
@@ -1,77 +1,79 @@
+import sys
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
-DATA = Path("data/processed/nq_5m_clean.csv")
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.day_index import build_day_index
+from src.loader import load_5m
+from src.tensor import CLOSE, HIGH, LOW, build_day_tensor, first_slot, slot
+from src.ticks import price_array
+
 N_FORWARD = 3  # number of 5m bars to define continuation
 NY_TZ = "America/New_York"
 
 
+def run_or_break_impulse(df, days=None) -> pd.DataFrame:
+    """
+    One row per day with a close outside the 9:30 bar:
+    date, direction (bull/bear), continued (next N_FORWARD bars extend the break).
+    """
+    if days is None:
+        days = build_day_index(df.index)
+
+    t = build_day_tensor(df, days=days)
+    s_or = slot("09:30")
+
+    # --- Opening range: 9:30–9:35 ---
+    has_or = t["valid"][:, s_or]
+    or_high = t["ohlc"][:, s_or, HIGH][:, None]
+    or_low = t["ohlc"][:, s_or, LOW][:, None]
+
+    # Bars AFTER the opening range
+    post = t["valid"][:, s_or + 1:] & has_or[:, None]
+    close = t["ohlc"][:, s_or + 1:, CLOSE]
+
+    # Find first close outside OR
+    bull = post & (close > or_high)
+    bear = post & (close < or_low)
+    first = first_slot(bull | bear)
+
+    d = np.flatnonzero(first >= 0)
+    is_bull = bull[d, first[d]]
+    break_pos = t["pos"][d, s_or + 1 + first[d]]
+
+    # Look forward N bars after the break (same day only)
+    fwd = break_pos[:, None] + np.arange(1, N_FORWARD + 1)[None, :]
+    enough = fwd[:, -1] < days["stop"][d]
+    fwd = np.where(enough[:, None], fwd, break_pos[:, None])
+
+    high = price_array(df, "high")
+    low = price_array(df, "low")
+
+    # Continuation definition
+    continued = np.where(
+        is_bull,
+        high[fwd].max(axis=1) > high[break_pos],
+        low[fwd].min(axis=1) < low[break_pos],
+    )
+
+    return pd.DataFrame(
+        {
+            "date": t["dates"][d][enough],
+            "direction": np.where(is_bull, "bull", "bear")[enough],
+            "continued": continued[enough],
+        }
+    )
+
+
 def main():
-    # --- Load CSV explicitly ---
-    df = pd.read_csv(DATA)
-
-    # --- Explicit timestamp handling (no guessing) ---
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
-    df["timestamp"] = df["timestamp"].dt.tz_convert(NY_TZ)
-    df = df.set_index("timestamp").sort_index()
-
-    # Convenience column
-    df["date"] = df.index.date
-
-    results = []
-
-    for d, day in df.groupby("date"):
-        # --- Opening range: 9:30–9:35 ---
-        or_bar = day[day.index.strftime("%H:%M") == "09:30"]
-
-        if len(or_bar) != 1:
-            continue
-
-        or_high = or_bar["high"].iloc[0]
-        or_low = or_bar["low"].iloc[0]
-        or_time = or_bar.index[0]
-
-
-        # Bars AFTER the opening range
-        post = day[day.index > or_time]
-
-        break_time = None
-        direction = None
-
-        # Find first close outside OR
-        for ts, row in post.iterrows():
-            if row["close"] > or_high:
-                break_time = ts
-                direction = "bull"
-                break
-            elif row["close"] < or_low:
-                break_time = ts
-                direction = "bear"
-                break
-
-        if break_time is None:
-            continue
-
-        # Look forward N bars after the break
-        fwd = post.loc[break_time:].iloc[1 : 1 + N_FORWARD]
-        if len(fwd) < N_FORWARD:
-            continue
-
-        # Continuation definition
-        if direction == "bull":
-            continued = fwd["high"].max() > day.loc[break_time, "high"]
-        else:
-            continued = fwd["low"].min() < day.loc[break_time, "low"]
-
-        results.append(
-            {
-                "date": d,
-                "direction": direction,
-                "continued": continued,
-            }
-        )
-
-    res = pd.DataFrame(results)
+    # --- Load bars (NY time) ---
+    df = load_5m()
+
+    res = run_or_break_impulse(df)
 
     if res.empty:
         print("No valid samples found.")
@@ -1,7 +1,23 @@
+import sys
 from pathlib import Path
-import pandas as pd
 
-DATA = Path("data/processed/nq_5m_clean.csv")
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import numpy as np
+
+from src.day_index import (
+    any_per_day,
+    build_day_index,
+    first_per_day,
+    max_per_day,
+    min_per_day,
+    window,
+)
+from src.loader import load_5m
+from src.ticks import price_array
+
 NY_TZ = "America/New_York"
 
 LONDON_START = "02:00"
@@ -13,107 +29,69 @@ LUNCH_END    = "13:30"
 NY_END       = "16:00"
 
 
-def load_5m():
-    df = pd.read_csv(DATA)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True).dt.tz_convert(NY_TZ)
-    df = df.set_index("timestamp").sort_index()
-    return df[["open", "high", "low", "close"]].dropna()
+def run_london_liquidity(df, days=None):
+    if days is None:
+        days = build_day_index(df.index)
 
+    codes = days["code"]
+    n_days = len(days["start"])
 
-def get_session(df_day, start, end):
-    return df_day.between_time(start, end, inclusive="left")
+    high = price_array(df, "high")
+    low = price_array(df, "low")
 
+    london = window(days, LONDON_START, LONDON_END)
+    post   = window(days, POST_START, NY_END)
 
-def main():
-    df = load_5m()
-    df["date"] = df.index.date
-
-    results = {
-        "high_first": {
-            "samples": 0,
-            "am": 0,
-            "lunch": 0,
-            "pm": 0,
-            "full": 0,
-        },
-        "low_first": {
-            "samples": 0,
-            "am": 0,
-            "lunch": 0,
-            "pm": 0,
-            "full": 0,
-        },
+    valid = any_per_day(london, codes, n_days) & any_per_day(post, codes, n_days)
+
+    london_high = max_per_day(high, london, codes, n_days)
+    london_low  = min_per_day(low, london, codes, n_days)
+
+    # find first hit after London
+    hit_high = post & (high >= london_high[codes])
+    hit_low  = post & (low <= london_low[codes])
+
+    first = np.where(valid, first_per_day(hit_high | hit_low, codes, n_days), -1)
+    fp = np.where(first >= 0, first, 0)
+
+    ambiguous_day = (first >= 0) & hit_high[fp] & hit_low[fp]
+    first_high = (first >= 0) & ~ambiguous_day & hit_high[fp]
+    first_low  = (first >= 0) & ~ambiguous_day & ~hit_high[fp]
+
+    ambiguous = int(ambiguous_day.sum())
+    no_first_hit = int((valid & (first < 0)).sum())
+
+    # Remaining = post-London bars from the first hit onward
+    remaining = post & (first[codes] >= 0) & (np.arange(len(df)) >= first[codes])
+
+    # Opposite side: London LOW after a high hit, London HIGH after a low hit
+    opposite = remaining & np.where(
+        first_high[codes],
+        low <= london_low[codes],
+        high >= london_high[codes],
+    )
+
+    segments = {
+        "am": window(days, POST_START, NY_AM_END),
+        "lunch": window(days, NY_AM_END, LUNCH_END),
+        "pm": window(days, LUNCH_END, NY_END),
+        "full": remaining,
     }
 
-    ambiguous = 0
-    no_first_hit = 0
-
-    for d, day in df.groupby("date"):
-        day = day.sort_index()
-
-        london = get_session(day, LONDON_START, LONDON_END)
-        post   = get_session(day, POST_START, NY_END)
-
-        if london.empty or post.empty:
-            continue
-
-        london_high = london["high"].max()
-        london_low  = london["low"].min()
-
-        first_side = None
-        first_ts = None
-
-        # find first hit after London
-        for ts, row in post.iterrows():
-            hit_high = row["high"] >= london_high
-            hit_low  = row["low"] <= london_low
-
-            if hit_high and hit_low:
-                ambiguous += 1
-                first_side = "ambiguous"
-                break
-            if hit_high:
-                first_side = "high"
-                first_ts = ts
-                break
-            if hit_low:
-                first_side = "low"
-                first_ts = ts
-                break
-
-        if first_side is None:
-            no_first_hit += 1
-            continue
-        if first_side == "ambiguous":
-            continue
-
-        remaining = post.loc[first_ts:]
-
-        am = get_session(remaining, POST_START, NY_AM_END)
-        lunch = get_session(remaining, NY_AM_END, LUNCH_END)
-        pm = get_session(remaining, LUNCH_END, NY_END)
-
-        if first_side == "high":
-            results["high_first"]["samples"] += 1
-            if (am["low"] <= london_low).any():
-                results["high_first"]["am"] += 1
-            if (lunch["low"] <= london_low).any():
-                results["high_first"]["lunch"] += 1
-            if (pm["low"] <= london_low).any():
-                results["high_first"]["pm"] += 1
-            if (remaining["low"] <= london_low).any():
-                results["high_first"]["full"] += 1
-
-        if first_side == "low":
-            results["low_first"]["samples"] += 1
-            if (am["high"] >= london_high).any():
-                results["low_first"]["am"] += 1
-            if (lunch["high"] >= london_high).any():
-                results["low_first"]["lunch"] += 1
-            if (pm["high"] >= london_high).any():
-                results["low_first"]["pm"] += 1
-            if (remaining["high"] >= london_high).any():
-                results["low_first"]["full"] += 1
+    results = {}
+    for side, m in [("high_first", first_high), ("low_first", first_low)]:
+        results[side] = {"samples": int(m.sum())}
+        for seg, seg_mask in segments.items():
+            hit = any_per_day(opposite & seg_mask, codes, n_days)
+            results[side][seg] = int((m & hit).sum())
+
+    results["debug"] = {"ambiguous": ambiguous, "no_first_hit": no_first_hit}
+    return results
+
+
+def main():
+    df = load_5m()
+    results = run_london_liquidity(df)
 
     def pct(x, n):
         return round(x / n, 4) if n > 0 else float("nan")
@@ -134,8 +112,8 @@ def main():
         print()
 
     print("=== DEBUG ===")
-    print("Ambiguous first-hit bars:", ambiguous)
-    print("No first hit by EOD:", no_first_hit)
+    print("Ambiguous first-hit bars:", results["debug"]["ambiguous"])
+    print("No first hit by EOD:", results["debug"]["no_first_hit"])
 
 
 if __name__ == "__main__":
@@ -1,40 +1,22 @@
-import pandas as pd
+import sys
+import numpy as np
 from pathlib import Path
-from datetime import time
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
 
-# =========================
-# Data Loader (TZ SAFE)
-# =========================
-def load_data():
-    root = Path(__file__).resolve().parent.parent
-    matches = list(root.rglob("nq_5m_clean.csv"))
-
-    if not matches:
-        raise FileNotFoundError("Could not find nq_5m_clean.csv")
-
-    path = matches[0]
-    print(f"Loaded: {path}")
-
-    df = pd.read_csv(path)
-
-    df["timestamp"] = pd.to_datetime(
-        df["timestamp"],
-        utc=True,
-        errors="coerce"
-    )
-
-    df = df.dropna(subset=["timestamp"])
-    df = df.set_index("timestamp").sort_index()
-    df = df.tz_convert("America/New_York")
-
-    return df
+from src.breakout import find_breakouts
+from src.day_index import build_day_index
+from src.loader import load_5m
+from src.tensor import HIGH, LOW, build_day_tensor, post_mask
+from src.ticks import tick_size_of
 
 
 # =========================
 # Hypothesis Test
 # =========================
-def run_midpoint_test(df):
+def run_midpoint_test(df, days=None):
     stats = {
         "samples": 0,
         "midpoint_first": 0,
@@ -42,75 +24,34 @@ def run_midpoint_test(df):
         "neither": 0,
     }
 
-    df = df.copy()
-    df["day"] = df.index.date
-
-    for _, day_df in df.groupby("day"):
-        day_df = day_df.between_time("09:30", "12:00")
-
-        range_window = day_df.between_time("09:50", "10:10")
-        if range_window.empty:
-            continue
-
-        range_high = range_window["high"].max()
-        range_low = range_window["low"].min()
-        range_size = range_high - range_low
-
-        # Guard rail
-        if range_size > 75:
-            continue
-
-        midpoint = (range_high + range_low) / 2
-
-        after_range = day_df[day_df.index.time > time(10, 10)]
-        if after_range.empty:
-            continue
-
-        breakout_time = None
-        direction = None
-
-        for idx, row in after_range.iterrows():
-            if row["close"] > range_high:
-                direction = "up"
-                breakout_time = idx
-                break
-            if row["close"] < range_low:
-                direction = "down"
-                breakout_time = idx
-                break
-
-        if breakout_time is None:
-            continue
-
-        stats["samples"] += 1
-
-        post = after_range.loc[breakout_time:]
-
-        midpoint_hit = False
-        boundary_hit = False
-
-        for _, row in post.iterrows():
-            if direction == "up":
-                if row["low"] <= midpoint:
-                    midpoint_hit = True
-                    break
-                if row["low"] <= range_low:
-                    boundary_hit = True
-                    break
-            else:
-                if row["high"] >= midpoint:
-                    midpoint_hit = True
-                    break
-                if row["high"] >= range_high:
-                    boundary_hit = True
-                    break
-
-        if midpoint_hit:
-            stats["midpoint_first"] += 1
-        elif boundary_hit:
-            stats["boundary_first"] += 1
-        else:
-            stats["neither"] += 1
+    if days is None:
+        days = build_day_index(df.index)
+
+    bo = find_breakouts(df, range_start="09:50", range_end="10:10", search_end="12:00", days=days)
+    t = build_day_tensor(df, days=days)
+
+    range_high = bo["range_high"].to_numpy()[:, None]
+    range_low = bo["range_low"].to_numpy()[:, None]
+    range_size = range_high - range_low
+    midpoint = (range_high + range_low) / 2
+
+    # Guard rail (75 points; a tick_frame's range is in ticks)
+    keep = (bo["close_pos"].to_numpy() >= 0) & ~(range_size[:, 0] * (tick_size_of(df) or 1.0) > 75)
+
+    # Post = breakout candle through 12:00
+    post = post_mask(t, days, bo["close_pos"].to_numpy(), "12:00")
+    up = (bo["close_dir"].to_numpy() > 0)[:, None]
+
+    high = t["ohlc"][..., HIGH]
+    low = t["ohlc"][..., LOW]
+
+    midpoint_hit = (post & np.where(up, low <= midpoint, high >= midpoint)).any(axis=1)
+    boundary_hit = (post & np.where(up, low <= range_low, high >= range_high)).any(axis=1)
+
+    stats["samples"] = int(keep.sum())
+    stats["midpoint_first"] = int((keep & midpoint_hit).sum())
+    stats["boundary_first"] = int((keep & ~midpoint_hit & boundary_hit).sum())
+    stats["neither"] = int((keep & ~midpoint_hit & ~boundary_hit).sum())
 
     return stats
 
@@ -137,6 +78,6 @@ def print_results(stats):
 # Run
 # =========================
 if __name__ == "__main__":
-    df = load_data()
+    df = load_5m()
     stats = run_midpoint_test(df)
     print_results(stats)
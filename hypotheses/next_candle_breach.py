@@ -1,97 +1,50 @@
-import pandas as pd
+import sys
 from pathlib import Path
-from datetime import time
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
 
-def load_data():
-    root = Path(__file__).resolve().parent.parent
-    matches = list(root.rglob("nq_5m_clean.csv"))
-    if not matches:
-        raise FileNotFoundError("Could not find nq_5m_clean.csv")
+from src.breakout import find_breakouts
+from src.loader import load_5m
+from src.ticks import price_array
 
-    path = matches[0]
-    print(f"Loaded: {path}")
 
-    df = pd.read_csv(path)
-
-    # Force UTC then convert to NY for session slicing
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
-    df = df.dropna(subset=["timestamp"])
-    df = df.set_index("timestamp").sort_index()
-    df = df.tz_convert("America/New_York")
-
-    return df
-
-
-def run_next_candle_breach_test(df):
+def run_next_candle_breach_test(df, days=None):
     out = {
         "up": {"samples": 0, "next_breached": 0, "next_held": 0},
         "down": {"samples": 0, "next_breached": 0, "next_held": 0},
         "meta": {"no_breakout": 0, "no_next_candle": 0},
     }
 
-    df = df.copy()
-    df["day"] = df.index.date
+    # Close-confirmed breakout only, between 10:10 and 12:00
+    bo = find_breakouts(df, range_start="09:50", range_end="10:10", search_end="12:00", days=days)
 
-    for _, day_df in df.groupby("day"):
-        day_df = day_df.between_time("09:30", "12:00")
+    has_after = bo["after_start"].to_numpy() >= 0
+    pos = bo["close_pos"].to_numpy()
+    direction = bo["close_dir"].to_numpy()
 
-        rw = day_df.between_time("09:50", "10:10")
-        if rw.empty:
-            continue
+    out["meta"]["no_breakout"] = int((has_after & (pos < 0)).sum())
 
-        r_high = rw["high"].max()
-        r_low = rw["low"].min()
+    # Need the NEXT 5m candle
+    has_next = (pos >= 0) & (pos + 1 < bo["after_stop"].to_numpy())
+    out["meta"]["no_next_candle"] = int(((pos >= 0) & ~has_next).sum())
 
-        after = day_df[day_df.index.time > time(10, 10)]
-        if after.empty:
-            continue
+    high = price_array(df, "high")
+    low = price_array(df, "low")
 
-        breakout_idx = None
-        direction = None
-
-        # close-confirmed breakout only
-        for idx, row in after.iterrows():
-            if row["close"] > r_high:
-                breakout_idx = idx
-                direction = "up"
-                break
-            if row["close"] < r_low:
-                breakout_idx = idx
-                direction = "down"
-                break
-
-        if breakout_idx is None:
-            out["meta"]["no_breakout"] += 1
-            continue
-
-        # Need the NEXT 5m candle
-        after_idx = after.index
-        pos = after_idx.get_loc(breakout_idx)
-        if isinstance(pos, slice) or pos >= len(after_idx) - 1:
-            out["meta"]["no_next_candle"] += 1
-            continue
-
-        next_idx = after_idx[pos + 1]
-
-        br = after.loc[breakout_idx]
-        nx = after.loc[next_idx]
-
-        if direction == "up":
-            out["up"]["samples"] += 1
-            breached = nx["low"] <= br["low"]          # took out breakout low
-            if breached:
-                out["up"]["next_breached"] += 1
-            else:
-                out["up"]["next_held"] += 1
+    for side, sign in [("up", 1), ("down", -1)]:
+        br = pos[has_next & (direction == sign)]
+        nx = br + 1
 
+        if side == "up":
+            breached = low[nx] <= low[br]          # took out breakout low
         else:
-            out["down"]["samples"] += 1
-            breached = nx["high"] >= br["high"]        # took out breakout high
-            if breached:
-                out["down"]["next_breached"] += 1
-            else:
-                out["down"]["next_held"] += 1
+            breached = high[nx] >= high[br]        # took out breakout high
+
+        out[side]["samples"] += len(br)
+        out[side]["next_breached"] += int(breached.sum())
+        out[side]["next_held"] += int((~breached).sum())
 
     return out
 
@@ -121,6 +74,6 @@ def print_results(out):
 
 
 if __name__ == "__main__":
-    df = load_data()
+    df = load_5m()
     out = run_next_candle_breach_test(df)
     print_results(out)
@@ -1,40 +1,22 @@
-import pandas as pd
+import sys
+import numpy as np
 from pathlib import Path
-from datetime import time
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
 
-# =========================
-# Data Loader (TZ SAFE)
-# =========================
-def load_data():
-    root = Path(__file__).resolve().parent.parent
-    matches = list(root.rglob("nq_5m_clean.csv"))
-
-    if not matches:
-        raise FileNotFoundError("Could not find nq_5m_clean.csv.")
-
-    path = matches[0]
-    print(f"Loaded: {path}")
-
-    df = pd.read_csv(path)
-
-    df["timestamp"] = pd.to_datetime(
-        df["timestamp"],
-        utc=True,
-        errors="coerce"
-    )
-
-    df = df.dropna(subset=["timestamp"])
-    df = df.set_index("timestamp").sort_index()
-    df = df.tz_convert("America/New_York")
-
-    return df
+from src.breakout import find_breakouts
+from src.day_index import build_day_index
+from src.loader import load_5m
+from src.tensor import HIGH, LOW, build_day_tensor, post_mask
+from src.ticks import tick_size_of
 
 
 # =========================
 # Hypothesis Test
 # =========================
-def run_range_r_test(df):
+def run_range_r_test(df, days=None):
     buckets = {
         "<50": {"samples": 0, "1R": 0, "1.25R": 0, "1.5R": 0},
         "50-75": {"samples": 0, "1R": 0, "1.25R": 0, "1.5R": 0},
@@ -42,69 +24,38 @@ def run_range_r_test(df):
         ">100": {"samples": 0, "1R": 0, "1.25R": 0, "1.5R": 0},
     }
 
-    df = df.copy()
-    df["day"] = df.index.date
+    if days is None:
+        days = build_day_index(df.index)
 
-    for _, day_df in df.groupby("day"):
-        day_df = day_df.between_time("09:30", "12:00")
+    bo = find_breakouts(df, range_start="09:50", range_end="10:10", search_end="12:00", days=days)
+    t = build_day_tensor(df, days=days)
 
-        range_window = day_df.between_time("09:50", "10:10")
-        if range_window.empty:
-            continue
+    range_high = bo["range_high"].to_numpy()
+    range_low = bo["range_low"].to_numpy()
+    R = range_high - range_low
 
-        range_high = range_window["high"].max()
-        range_low = range_window["low"].min()
-        R = range_high - range_low
-
-        if R <= 50:
-            bucket = "<50"
-        elif R <= 75:
-            bucket = "50-75"
-        elif R <= 100:
-            bucket = "75-100"
-        else:
-            bucket = ">100"
-
-        after_range = day_df[day_df.index.time > time(10, 10)]
-        if after_range.empty:
-            continue
-
-        breakout_time = None
-        direction = None
-
-        for idx, row in after_range.iterrows():
-            if row["close"] > range_high:
-                direction = "up"
-                breakout_time = idx
-                break
-            if row["close"] < range_low:
-                direction = "down"
-                breakout_time = idx
-                break
-
-        if breakout_time is None:
-            continue
+    # Post = breakout candle through 12:00
+    post = post_mask(t, days, bo["close_pos"].to_numpy(), "12:00")
+    up = (bo["close_dir"].to_numpy() > 0)[:, None]
 
-        buckets[bucket]["samples"] += 1
-
-        post = after_range.loc[breakout_time:]
-
-        max_fav = 0
-
-        for _, row in post.iterrows():
-            if direction == "up":
-                move = row["high"] - range_high
-            else:
-                move = range_low - row["low"]
+    move = np.where(
+        up,
+        t["ohlc"][..., HIGH] - range_high[:, None],
+        range_low[:, None] - t["ohlc"][..., LOW],
+    )
+    max_fav = np.where(post, move, 0).max(axis=1, initial=0)
 
-            max_fav = max(max_fav, move)
+    has_break = bo["close_pos"].to_numpy() >= 0
+    # Buckets are in points; a tick_frame's R is in ticks
+    points = R * (tick_size_of(df) or 1.0)
+    bucket = np.select([points <= 50, points <= 75, points <= 100], ["<50", "50-75", "75-100"], ">100")
 
-        if max_fav >= R:
-            buckets[bucket]["1R"] += 1
-        if max_fav >= 1.25 * R:
-            buckets[bucket]["1.25R"] += 1
-        if max_fav >= 1.5 * R:
-            buckets[bucket]["1.5R"] += 1
+    for k in buckets:
+        m = has_break & (bucket == k)
+        buckets[k]["samples"] += int(m.sum())
+        buckets[k]["1R"] += int((m & (max_fav >= R)).sum())
+        buckets[k]["1.25R"] += int((m & (max_fav >= 1.25 * R)).sum())
+        buckets[k]["1.5R"] += int((m & (max_fav >= 1.5 * R)).sum())
 
     return buckets
 
@@ -132,6 +83,6 @@ def print_results(buckets):
 # Run
 # =========================
 if __name__ == "__main__":
-    df = load_data()
+    df = load_5m()
     results = run_range_r_test(df)
     print_results(results)
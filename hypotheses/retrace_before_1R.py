@@ -1,11 +1,18 @@
+import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.breakout import find_breakouts
+from src.loader import load_5m
+
 # =========================
 # CONFIG
 # =========================
-DATA_REL = Path("data/processed/nq_5m_clean.csv")  # your working path
 SESSION_START = "09:30"
 SESSION_END   = "12:00"
 RANGE_START   = "09:50"
@@ -16,120 +23,81 @@ TARGET_R = 1.00                # compare vs +1R
 AMBIGUOUS_RULE = "retrace_first"  # or "target_first"
 
 
-# =========================
-# LOADING
-# =========================
-def load_data() -> pd.DataFrame:
-    # robust path find (works even if you move repo)
-    if DATA_REL.exists():
-        path = DATA_REL
-    else:
-        root = Path(__file__).resolve().parent.parent
-        hits = list(root.rglob("nq_5m_clean.csv"))
-        if not hits:
-            raise FileNotFoundError("Could not find nq_5m_clean.csv (expected in data/processed/)")
-        path = hits[0]
-
-    df = pd.read_csv(path)
-    if "timestamp" not in df.columns:
-        raise ValueError("Expected a 'timestamp' column")
-
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
-    df = df.dropna(subset=["timestamp"]).set_index("timestamp").sort_index()
-    df = df.tz_convert("America/New_York")
-
-    need = {"open", "high", "low", "close"}
-    missing = need - set(df.columns)
-    if missing:
-        raise ValueError(f"Missing columns: {missing}")
-
-    print(f"Loaded: {path}")
-    return df
-
-
 # =========================
 # CORE TEST
 # =========================
-def first_hit_up(bar, retrace_px, target_px):
+def _first_hit(hit_r, hit_t):
     """
-    For UP direction: retrace hit if low <= retrace_px, target hit if high >= target_px
+    First bar where either level is hit.
     Returns: "retrace", "target", "both", or None
     """
-    hit_r = bar["low"] <= retrace_px
-    hit_t = bar["high"] >= target_px
-    if hit_r and hit_t:
+    idx = np.flatnonzero(hit_r | hit_t)
+    if len(idx) == 0:
+        return None
+    k = idx[0]
+    if hit_r[k] and hit_t[k]:
         return "both"
-    if hit_r:
+    if hit_r[k]:
         return "retrace"
-    if hit_t:
-        return "target"
-    return None
+    return "target"
 
 
-def first_hit_down(bar, retrace_px, target_px):
+def first_hit_up(bars, retrace_px, target_px):
+    """
+    For UP direction: retrace hit if low <= retrace_px, target hit if high >= target_px
+    Returns: "retrace", "target", "both", or None
+    """
+    hit_r = bars["low"].to_numpy() <= retrace_px
+    hit_t = bars["high"].to_numpy() >= target_px
+    return _first_hit(hit_r, hit_t)
+
+
+def first_hit_down(bars, retrace_px, target_px):
     """
     For DOWN direction:
     - retrace is upward retrace (adverse move) to entry + retrace_frac*R => high >= retrace_px
     - target is favorable move to entry - 1R => low <= target_px
     """
-    hit_r = bar["high"] >= retrace_px
-    hit_t = bar["low"] <= target_px
-    if hit_r and hit_t:
-        return "both"
-    if hit_r:
-        return "retrace"
-    if hit_t:
-        return "target"
-    return None
+    hit_r = bars["high"].to_numpy() >= retrace_px
+    hit_t = bars["low"].to_numpy() <= target_px
+    return _first_hit(hit_r, hit_t)
+
+
+def tally(bucket, hit):
+    if hit is None:
+        bucket["neither"] += 1
+    elif hit == "both":
+        bucket["ambiguous"] += 1
+        bucket[AMBIGUOUS_RULE] += 1
+    elif hit == "retrace":
+        bucket["retrace_first"] += 1
+    else:
+        bucket["target_first"] += 1
 
 
-def run_test(df: pd.DataFrame):
+def run_test(df: pd.DataFrame, days=None):
     out = {
         "up": {f: {"n": 0, "retrace_first": 0, "target_first": 0, "neither": 0, "ambiguous": 0} for f in RETRACE_LEVELS},
         "down": {f: {"n": 0, "retrace_first": 0, "target_first": 0, "neither": 0, "ambiguous": 0} for f in RETRACE_LEVELS},
         "debug": {"days_total": 0, "no_range": 0, "no_breakout": 0, "no_forward": 0, "bad_risk": 0},
     }
 
-    for _, day in df.groupby(df.index.date):
-        out["debug"]["days_total"] += 1
-
-        day = day.between_time(SESSION_START, SESSION_END)
-        if day.empty:
-            out["debug"]["no_range"] += 1
-            continue
-
-        rng = day.between_time(RANGE_START, RANGE_END)
-        if rng.empty:
-            out["debug"]["no_range"] += 1
-            continue
+    # Close-confirmed breakout candle (c0), all days at once
+    bo = find_breakouts(df, range_start=RANGE_START, range_end=RANGE_END, search_end=SESSION_END, days=days)
 
-        range_high = float(rng["high"].max())
-        range_low  = float(rng["low"].min())
+    out["debug"]["days_total"] = len(bo)
+    out["debug"]["no_range"] = int((bo["range_start"] < 0).sum())
+    out["debug"]["no_breakout"] = int(((bo["range_start"] >= 0) & (bo["close_pos"] < 0)).sum())
 
-        after = day[day.index > rng.index[-1]]
-        if after.empty:
-            out["debug"]["no_breakout"] += 1
-            continue
+    df = df[["open", "high", "low", "close"]]
 
-        # Close-confirmed breakout candle (c0)
-        c0 = None
-        direction = None
-        for ts, row in after.iterrows():
-            if row["close"] > range_high:
-                c0 = row
-                direction = "up"
-                break
-            if row["close"] < range_low:
-                c0 = row
-                direction = "down"
-                break
-
-        if c0 is None:
-            out["debug"]["no_breakout"] += 1
-            continue
+    for d in np.flatnonzero(bo["close_pos"].to_numpy() >= 0):
+        pos0 = int(bo["close_pos"].iat[d])
+        end = int(bo["after_stop"].iat[d])
+        direction = "up" if bo["close_dir"].iat[d] > 0 else "down"
 
-        ts0 = c0.name
-        forward = after[after.index > ts0]
+        c0 = df.iloc[pos0]
+        forward = df.iloc[pos0 + 1:end]
         if forward.empty:
             out["debug"]["no_forward"] += 1
             continue
@@ -149,25 +117,8 @@ def run_test(df: pd.DataFrame):
                 retrace = entry - frac * R
                 out["up"][frac]["n"] += 1
 
-                decided = False
-                for _, bar in forward.iterrows():
-                    hit = first_hit_up(bar, retrace, target)
-                    if hit is None:
-                        continue
-
-                    if hit == "both":
-                        out["up"][frac]["ambiguous"] += 1
-                        out["up"][frac][AMBIGUOUS_RULE] += 1
-                    elif hit == "retrace":
-                        out["up"][frac]["retrace_first"] += 1
-                    else:
-                        out["up"][frac]["target_first"] += 1
-
-                    decided = True
-                    break
-
-                if not decided:
-                    out["up"][frac]["neither"] += 1
+                hit = first_hit_up(forward, retrace, target)
+                tally(out["up"][frac], hit)
 
         else:
             stop = float(c0["high"])
@@ -182,25 +133,8 @@ def run_test(df: pd.DataFrame):
                 retrace = entry + frac * R  # adverse move upward
                 out["down"][frac]["n"] += 1
 
-                decided = False
-                for _, bar in forward.iterrows():
-                    hit = first_hit_down(bar, retrace, target)
-                    if hit is None:
-                        continue
-
-                    if hit == "both":
-                        out["down"][frac]["ambiguous"] += 1
-                        out["down"][frac][AMBIGUOUS_RULE] += 1
-                    elif hit == "retrace":
-                        out["down"][frac]["retrace_first"] += 1
-                    else:
-                        out["down"][frac]["target_first"] += 1
-
-                    decided = True
-                    break
-
-                if not decided:
-                    out["down"][frac]["neither"] += 1
+                hit = first_hit_down(forward, retrace, target)
+                tally(out["down"][frac], hit)
 
     return out
 
@@ -236,7 +170,7 @@ def print_results(res):
 
 
 def main():
-    df = load_data()
+    df = load_5m()
     res = run_test(df)
     print_results(res)
 
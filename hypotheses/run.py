@@ -0,0 +1,465 @@
+"""
+Run hypotheses in parallel against one shared copy of the 5m bars.
+
+    python -m hypotheses.run --all --jobs 8
+    python -m hypotheses.run am_macro_range close_vs_wick
+    python -m hypotheses.run --list
+
+When the pipeline's memory-mapped bar file (nq_5m.bars) exists, every
+worker maps it directly. Otherwise the parent loads the bars once and
+places timestamps + OHLC in a multiprocessing.shared_memory block. Either
+way workers wrap one shared copy in a DataFrame, so a full refresh takes
+about as long as the slowest hypothesis.
+
+--block-days N streams the bars N days at a time (src/blocks.py) and
+merges per-block results, so memory stays bounded by one block however
+long the history is.
+
+--regular-only drops holidays, half-days and closures (src/sessions.py)
+before any hypothesis sees the bars.
+
+--symbols NQ ES YM RTY runs every (symbol, hypothesis) pair as its own
+worker task against that symbol's processed bars (<sym>_5m.bars / store /
+CSV) and also writes a symbol x metric table next to the JSON bundle.
+
+--checkpoint DIR stores every finished (symbol, hypothesis) result in DIR
+(src/checkpoint.py) as soon as it completes; rerunning the same command
+skips those and only runs what is left, so an interrupted run resumes.
+"""
+import argparse
+import importlib
+import json
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import date, datetime
+from multiprocessing import shared_memory
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.barfile import read_barfile
+from src.blocks import iter_day_blocks, merge_counts, merge_partials, reduce_blocks
+from src.checkpoint import open_job, pending, read_results, write_unit
+from src.day_index import CLOCK, build_day_index, frame_day_index
+from src.loader import SYMBOL, content_hash, load_5m_indexed, symbol_files
+from src.sessions import regular_only
+
+NY_TZ = "America/New_York"
+OHLC = ["open", "high", "low", "close"]
+
+DEFAULT_OUT = ROOT / "data" / "processed" / "hypothesis_results.json"
+
+# name -> (module, function). Every function takes (df, days=...).
+REGISTRY = {
+    "am_macro_range": ("hypotheses.am_macro_range", "run_am_macro_range"),
+    "close_vs_wick": ("hypotheses.close_vs_wick", "run_close_vs_wick_test"),
+    "stairstep_acceptance": ("hypotheses.stairstep_acceptance", "run_stairstep"),
+    "midpoint_revisit": ("hypotheses.midpoint_revisit", "run_midpoint_test"),
+    "range_size_r_targets": ("hypotheses.range_size_r_targets", "run_range_r_test"),
+    "next_candle_breach": ("hypotheses.next_candle_breach", "run_next_candle_breach_test"),
+    "ten_am_reversal": ("hypotheses.ten_am_reversal", "run_10am_reversal"),
+    "london_liquidity": ("hypotheses.london_liquidity", "run_london_liquidity"),
+    "or_hod_lod": ("hypotheses.15m_HOD_LOD", "run_or_hod_lod"),
+    "or_break_impulse": ("hypotheses.hyp_or_break_impulse", "run_or_break_impulse"),
+    "retrace_before_1R": ("hypotheses.retrace_before_1R", "run_test"),
+    "strategy_backtest": ("hypotheses.strategy_backtest", "run_strategy"),
+}
+
+# Block-wise runs: hypotheses whose reported result is not a plain
+# merge_partials of per-block results.
+# name -> (module, per-block function, finalize or None, merge)
+BLOCK_REDUCERS = {
+    "am_macro_range": ("hypotheses.am_macro_range", "am_macro_range_counts", "am_macro_range_rates", merge_partials),
+    "ten_am_reversal": ("hypotheses.ten_am_reversal", "ten_am_reversal_counts", "ten_am_reversal_rates", merge_partials),
+    "stairstep_acceptance": ("hypotheses.stairstep_acceptance", "run_stairstep", None, merge_counts),
+    "strategy_backtest": ("hypotheses.strategy_backtest", "run_strategy", "renumber_trades", merge_partials),
+}
+
+
+# =========================
+# Shared-memory dataset
+# =========================
+def _views(buf, n: int):
+    """int64 UTC-ns timestamps followed by an (n, 4) float64 OHLC block."""
+    ts = np.ndarray((n,), dtype=np.int64, buffer=buf)
+    ohlc = np.ndarray((n, 4), dtype=np.float64, buffer=buf, offset=n * 8)
+    return ts, ohlc
+
+
+def share_bars(df: pd.DataFrame):
+    """
+    Copy bars into one shared block. Returns the SharedMemory handle
+    (caller closes + unlinks) and the metadata workers need to attach.
+    """
+    n = len(df)
+    shm = shared_memory.SharedMemory(create=True, size=max(n * 5 * 8, 1))
+    ts, ohlc = _views(shm.buf, n)
+
+    ts[:] = df.index.as_unit("ns").asi8
+    ohlc[:] = df[OHLC].to_numpy(dtype=np.float64)
+
+    return shm, {"name": shm.name, "n": n}
+
+
+def attach_bars(meta: dict):
+    """Wrap a shared block as a NY-indexed OHLC DataFrame (no copy of prices)."""
+    shm = shared_memory.SharedMemory(name=meta["name"])
+    ts, ohlc = _views(shm.buf, meta["n"])
+
+    index = pd.DatetimeIndex(ts.view("datetime64[ns]")).tz_localize("UTC").tz_convert(NY_TZ)
+    index.name = "timestamp"
+
+    df = pd.DataFrame(ohlc, index=index, columns=OHLC, copy=False)
+    return shm, df
+
+
+# Per-worker state, set once by the pool initializer
+_WORKER = {}
+
+
+def _init_worker(meta: dict):
+    if "barfile" in meta:
+        full = read_barfile(Path(meta["barfile"]), columns=OHLC + CLOCK)
+        df, days = full[OHLC], frame_day_index(full)
+        if meta.get("regular"):
+            df, days = regular_only(df, days)
+        _WORKER["df"] = df
+        _WORKER["days"] = days
+        return
+
+    shm, df = attach_bars(meta)
+    _WORKER["shm"] = shm  # keep the mapping alive
+    _WORKER["df"] = df
+    _WORKER["days"] = build_day_index(df.index)
+
+
+def _run_one(name: str, df=None, days=None):
+    if df is None:
+        df, days = _WORKER["df"], _WORKER["days"]
+
+    module, func = REGISTRY[name]
+    fn = getattr(importlib.import_module(module), func)
+
+    t0 = time.perf_counter()
+    result = fn(df, days=days)
+    return name, jsonable(result), time.perf_counter() - t0
+
+
+def _regular_blocks(blocks):
+    for df, days in blocks:
+        yield regular_only(df, days)
+
+
+def _run_blocks(name: str, block_days: int, regular: bool = False, symbol: str = SYMBOL):
+    """One hypothesis over the whole history, one block of days at a time."""
+    if name in BLOCK_REDUCERS:
+        module, func, fin, merge = BLOCK_REDUCERS[name]
+    else:
+        (module, func), fin, merge = REGISTRY[name], None, merge_partials
+
+    mod = importlib.import_module(module)
+    fn = getattr(mod, func)
+    finalize = None if fin is None else getattr(mod, fin)
+
+    blocks = iter_day_blocks(days_per_block=block_days, symbol=symbol)
+    if regular:
+        blocks = _regular_blocks(blocks)
+
+    t0 = time.perf_counter()
+    result = reduce_blocks(fn, blocks, finalize=finalize, merge=merge)
+    return name, jsonable(result), time.perf_counter() - t0
+
+
+def _symbol_bars(symbol: str, regular: bool):
+    """A symbol's bars + day index, loaded once per worker process."""
+    key = ("bars", symbol, regular)
+    if key not in _WORKER:
+        df, days = load_5m_indexed(symbol=symbol)
+        _WORKER[key] = regular_only(df, days) if regular else (df, days)
+    return _WORKER[key]
+
+
+def _run_symbol(symbol: str, name: str, regular: bool = False, block_days: int | None = None):
+    if block_days:
+        name, result, secs = _run_blocks(name, block_days, regular, symbol)
+    else:
+        df, days = _symbol_bars(symbol, regular)
+        name, result, secs = _run_one(name, df=df, days=days)
+    return symbol, name, result, secs
+
+
+# =========================
+# JSON bundle
+# =========================
+def jsonable(obj):
+    """Hypothesis results (dicts, tuples, DataFrames, numpy scalars) -> JSON types."""
+    if isinstance(obj, pd.DataFrame):
+        return [jsonable(r) for r in obj.to_dict(orient="records")]
+    if isinstance(obj, dict):
+        return {str(k): jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [jsonable(v) for v in obj]
+    if isinstance(obj, np.ndarray):
+        return jsonable(obj.tolist())
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, float) and math.isnan(obj):
+        return None
+    return obj
+
+
+def run(
+    names,
+    jobs: int = 1,
+    df: pd.DataFrame | None = None,
+    regular: bool = False,
+    block_days: int | None = None,
+    symbol: str = SYMBOL,
+) -> dict:
+    """
+    Run the named hypotheses and return {name: {"result", "seconds"}}.
+
+    regular: only complete regular-session days (see sessions.regular_only).
+    block_days: stream the processed bars that many days at a time instead
+    of loading them (ignores df); each worker streams on its own.
+    symbol: whose processed bars to load when df is not given.
+    """
+    out = {}
+
+    if block_days:
+        if jobs <= 1:
+            for name in names:
+                name, result, secs = _run_blocks(name, block_days, regular, symbol)
+                out[name] = {"result": result, "seconds": round(secs, 3)}
+                print(f"  {name}: {secs:.2f}s")
+            return out
+
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_run_blocks, name, block_days, regular, symbol) for name in names]
+            for fut in as_completed(futures):
+                name, result, secs = fut.result()
+                out[name] = {"result": result, "seconds": round(secs, 3)}
+                print(f"  {name}: {secs:.2f}s")
+        return {name: out[name] for name in names}
+
+    if jobs <= 1:
+        if df is None:
+            df, days = load_5m_indexed(symbol=symbol)
+        else:
+            days = build_day_index(df.index)
+        if regular:
+            df, days = regular_only(df, days)
+        for name in names:
+            name, result, secs = _run_one(name, df=df, days=days)
+            out[name] = {"result": result, "seconds": round(secs, 3)}
+            print(f"  {name}: {secs:.2f}s")
+        return out
+
+    # Workers map the bar file themselves; nothing to load or copy here
+    bars = symbol_files(symbol)["bars"]
+    if df is None and bars.exists():
+        shm, meta = None, {"barfile": str(bars), "regular": regular}
+    else:
+        if df is None:
+            df, days = load_5m_indexed(symbol=symbol)
+        else:
+            days = build_day_index(df.index)
+        if regular:
+            df, _ = regular_only(df, days)
+        shm, meta = share_bars(df)
+
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(meta,)) as pool:
+            futures = [pool.submit(_run_one, name) for name in names]
+            for fut in as_completed(futures):
+                name, result, secs = fut.result()
+                out[name] = {"result": result, "seconds": round(secs, 3)}
+                print(f"  {name}: {secs:.2f}s")
+    finally:
+        if shm is not None:
+            shm.close()
+            shm.unlink()
+
+    return {name: out[name] for name in names}
+
+
+def run_symbols(
+    names,
+    symbols,
+    jobs: int = 1,
+    regular: bool = False,
+    block_days: int | None = None,
+    checkpoint: Path | None = None,
+) -> dict:
+    """
+    Run the named hypotheses on every symbol: {symbol: {name: {"result", "seconds"}}}.
+
+    Each (symbol, hypothesis) pair is one task, so with jobs >= pairs the
+    wall time is about that of the slowest single run. Workers load (or map)
+    each symbol's bars once and reuse them for later tasks.
+
+    checkpoint: directory of a resumable results store; every finished pair
+    is written there at once and skipped on the next run.
+    """
+    tasks = [(symbol, name) for symbol in symbols for name in names]
+    out = {symbol: {} for symbol in symbols}
+
+    job = None
+    if checkpoint is not None:
+        params = {
+            "job": "hypotheses",
+            "regular": regular,
+            "block_days": block_days,
+            "data_hash": {symbol: content_hash(symbol=symbol) for symbol in symbols},
+        }
+        job = open_job(checkpoint, params, [f"{symbol}/{name}" for symbol, name in tasks])
+        for row in read_results(checkpoint, job).itertuples():
+            out[row.symbol][row.name] = {"result": json.loads(row.result), "seconds": row.seconds}
+
+        left = set(pending(checkpoint, job))
+        if len(left) < len(tasks):
+            print(f"  resuming: {len(tasks) - len(left)} of {len(tasks)} runs already done")
+        tasks = [(symbol, name) for symbol, name in tasks if f"{symbol}/{name}" in left]
+
+    def record(symbol, name, result, secs):
+        out[symbol][name] = {"result": result, "seconds": round(secs, 3)}
+        print(f"  {symbol} {name}: {secs:.2f}s")
+        if job is not None:
+            row = {"symbol": symbol, "name": name, "seconds": round(secs, 3), "result": json.dumps(result)}
+            write_unit(checkpoint, job, f"{symbol}/{name}", pd.DataFrame([row]))
+
+    if jobs <= 1:
+        for symbol, name in tasks:
+            record(*_run_symbol(symbol, name, regular, block_days))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            futures = [pool.submit(_run_symbol, symbol, name, regular, block_days) for symbol, name in tasks]
+            for fut in as_completed(futures):
+                record(*fut.result())
+
+    return {symbol: {name: out[symbol][name] for name in names} for symbol in symbols}
+
+
+def _flatten(obj, prefix: str, out: dict) -> None:
+    """Scalar leaves of a jsonable result as dotted keys; lists become counts."""
+    if isinstance(obj, dict):
+        for k, v in obj.items():
+            _flatten(v, f"{prefix}.{k}", out)
+    elif isinstance(obj, list):
+        if obj and all(isinstance(v, dict) for v in obj):
+            out[f"{prefix}.rows"] = len(obj)  # DataFrame records
+        elif any(isinstance(v, float) for v in obj) and all(isinstance(v, (int, float)) or v is None for v in obj):
+            vals = [v for v in obj if v is not None]
+            out[f"{prefix}.n"] = len(vals)  # per-trade values
+            out[f"{prefix}.mean"] = round(float(np.mean(vals)), 4) if vals else None
+        elif all(isinstance(v, str) for v in obj):
+            return  # labels
+        else:
+            for i, v in enumerate(obj):
+                _flatten(v, f"{prefix}.{i}", out)
+    elif not isinstance(obj, str):
+        out[prefix] = obj
+
+
+# Names for the parts of tuple results in the metric table
+TUPLE_FIELDS = {
+    "strategy_backtest": ("results", "debug", "trades"),
+}
+
+
+def metric_table(results: dict) -> pd.DataFrame:
+    """run_symbols output -> one row per symbol, one column per hypothesis metric."""
+    rows = {}
+    for symbol, by_name in results.items():
+        row = {}
+        for name, rec in by_name.items():
+            result = rec["result"]
+            if name in TUPLE_FIELDS:
+                result = dict(zip(TUPLE_FIELDS[name], result))
+            _flatten(result, name, row)
+        rows[symbol] = row
+    return pd.DataFrame.from_dict(rows, orient="index").rename_axis("symbol")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("names", nargs="*", help="hypotheses to run (see --list)")
+    parser.add_argument("--all", action="store_true", help="run every registered hypothesis")
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes (default 1 = in-process)")
+    parser.add_argument("--out", type=Path, default=DEFAULT_OUT, help="JSON results bundle")
+    parser.add_argument("--list", action="store_true", help="list registered hypotheses and exit")
+    parser.add_argument("--block-days", type=int, default=None,
+                        help="stream the bars N days at a time (bounded memory)")
+    parser.add_argument("--regular-only", action="store_true",
+                        help="skip holidays, half-days and closures (CME calendar)")
+    parser.add_argument("--symbols", nargs="+", default=None,
+                        help="instruments to run on (default NQ); adds a symbol x metric table")
+    parser.add_argument("--checkpoint", type=Path, default=None,
+                        help="resumable results directory: finished runs are kept and skipped")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name in REGISTRY:
+            print(name)
+        return
+
+    names = list(REGISTRY) if args.all else args.names
+    unknown = [n for n in names if n not in REGISTRY]
+    if unknown:
+        parser.error(f"unknown hypotheses: {unknown}")
+    if not names:
+        parser.error("nothing to run (pass names or --all)")
+
+    t0 = time.perf_counter()
+    if args.symbols:
+        results = run_symbols(
+            names, args.symbols, jobs=args.jobs, regular=args.regular_only, block_days=args.block_days,
+            checkpoint=args.checkpoint,
+        )
+    elif args.checkpoint:
+        results = run_symbols(
+            names, [SYMBOL], jobs=args.jobs, regular=args.regular_only, block_days=args.block_days,
+            checkpoint=args.checkpoint,
+        )[SYMBOL]
+    else:
+        results = run(names, jobs=args.jobs, regular=args.regular_only, block_days=args.block_days)
+    wall = time.perf_counter() - t0
+
+    bundle = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "jobs": args.jobs,
+            "regular_only": args.regular_only,
+            "block_days": args.block_days,
+            "symbols": args.symbols or [SYMBOL],
+            "wall_seconds": round(wall, 3),
+        },
+        "results": results,
+    }
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    args.out.write_text(json.dumps(bundle, indent=2))
+
+    if args.symbols:
+        table = metric_table(results)
+        table_path = args.out.with_suffix(".metrics.csv")
+        table.to_csv(table_path)
+        print()
+        print(table.T.to_string())
+        print(f"\nRan {len(names)} hypotheses x {len(args.symbols)} symbols in {wall:.2f}s → {args.out}, {table_path}")
+        return
+
+    print(f"\nRan {len(names)} hypotheses in {wall:.2f}s → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
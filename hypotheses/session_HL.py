@@ -1,7 +1,17 @@
+import argparse
+import sys
 from pathlib import Path
+
 import pandas as pd
 
-DATA = Path("data/processed/nq_5m_clean.csv")
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.day_index import ROLLOVER, bar_clock, hhmm_to_minute
+from src.loader import SYMBOL, load_5m
+from src.sessions import REGULAR, assign_sessions, day_kinds
+
 NY_TZ = "America/New_York"
 
 ASIA_START = "20:00"
@@ -17,17 +27,6 @@ NY_START = "09:30"
 NY_END   = "16:00"
 
 
-def assign_trade_date(ts: pd.Series) -> pd.Series:
-    """
-    Map bars to a 'trade_date' (NY date).
-    Any bar at/after 20:00 belongs to the next day's trade_date.
-    """
-    local = ts.dt.tz_convert(NY_TZ)
-    d = local.dt.date
-    t = local.dt.strftime("%H:%M")
-    return pd.to_datetime(d) + pd.to_timedelta((t >= ASIA_START).astype(int), unit="D")
-
-
 def session_slice(df: pd.DataFrame, start: str, end: str) -> pd.DataFrame:
     """
     between_time cannot handle wrap-around (20:00–00:00) cleanly, so handle both.
@@ -40,16 +39,22 @@ def session_slice(df: pd.DataFrame, start: str, end: str) -> pd.DataFrame:
     return pd.concat([a, b]).sort_index()
 
 
-def main():
-    df = pd.read_csv(DATA)
+def main(symbol: str = SYMBOL):
+    df = load_5m(symbol=symbol)
 
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True)
-    df = df.set_index("timestamp").sort_index()
-    df = df[["open", "high", "low", "close"]].dropna()
+    # CME trade date (18:00 rollover, holidays roll forward), whole index at once.
+    # Holiday and half-day trade dates are skipped: the NY session is not complete.
+    sessions = assign_sessions(df.index)
+    trade_date = sessions["trade_date"].astype("datetime64[D]")
+    df["trade_date"] = pd.to_datetime(trade_date)
 
-    # Add trade_date (NY date anchor)
-    df = df.copy()
-    df["trade_date"] = assign_trade_date(df.index.to_series())
+    # Only the trade date itself and its 18:00+ eve: bars rolled forward from
+    # a holiday or weekend would otherwise land in the time-of-day windows
+    _, minute = bar_clock(df.index)
+    own = (sessions["date"] == sessions["trade_date"]) | (
+        (sessions["date"] == sessions["trade_date"] - 1) & (minute >= hhmm_to_minute(ROLLOVER))
+    )
+    df = df[own & (day_kinds(trade_date) == REGULAR)]
 
     rows = []
 
@@ -133,4 +138,6 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Asia high/low revisits by London and NY.")
+    parser.add_argument("--symbol", default=SYMBOL, help="instrument (default NQ)")
+    main(parser.parse_args().symbol)
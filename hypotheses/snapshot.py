@@ -0,0 +1,148 @@
+"""
+Prebuilt dashboard snapshot.
+
+    python -m hypotheses.snapshot
+
+Runs every computation app.py shows (tab results + final-strategy equity,
+drawdown and rolling expectancy) and pickles them together with the data
+hash, trades hash and parameters they were built from. The dashboard loads
+the snapshot at startup and only recomputes when a hash, the parameters or
+SNAPSHOT_VERSION no longer match.
+"""
+import pickle
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from hypotheses.am_macro_range import run_am_macro_range
+from hypotheses.close_vs_wick import run_close_vs_wick_test
+from hypotheses.stairstep_acceptance import run_stairstep
+from hypotheses.strategy_backtest import BASELINE, run_strategy, summary_table
+from src.day_index import build_day_index
+from src.loader import PROCESSED, content_hash, load_5m_indexed
+
+# Bump whenever the layout of the snapshot or any tab computation changes
+SNAPSHOT_VERSION = 4
+
+SNAPSHOT_PATH = PROCESSED / "dashboard_snapshot.pkl"
+TRADES_PATH = PROCESSED / "final_strategy_trades.csv"
+
+PARAMS = {
+    "stairstep_steps": 4,
+    "rolling_window": 20,
+}
+
+
+# =========================
+# Final-strategy curves
+# =========================
+def load_trades(path: Path = TRADES_PATH) -> pd.DataFrame:
+    if not path.exists():
+        raise FileNotFoundError(f"Missing file: {path}")
+    return pd.read_csv(path)
+
+
+def equity_curves(r: pd.Series, rolling_window: int = PARAMS["rolling_window"]) -> dict:
+    """Cumulative R, drawdown from the running peak and rolling expectancy, by trade #."""
+    r = r.reset_index(drop=True)
+    cum_r = r.cumsum()
+    return {
+        "cum_r": cum_r,
+        "drawdown": cum_r - cum_r.cummax(),
+        "rolling_exp": r.rolling(rolling_window).mean(),
+    }
+
+
+def strategy_tables(df: pd.DataFrame, days=None) -> dict:
+    """Per-target metric tables of the final strategy and the rejected breakout-entry baseline."""
+    return {
+        "final": summary_table(*run_strategy(df, days=days)[:2]),
+        "baseline": summary_table(*run_strategy(df, days=days, **BASELINE)[:2]),
+    }
+
+
+# =========================
+# Build / load
+# =========================
+def build_snapshot(df: pd.DataFrame | None = None, params: dict = PARAMS) -> dict:
+    data_hash = content_hash()
+    trades_hash = content_hash(TRADES_PATH)
+
+    if df is None:
+        df, days = load_5m_indexed()
+    else:
+        days = build_day_index(df.index)
+
+    trades = load_trades()
+
+    return {
+        "version": SNAPSHOT_VERSION,
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "data_hash": data_hash,
+        "trades_hash": trades_hash,
+        "params": dict(params),
+        "results": {
+            "am_macro_range": run_am_macro_range(df, days=days),
+            "close_vs_wick": run_close_vs_wick_test(df, days=days),
+            "stairstep": run_stairstep(df, steps=params["stairstep_steps"], days=days),
+            "strategy": strategy_tables(df, days=days),
+        },
+        "trades": trades,
+        "equity": equity_curves(trades["result_r"], params["rolling_window"]),
+    }
+
+
+def write_snapshot(snap: dict, path: Path = SNAPSHOT_PATH) -> None:
+    """Write via a temp file so a running dashboard never reads a partial snapshot."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    with open(tmp, "wb") as f:
+        pickle.dump(snap, f, protocol=pickle.HIGHEST_PROTOCOL)
+    tmp.replace(path)
+
+
+def load_snapshot(
+    data_hash: str,
+    trades_hash: str,
+    params: dict = PARAMS,
+    path: Path = SNAPSHOT_PATH,
+) -> dict | None:
+    """The snapshot if it matches the current data, trades and params, else None."""
+    if not path.exists():
+        return None
+
+    try:
+        with open(path, "rb") as f:
+            snap = pickle.load(f)
+    except Exception:
+        return None
+
+    if (
+        snap.get("version") != SNAPSHOT_VERSION
+        or snap.get("data_hash") != data_hash
+        or snap.get("trades_hash") != trades_hash
+        or snap.get("params") != params
+    ):
+        return None
+
+    return snap
+
+
+def main():
+    t0 = time.perf_counter()
+    snap = build_snapshot()
+    write_snapshot(snap)
+
+    print(f"Snapshot v{SNAPSHOT_VERSION} (data {snap['data_hash'][:12]}) built in "
+          f"{time.perf_counter() - t0:.2f}s → {SNAPSHOT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
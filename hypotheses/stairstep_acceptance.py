@@ -1,26 +1,17 @@
-import pandas as pd
+import sys
+import numpy as np
 from pathlib import Path
-from datetime import time
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
 
-def load_data():
-    root = Path(__file__).resolve().parent.parent
-    matches = list(root.rglob("nq_5m_clean.csv"))
-    if not matches:
-        raise FileNotFoundError("Could not find nq_5m_clean.csv")
+from src.breakout import find_breakouts
+from src.loader import load_5m
+from src.ticks import price_array
 
-    path = matches[0]
-    print(f"Loaded: {path}")
 
-    df = pd.read_csv(path)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
-    df = df.dropna(subset=["timestamp"])
-    df = df.set_index("timestamp").sort_index()
-    df = df.tz_convert("America/New_York")
-    return df
-
-
-def run_stairstep(df, steps=4):
+def run_stairstep(df, steps=4, days=None):
     """
     TRUE STAIRSTEP (CUMULATIVE ONLY)
 
@@ -41,76 +32,42 @@ def run_stairstep(df, steps=4):
         "meta": {"no_breakout": 0},
     }
 
-    df = df.copy()
-    df["day"] = df.index.date
-
-    for _, day_df in df.groupby("day"):
-        day_df = day_df.between_time("09:30", "12:00")
-
-        rw = day_df.between_time("09:50", "10:10")
-        if rw.empty:
-            continue
-
-        r_high = rw["high"].max()
-        r_low = rw["low"].min()
+    # Close-confirmed breakout (candle 0) between 10:10 and 12:00
+    bo = find_breakouts(df, range_start="09:50", range_end="10:10", search_end="12:00", days=days)
 
-        after = day_df[day_df.index.time > time(10, 10)]
-        if after.empty:
-            continue
-
-        # Find close-confirmed breakout (candle 0)
-        b0_idx = None
-        direction = None
-        for idx, row in after.iterrows():
-            if row["close"] > r_high:
-                b0_idx = idx
-                direction = "up"
-                break
-            if row["close"] < r_low:
-                b0_idx = idx
-                direction = "down"
-                break
-
-        if b0_idx is None:
-            out["meta"]["no_breakout"] += 1
-            continue
+    has_after = bo["after_start"].to_numpy() >= 0
+    pos0 = bo["close_pos"].to_numpy()
+    stop = bo["after_stop"].to_numpy()
+    direction = bo["close_dir"].to_numpy()
 
-        idxs = after.index
-        pos0 = idxs.get_loc(b0_idx)
-        if isinstance(pos0, slice):
-            pos0 = pos0.start
+    out["meta"]["no_breakout"] = int((has_after & (pos0 < 0)).sum())
 
-        # Need at least candle 1 to evaluate stairstep at all
-        if pos0 + 1 >= len(idxs):
-            continue
+    # Need at least candle 1 to evaluate stairstep at all
+    valid = (pos0 >= 0) & (pos0 + 1 < stop)
 
-        # Build candles c0..cN
-        candles = []
-        for k in range(0, steps + 1):
-            p = pos0 + k
-            candles.append(after.loc[idxs[p]] if p < len(idxs) else None)
+    low = price_array(df, "low")
+    high = price_array(df, "high")
 
-        out[direction]["base"] += 1
+    for side, sign in [("up", 1), ("down", -1)]:
+        m = valid & (direction == sign)
+        p0 = pos0[m]
+        p_stop = stop[m]
+        out[side]["base"] += len(p0)
 
-        chain_alive = True
+        # Chain stays alive only while every prior step held
+        alive = np.ones(len(p0), dtype=bool)
         for n in range(1, steps + 1):
-            if not chain_alive:
-                break
-            if candles[n] is None:
-                break
-
-            c_prev = candles[n - 1]
-            c_cur = candles[n]
+            p = p0 + n
+            alive &= p < p_stop
+            p = np.where(alive, p, p0)
 
-            if direction == "up":
-                holds = c_cur["low"] > c_prev["low"]
+            if side == "up":
+                holds = low[p] > low[p - 1]
             else:
-                holds = c_cur["high"] < c_prev["high"]
+                holds = high[p] < high[p - 1]
 
-            if holds:
-                out[direction]["survivors"][n] += 1
-            else:
-                chain_alive = False
+            alive &= holds
+            out[side]["survivors"][n] += int(alive.sum())
 
     return out
 
@@ -140,7 +97,7 @@ def print_results(out, steps=4):
 
 
 if __name__ == "__main__":
-    df = load_data()
+    df = load_5m()
     steps = 4
     out = run_stairstep(df, steps=steps)
     print_results(out, steps=steps)
@@ -1,12 +1,22 @@
+import sys
 import pandas as pd
 import numpy as np
 from pathlib import Path
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.breakout import find_breakouts, retrace_entries
+from src.loader import load_5m
+from src.metrics import results_matrix, trade_metrics
+from src.resolver import resolve_trades
+from src.sessions import window_days
+from src.ticks import price_array, tick_size_of
+
 # ============================================================
 # CONFIG (matches your 10AM logic)
 # ============================================================
-DATA_5M = Path("data/processed/nq_5m_clean.csv")
-
 SESSION_START = "09:30"
 SESSION_END   = "12:00"
 RANGE_START   = "09:50"
@@ -14,45 +24,30 @@ RANGE_END     = "10:10"
 
 R_TARGETS = [1.0, 1.5, 2.0]   # report win/pf/exp for each
 
+RETRACE   = 0.5                # entry at 50% of the breakout candle
+STOP_MODE = "extreme"          # stop at the breakout candle extreme
 
-# ============================================================
-# LOAD
-# ============================================================
-def load_5m() -> pd.DataFrame:
-    if not DATA_5M.exists():
-        raise FileNotFoundError(f"Missing file: {DATA_5M.resolve()}")
-
-    df = pd.read_csv(DATA_5M)
-
-    if "timestamp" not in df.columns:
-        raise ValueError("Expected a 'timestamp' column in nq_5m_clean.csv")
-
-    # Fix mixed timezone warning + guarantee tz-aware index
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
-    df = df.dropna(subset=["timestamp"]).set_index("timestamp").sort_index()
-
-    if not isinstance(df.index, pd.DatetimeIndex):
-        raise TypeError("Index is not a DatetimeIndex after parsing timestamp.")
-
-    # Work in NY time for your session windows
-    df = df.tz_convert("America/New_York")
-
-    needed = {"open", "high", "low", "close"}
-    missing = needed - set(df.columns)
-    if missing:
-        raise ValueError(f"Missing required columns: {missing}")
-
-    print(f"Loaded 5m: {DATA_5M.resolve()}")
-    return df
+# Rejected baseline: market entry at the breakout candle close, same stop
+BASELINE = {"retrace": 0.0, "market": True}
 
 
 # ============================================================
 # STRATEGY: 50% retrace entry, stop at breakout extreme
 # R is defined by entry->stop (i.e., half the breakout candle risk)
 # ============================================================
-def run_strategy(df: pd.DataFrame):
+def run_strategy(
+    df: pd.DataFrame,
+    days=None,
+    retrace: float = RETRACE,
+    stop_mode: str = STOP_MODE,
+    market: bool = False,
+):
+    """
+    retrace / stop_mode: entry level and stop (breakout.retrace_entries).
+    market: enter at the breakout candle close unconditionally instead of
+    waiting for a limit fill (use with retrace=0, see BASELINE).
+    """
     trade_log = []
-    trade_id = 0
 
     results = {rt: [] for rt in R_TARGETS}
 
@@ -65,167 +60,103 @@ def run_strategy(df: pd.DataFrame):
         "trades": 0,
     }
 
-    # Group by trading day robustly
-    for _, day in df.groupby(df.index.normalize()):
-        debug["days_total"] += 1
+    # First close-confirmed breakout (c0) of the range, all days at once
+    bo = find_breakouts(df, range_start=RANGE_START, range_end=RANGE_END, search_end=SESSION_END, days=days)
 
-        day = day.between_time(SESSION_START, SESSION_END)
-        if day.empty:
-            debug["no_range"] += 1
-            continue
+    # Only days whose cash session covers the window (the days sweep / walk_forward trade)
+    bo = bo[window_days(bo.index, SESSION_END)]
 
-        rng = day.between_time(RANGE_START, RANGE_END)
-        if rng.empty:
-            debug["no_range"] += 1
-            continue
+    debug["days_total"] = len(bo)
+    debug["no_range"] = int((bo["range_start"] < 0).sum())
+    debug["no_breakout"] = int(((bo["range_start"] >= 0) & (bo["close_pos"] < 0)).sum())
 
-        range_high = float(rng["high"].max())
-        range_low  = float(rng["low"].min())
+    # Float prices, or int32 ticks for a tick_frame (levels exact either way)
+    o_high = price_array(df, "high")
+    o_low = price_array(df, "low")
 
-        after = day[day.index > rng.index[-1]]
-        if after.empty:
-            debug["no_breakout"] += 1
-            continue
+    # 50% retrace entry and stop at breakout extreme
+    lv = retrace_entries(df, bo, retrace=retrace, stop_mode=stop_mode)
 
-        # Find first close-confirmed breakout candle (c0)
-        c0 = None
-        direction = None  # "long" or "short"
-        ts0 = None
-
-        for ts, row in after.iterrows():
-            if row["close"] > range_high:
-                c0 = row
-                ts0 = ts
-                direction = "long"
-                break
-            if row["close"] < range_low:
-                c0 = row
-                ts0 = ts
-                direction = "short"
-                break
-
-        if c0 is None:
-            debug["no_breakout"] += 1
-            continue
+    # Forward bars AFTER breakout candle close
+    ok = lv["ok"]
+    debug["no_entry_fill"] += int((~ok).sum())
 
-        # Forward bars AFTER breakout candle close
-        fwd = after[after.index > ts0]
-        if fwd.empty:
-            debug["no_entry_fill"] += 1
-            continue
+    days, pos0, end, sign = lv["day"][ok], lv["pos0"][ok], lv["end"][ok], lv["sign"][ok]
+    entry, stop, risk = lv["entry"][ok], lv["stop"][ok], lv["risk"][ok]
 
-        # 50% retrace entry and stop at breakout extreme
-        if direction == "long":
-            full = float(c0["close"] - c0["low"])
-            if full <= 0:
-                debug["no_entry_fill"] += 1
-                continue
-            entry = float(c0["close"] - 0.5 * full)
-            stop  = float(c0["low"])
-        else:
-            full = float(c0["high"] - c0["close"])
-            if full <= 0:
-                debug["no_entry_fill"] += 1
-                continue
-            entry = float(c0["close"] + 0.5 * full)
-            stop  = float(c0["high"])
-
-        # True risk after limit entry
-        risk = abs(entry - stop)
-        if risk <= 0:
-            debug["no_entry_fill"] += 1
-            continue
+    # Wait for entry fill, then resolve every target independently
+    # Conservative ambiguity: if stop & TP in same bar -> count as stop
+    r_targets = np.asarray(R_TARGETS, dtype=float)
+    tps = entry[:, None] + sign[:, None] * r_targets[None, :] * risk[:, None]
 
-        # Wait for entry fill
-        entry_ts = None
-        for ts, bar in fwd.iterrows():
-            if direction == "long" and float(bar["low"]) <= entry:
-                entry_ts = ts
-                break
-            if direction == "short" and float(bar["high"]) >= entry:
-                entry_ts = ts
-                break
-
-        if entry_ts is None:
-            debug["no_entry_fill"] += 1
-            continue
+    res = resolve_trades(o_high, o_low, pos0 + 1, end, sign, entry, stop, tps, market=market)
+
+    filled = res["fill_pos"] >= 0
+    debug["no_entry_fill"] += int((~filled).sum())
 
-        # From entry forward, resolve each target independently
-        # Conservative ambiguity: if stop & TP in same bar -> count as stop
-        for rt in R_TARGETS:
-            tp = entry + rt * risk if direction == "long" else entry - rt * risk
-            outcome = 0.0  # unresolved if neither hit by session end
-
-            for _, bar in fwd.loc[entry_ts:].iterrows():
-                hi = float(bar["high"])
-                lo = float(bar["low"])
-
-                if direction == "long":
-                    hit_stop = lo <= stop
-                    hit_tp   = hi >= tp
-                else:
-                    hit_stop = hi >= stop
-                    hit_tp   = lo <= tp
-
-                if hit_stop and hit_tp:
-                    debug["ambiguous_stop_tp_same_bar"][rt] += 1
-                    outcome = -1.0
-                    break
-                if hit_stop:
-                    outcome = -1.0
-                    break
-                if hit_tp:
-                    outcome = float(rt)
-                    break
-
-            results[rt].append(outcome)
+    outcome = res["outcome"][filled]
+    result_r = np.where(outcome > 0, r_targets[None, :], outcome.astype(float))
 
+    for j, rt in enumerate(R_TARGETS):
+        results[rt] = result_r[:, j].tolist()
+        debug["ambiguous_stop_tp_same_bar"][rt] = int(res["ambiguous"][filled, j].sum())
+
+    # Log keeps the last target's result per trade (levels back in points)
+    tick = tick_size_of(df) or 1.0
+    days, sign = days[filled], sign[filled]
+    entry, stop, risk = entry[filled] * tick, stop[filled] * tick, risk[filled] * tick
+    rt = R_TARGETS[-1]
+
+    for trade_id in range(len(days)):
         trade_log.append({
             "trade_id": trade_id,
-            "date": day.index[0].date(),
-            "direction": direction,
-            "entry": entry,
-            "stop": stop,
-            "risk": risk,
+            "date": bo.index[days[trade_id]],
+            "direction": "long" if sign[trade_id] > 0 else "short",
+            "entry": float(entry[trade_id]),
+            "stop": float(stop[trade_id]),
+            "risk": float(risk[trade_id]),
             "target_r": rt,
-            "result_r": outcome,
+            "result_r": float(result_r[trade_id, -1]),
         })
 
-        debug["trades"] += 1
-        trade_id += 1
+    debug["trades"] = len(days)
 
     return results, debug, pd.DataFrame(trade_log)
 
 
+def renumber_trades(out):
+    """Finalize run_strategy output merged over day blocks: trade_id restarts per block."""
+    results, debug, trades = out
+    if len(trades):
+        trades = trades.assign(trade_id=np.arange(len(trades)))
+    return results, debug, trades
+
+
 # ============================================================
 # METRICS
 # ============================================================
+def summary_table(results, debug) -> pd.DataFrame:
+    """One row per R target: every trade metric (src/metrics.py) + ambiguous count."""
+    targets = list(results)
+    table = trade_metrics(
+        results_matrix([results[rt] for rt in targets]),
+        index=pd.Index(targets, name="target_r"),
+    )
+    table["ambiguous"] = [debug["ambiguous_stop_tp_same_bar"][rt] for rt in targets]
+    return table
+
+
 def summarize(results, debug):
     print("\n=== STRATEGY: 10AM Breakout → 50% Retrace Entry → Stop @ Breakout Extreme ===")
     print("R is based on (entry → stop). Targets: 1R / 1.5R / 2R\n")
 
-    for rt in R_TARGETS:
-        arr = np.array(results[rt], dtype=float)
-        n = len(arr)
-        wins = int((arr > 0).sum())
-        losses = int((arr < 0).sum())
-        unresolved = int((arr == 0).sum())
-
-        resolved = wins + losses
-        wr_resolved = (wins / resolved) if resolved else 0.0
-
-        gross_win = arr[arr > 0].sum()
-        gross_loss = abs(arr[arr < 0].sum())
-        pf = (gross_win / gross_loss) if gross_loss > 0 else np.nan
-
-        exp = arr.mean() if n else 0.0
-
-        print(f"Target {rt:.2f}R")
-        print(f"Trades: {n} | Wins: {wins} | Losses: {losses} | Unresolved: {unresolved}")
-        print(f"Resolved WR: {wr_resolved:.2%}")
-        print(f"Profit factor: {pf:.3f}")
-        print(f"Expectancy: {exp:+.3f}R")
-        print(f"Ambiguous (stop & TP same bar, stop assumed): {debug['ambiguous_stop_tp_same_bar'][rt]}\n")
+    for m in summary_table(results, debug).itertuples():
+        print(f"Target {m.Index:.2f}R")
+        print(f"Trades: {m.trades} | Wins: {m.wins} | Losses: {m.losses} | Unresolved: {m.unresolved}")
+        print(f"Resolved WR: {m.win_rate:.2%}")
+        print(f"Profit factor: {m.profit_factor:.3f}")
+        print(f"Expectancy: {m.expectancy:+.3f}R")
+        print(f"Ambiguous (stop & TP same bar, stop assumed): {m.ambiguous}\n")
 
     print("--- DEBUG ---")
     for k, v in debug.items():
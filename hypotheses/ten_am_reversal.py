@@ -1,27 +1,26 @@
+import sys
 from pathlib import Path
-import pandas as pd
 
 ROOT = Path(__file__).resolve().parents[1]
-
-DATA_DIR = ROOT / "data" / "processed"
-
-DATA = DATA_DIR / "nq_5m_clean.csv"
-
-if not DATA.exists():
-    raise FileNotFoundError(
-        f"Expected nq_5m_clean.csv not found in {DATA_DIR}. "
-        f"Found: {[p.name for p in DATA_DIR.glob('*.csv')]}"
-    )
-
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import numpy as np
+
+from src.day_index import (
+    any_per_day,
+    build_day_index,
+    first_per_day,
+    hhmm_to_minute,
+    max_per_day,
+    min_per_day,
+    window,
+)
+from src.loader import load_5m  # re-exported for am_macro_range
+from src.ticks import price_array
 
 NY_TZ = "America/New_York"
 
-def load_5m():
-    df = pd.read_csv(DATA)
-    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True).dt.tz_convert(NY_TZ)
-    df = df.set_index("timestamp").sort_index()
-    return df[["open", "high", "low", "close"]].dropna()
-
 
 # Prior range (what can be reversed)
 PRIOR_START = "09:30"
@@ -54,91 +53,90 @@ DAY_END  = "16:00"
 #     }
 
 
-def win(df_day, start, end):
-    return df_day.between_time(start, end, inclusive="left")
+def run_10am_reversal(df, days=None):
+    return ten_am_reversal_rates(ten_am_reversal_counts(df, days=days))
+
+
+def ten_am_reversal_counts(df, days=None):
+    """Raw per-side counts; additive across day blocks (see src.blocks)."""
+    if days is None:
+        days = build_day_index(df.index)
 
+    codes = days["code"]
+    n_days = len(days["start"])
 
-def run_10am_reversal(df):
-    df = df.copy()
-    df["date"] = df.index.date
+    high = price_array(df, "high")
+    low = price_array(df, "low")
 
-    stats = {
-        "reversal_at_high": {"samples": 0, "held_11": 0, "held_12": 0},
-        "reversal_at_low":  {"samples": 0, "held_11": 0, "held_12": 0},
+    prior = window(days, PRIOR_START, PRIOR_END)
+    event = window(days, EVENT_START, EVENT_END)
+
+    has_prior = any_per_day(prior, codes, n_days)
+    has_event = any_per_day(event, codes, n_days)
+
+    prior_high = max_per_day(high, prior, codes, n_days)
+    prior_low  = min_per_day(low, prior, codes, n_days)
+
+    # First touch of the prior range during 9:50–10:10
+    hit_high = event & (high >= prior_high[codes])
+    hit_low  = event & (low <= prior_low[codes])
+
+    first = first_per_day(hit_high | hit_low, codes, n_days)
+    fp = np.where(first >= 0, first, 0)
+
+    valid = has_prior & has_event
+    hit = valid & (first >= 0)
+    ambiguous_day = hit & hit_high[fp] & hit_low[fp]
+
+    sides = {
+        "reversal_at_high": hit & ~ambiguous_day & hit_high[fp],
+        "reversal_at_low":  hit & ~ambiguous_day & ~hit_high[fp],
     }
 
-    no_prior = 0
-    no_event = 0
-    no_hit_in_event = 0
-    ambiguous = 0
-
-    for d, day in df.groupby("date"):
-        day = day.sort_index()
-
-        prior = win(day, PRIOR_START, PRIOR_END)
-        event = win(day, EVENT_START, EVENT_END)
-
-        if prior.empty:
-            no_prior += 1
-            continue
-        if event.empty:
-            no_event += 1
-            continue
-
-        prior_high = float(prior["high"].max())
-        prior_low  = float(prior["low"].min())
-
-        first_side = None
-        first_ts = None
-
-        for ts, row in event.iterrows():
-            hit_high = row["high"] >= prior_high
-            hit_low  = row["low"] <= prior_low
-
-            if hit_high and hit_low:
-                ambiguous += 1
-                first_side = "ambiguous"
-                break
-            if hit_high:
-                first_side = "reversal_at_high"
-                first_ts = ts
-                break
-            if hit_low:
-                first_side = "reversal_at_low"
-                first_ts = ts
-                break
-
-        if first_side is None:
-            no_hit_in_event += 1
-            continue
-        if first_side == "ambiguous":
-            continue
-
-        stats[first_side]["samples"] += 1
-
-        rem_11 = win(day.loc[first_ts:], EVENT_START, CUTOFF_1)
-        rem_12 = win(day.loc[first_ts:], EVENT_START, CUTOFF_2)
-
-        if first_side == "reversal_at_high":
-            if not (rem_11["low"] <= prior_low).any():
-                stats["reversal_at_high"]["held_11"] += 1
-            if not (rem_12["low"] <= prior_low).any():
-                stats["reversal_at_high"]["held_12"] += 1
-
-        if first_side == "reversal_at_low":
-            if not (rem_11["high"] >= prior_high).any():
-                stats["reversal_at_low"]["held_11"] += 1
-            if not (rem_12["high"] >= prior_high).any():
-                stats["reversal_at_low"]["held_12"] += 1
+    # Opposite side revisited from the first touch onward
+    since = (np.arange(len(df)) >= first[codes]) & (first[codes] >= 0)
+    from_event = since & (days["minute"] >= hhmm_to_minute(EVENT_START))
 
-    def pct(x, n):
-        return round(x / n, 4) if n > 0 else float("nan")
+    opposite = np.where(
+        sides["reversal_at_high"][codes],
+        low <= prior_low[codes],        # Opposite side = prior LOW
+        high >= prior_high[codes],      # Opposite side = prior HIGH
+    )
+    revisit = from_event & opposite
 
-    return {
+    revisit_11 = any_per_day(revisit & (days["minute"] < hhmm_to_minute(CUTOFF_1)), codes, n_days)
+    revisit_12 = any_per_day(revisit & (days["minute"] < hhmm_to_minute(CUTOFF_2)), codes, n_days)
+
+    out = {
         "meta": {
             "prior_range": f"{PRIOR_START}–{PRIOR_END}",
             "event_window": f"{EVENT_START}–{EVENT_END}",
         },
+    }
+    for side, m in sides.items():
+        out[side] = {
+            "samples": int(m.sum()),
+            "held_11": int((m & ~revisit_11).sum()),
+            "held_12": int((m & ~revisit_12).sum()),
+        }
+
+    out["debug"] = {
+        "no_prior": int((~has_prior).sum()),
+        "no_event": int((has_prior & ~has_event).sum()),
+        "no_hit_in_event": int((valid & (first < 0)).sum()),
+        "ambiguous": int(ambiguous_day.sum()),
+    }
+    return out
+
+
+def ten_am_reversal_rates(stats):
+    """Counts -> the reported held rates."""
+
+    def pct(x, n):
+        return round(x / n, 4) if n > 0 else float("nan")
+
+    return {
+        "meta": stats["meta"],
         "reversal_at_high": {
             "samples": stats["reversal_at_high"]["samples"],
             "held_11": pct(
@@ -161,12 +159,7 @@ def run_10am_reversal(df):
                 stats["reversal_at_low"]["samples"],
             ),
         },
-        "debug": {
-            "no_prior": no_prior,
-            "no_event": no_event,
-            "no_hit_in_event": no_hit_in_event,
-            "ambiguous": ambiguous,
-        },
+        "debug": stats["debug"],
     }
 
 
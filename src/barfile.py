@@ -0,0 +1,243 @@
+"""
+Fixed-width binary bar file, read through np.memmap.
+
+Layout (all little-endian):
+
+    header   64 bytes  magic "OHLCBAR1", version u4, reserved u4, n_bars i8,
+                       capacity i8 (version 3+), zero padding
+    ts       cap * i8  UTC epoch nanoseconds, strictly increasing
+    open     cap * f8
+    high     cap * f8
+    low      cap * f8
+    close    cap * f8
+    trade_date  cap * i4  (version 2+) integer clock columns, see
+    minute      cap * i2               day_index.clock_columns
+    session     cap * i1
+
+Every column has room for cap bars, of which the first n are valid (before
+version 3, cap == n). append_barfile writes new bars into that slack in
+place and then bumps n, so adding a week of bars costs a week of I/O; only
+when the slack runs out is the file rewritten with room to grow.
+
+Opening the file maps it read-only: no parsing, no copy, and every process
+mapping it shares one physical copy through the OS page cache.
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.day_index import CLOCK, clock_columns
+
+NY_TZ = "America/New_York"
+
+MAGIC = b"OHLCBAR1"
+VERSION = 3
+HEADER_BYTES = 64
+
+FIELDS = ["open", "high", "low", "close"]
+
+# Clock arrays after the prices, widest first so each stays aligned
+CLOCK_DTYPES = [("trade_date", "<i4"), ("minute", "<i2"), ("session", "<i1")]
+
+HEADER = np.dtype(
+    [
+        ("magic", "S8"),
+        ("version", "<u4"),
+        ("reserved", "<u4"),
+        ("n", "<i8"),
+        ("cap", "<i8"),
+        ("pad", "V32"),
+    ]
+)
+
+
+def _columns(version: int) -> list:
+    """(name, dtype) of every column of a file version, in file order."""
+    return [("ts", "<i8")] + [(c, "<f8") for c in FIELDS] + (CLOCK_DTYPES if version >= 2 else [])
+
+
+def _arrays(df: pd.DataFrame) -> dict:
+    """Column name -> array of bars, as laid out in a current-version file."""
+    out = {"ts": df.index.as_unit("ns").asi8}
+    out.update({c: df[c].to_numpy(dtype="<f8") for c in FIELDS})
+    clock = clock_columns(df.index.tz_convert(NY_TZ))
+    out.update({c: clock[c] for c, _ in CLOCK_DTYPES})
+    return out
+
+
+def _read_header(path: Path) -> tuple[int, int, int]:
+    """(version, n, cap) of a bar file."""
+    header = np.fromfile(path, dtype=HEADER, count=1)
+    if len(header) != 1 or header["magic"][0] != MAGIC:
+        raise ValueError(f"Not a bar file: {path}")
+    version = int(header["version"][0])
+    if version not in (1, 2, VERSION):
+        raise ValueError(f"Unsupported bar file version {version}: {path}")
+
+    n = int(header["n"][0])
+    return version, n, int(header["cap"][0]) if version >= 3 else n
+
+
+def _header_bytes(n: int, cap: int) -> bytes:
+    header = np.zeros(1, dtype=HEADER)
+    header["magic"] = MAGIC
+    header["version"] = VERSION
+    header["n"] = n
+    header["cap"] = cap
+    return header.tobytes()
+
+
+def _check_sorted(df: pd.DataFrame) -> None:
+    if not isinstance(df.index, pd.DatetimeIndex) or df.index.tz is None:
+        raise TypeError("Expected a tz-aware DatetimeIndex")
+    if not df.index.is_monotonic_increasing:
+        raise ValueError("Bars must be time-sorted")
+
+
+def write_barfile(df: pd.DataFrame, path: Path, capacity: int = 0) -> None:
+    """
+    Write NY- (or any tz-) indexed OHLC bars; replaces path atomically.
+
+    capacity reserves room for that many bars (at least len(df)), so later
+    append_barfile calls fill the file in place. The slack is a file hole,
+    so it takes no disk space until written.
+    """
+    _check_sorted(df)
+    n = len(df)
+    cap = max(n, capacity)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+
+    arrays = _arrays(df)
+    with open(tmp, "wb") as f:
+        f.write(_header_bytes(n, cap))
+        for c, dtype in _columns(VERSION):
+            f.write(arrays[c].astype(dtype).tobytes())
+            f.seek((cap - n) * np.dtype(dtype).itemsize, 1)
+        f.truncate()
+
+    tmp.replace(path)
+
+
+def append_barfile(df: pd.DataFrame, path: Path) -> None:
+    """
+    Append bars that all follow the file's last bar.
+
+    Within the reserved capacity the bars are written in place and the
+    header's bar count is updated last, so a reader never counts a bar that
+    is not written yet. A full (or pre-version-3) file is rewritten once
+    with double the room.
+    """
+    _check_sorted(df)
+    if df.empty:
+        return
+
+    version, n, cap = _read_header(path)
+    bars = open_barfile(path)
+    if n and df.index[0].as_unit("ns").value <= bars["ts"][-1]:
+        raise ValueError("Appended bars must follow the last bar of the file")
+
+    if version < VERSION or n + len(df) > cap:
+        old = bar_slice(bars, 0, n, columns=FIELDS)
+        del bars
+        write_barfile(pd.concat([old, df[FIELDS]]), path, capacity=2 * (n + len(df)))
+        return
+    del bars
+
+    arrays = _arrays(df)
+    with open(path, "r+b") as f:
+        offset = HEADER_BYTES
+        for c, dtype in _columns(VERSION):
+            width = np.dtype(dtype).itemsize
+            f.seek(offset + n * width)
+            f.write(arrays[c].astype(dtype).tobytes())
+            offset += cap * width
+        f.flush()
+        f.seek(0)
+        f.write(_header_bytes(n + len(df), cap))
+
+
+def open_barfile(path: Path) -> dict:
+    """
+    Map a bar file read-only.
+
+    Returns {"n", "ts", "open", "high", "low", "close"} plus, for version 2+
+    files, {"trade_date", "minute", "session"}; the arrays are np.memmap
+    views of the n valid bars in the one mapping.
+    """
+    version, n, cap = _read_header(path)
+    columns = _columns(version)
+    out = {"n": n}
+
+    if n == 0:
+        out.update({c: np.array([], dtype=dtype) for c, dtype in columns})
+        return out
+
+    # One mapping; every column is a slice of it
+    mm = np.memmap(path, dtype=np.uint8, mode="r", offset=HEADER_BYTES)
+    offset = 0
+    for c, dtype in columns:
+        width = np.dtype(dtype).itemsize
+        out[c] = mm[offset:offset + width * n].view(dtype)
+        offset += width * cap
+
+    return out
+
+
+def _bound(ts, side: str) -> int:
+    """Bound as UTC epoch ns; strings follow pandas partial-string slicing."""
+    if isinstance(ts, str):
+        period = pd.Period(ts)
+        ts = period.start_time if side == "start" else period.end_time
+    ts = pd.Timestamp(ts)
+    ts = ts.tz_localize(NY_TZ) if ts.tz is None else ts
+    return ts.as_unit("ns").value
+
+
+def read_barfile(path: Path, columns=None, start=None, end=None) -> pd.DataFrame:
+    """
+    NY-indexed OHLC (+ clock) frame over a mapped bar file.
+
+    start / end are inclusive (str / Timestamp, naive values are NY time) and
+    resolve to a binary search on ts, so only the requested rows are paged in.
+    Columns are views of the mapping, not copies.
+    """
+    bars = open_barfile(path)
+    lo, hi = bar_range(bars, start, end)
+    return bar_slice(bars, lo, hi, columns)
+
+
+def bar_range(bars: dict, start=None, end=None) -> tuple[int, int]:
+    """Row positions [lo, hi) of the bars between start and end (inclusive)."""
+    ts = bars["ts"]
+    lo = 0 if start is None else int(np.searchsorted(ts, _bound(start, "start"), side="left"))
+    hi = len(ts) if end is None else int(np.searchsorted(ts, _bound(end, "end"), side="right"))
+    return lo, hi
+
+
+def bar_slice(bars: dict, lo: int, hi: int, columns=None) -> pd.DataFrame:
+    """NY-indexed frame over rows [lo, hi) of an open_barfile mapping (views, no copy)."""
+    columns = list(FIELDS if columns is None else columns)
+    unknown = set(columns) - set(FIELDS) - set(CLOCK)
+    if unknown:
+        raise ValueError(f"Unknown columns: {sorted(unknown)}")
+
+    ts = bars["ts"]
+    index = pd.DatetimeIndex(np.asarray(ts[lo:hi]).view("datetime64[ns]")).tz_localize("UTC").tz_convert(NY_TZ)
+    index.name = "timestamp"
+
+    cols = {c: np.asarray(bars[c][lo:hi]) for c in columns if c in bars}
+
+    # Version 1 files have no clock arrays: derive them from the index
+    if len(cols) < len(columns):
+        clock = clock_columns(index)
+        cols.update({c: clock[c] for c in columns if c not in cols})
+
+    return pd.DataFrame({c: cols[c] for c in columns}, index=index, copy=False)
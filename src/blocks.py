@@ -0,0 +1,195 @@
+"""
+Out-of-core iteration over the bar history, a few whole days at a time.
+
+    for df, days in iter_day_blocks(days_per_block=20):
+        ...
+
+    result = reduce_blocks(run_close_vs_wick_test, iter_day_blocks())
+
+From the memory-mapped bar file every block is a view of the mapping (no
+parse, no copy); from the Parquet store one month partition is read at a
+time. Peak memory is one block plus whatever mapped pages the OS has not
+yet evicted, however long the history is.
+
+Every hypothesis is day-local, so it can run on each block separately and
+have the partial results merged (merge_partials: counts add, lists and
+frames concatenate). Hypotheses that report ratios expose their raw counts
+and a finalize step instead (e.g. am_macro_range_counts / _rates).
+"""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.barfile import bar_range, bar_slice, open_barfile
+from src.day_index import CLOCK, ROLLOVER, bar_clock, frame_day_index, hhmm_to_minute
+from src.loader import SYMBOL, data_source, load_5m_indexed
+from src.store import _as_ny, _partitions, read_store
+
+NY_TZ = "America/New_York"
+OHLC = ["open", "high", "low", "close"]
+
+DAYS_PER_BLOCK = 20
+
+# Bars scanned per step when locating day boundaries in the bar file
+CHUNK_BARS = 1_000_000
+
+
+# =========================
+# Block sources
+# =========================
+def _day_starts(bars: dict, lo: int, hi: int, chunk_bars: int = CHUNK_BARS) -> np.ndarray:
+    """Positions in [lo, hi) where a new NY day starts, scanned chunk by chunk."""
+    rollover = hhmm_to_minute(ROLLOVER)
+    starts = []
+    prev = None
+
+    for a in range(lo, hi, chunk_bars):
+        b = min(a + chunk_bars, hi)
+        if "minute" in bars:
+            minute = np.asarray(bars["minute"][a:b], dtype=np.int64)
+            day = np.asarray(bars["trade_date"][a:b], dtype=np.int64) - (minute >= rollover)
+        else:
+            day, _ = bar_clock(bar_slice(bars, a, b, columns=[]).index)
+
+        new = np.r_[prev is None or day[0] != prev, day[1:] != day[:-1]]
+        starts.append(np.flatnonzero(new) + a)
+        prev = day[-1]
+
+    return np.concatenate(starts) if starts else np.array([], dtype=np.int64)
+
+
+def _split(df: pd.DataFrame, days: dict, days_per_block: int):
+    """Cut an indexed frame into blocks of whole days (positional views)."""
+    for d0 in range(0, len(days["start"]), days_per_block):
+        d1 = min(d0 + days_per_block, len(days["start"]))
+        lo, hi = days["start"][d0], days["stop"][d1 - 1]
+        block = df.iloc[lo:hi]
+        yield block, frame_day_index(block)
+
+
+def _barfile_blocks(path: Path, days_per_block: int, start, end):
+    bars = open_barfile(path)
+    lo, hi = bar_range(bars, start, end)
+    starts = _day_starts(bars, lo, hi)
+    bounds = np.r_[starts[::days_per_block], hi]
+
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        full = bar_slice(bars, int(a), int(b), columns=OHLC + CLOCK)
+        yield full[OHLC], frame_day_index(full)
+
+
+def _store_blocks(root: Path, days_per_block: int, start, end):
+    start = None if start is None else _as_ny(start, "start")
+    end = None if end is None else _as_ny(end, "end")
+
+    # Partitions are NY calendar months, so no day spans two of them
+    for year, month in _partitions(root):
+        period = pd.Period(f"{year}-{month:02d}")
+        lo = period.start_time.tz_localize(NY_TZ)
+        hi = period.end_time.tz_localize(NY_TZ)
+        if start is not None and hi < start:
+            continue
+        if end is not None and lo > end:
+            break
+
+        full = read_store(
+            root,
+            columns=OHLC + CLOCK,
+            start=lo if start is None else max(lo, start),
+            end=hi if end is None else min(hi, end),
+        ).dropna()
+        if full.empty:
+            continue
+
+        yield from _split(full[OHLC], frame_day_index(full), days_per_block)
+
+
+def iter_day_blocks(
+    source: Path | None = None,
+    days_per_block: int = DAYS_PER_BLOCK,
+    start=None,
+    end=None,
+    symbol: str = SYMBOL,
+):
+    """
+    Yield (df, days) for consecutive blocks of whole NY days.
+
+    df is NY-indexed OHLC, days its build_day_index result. source defaults
+    to the processed bars the loaders use for symbol (bar file, Parquet
+    store, CSV); the CSV has no out-of-core path and is loaded once, then
+    cut into blocks. start / end are inclusive (naive values are NY time).
+    """
+    if days_per_block < 1:
+        raise ValueError("days_per_block must be >= 1")
+
+    source = data_source(symbol) if source is None else source
+
+    if source.suffix == ".bars":
+        yield from _barfile_blocks(source, days_per_block, start, end)
+    elif source.is_dir():
+        yield from _store_blocks(source, days_per_block, start, end)
+    else:
+        df, days = load_5m_indexed(start=start, end=end, symbol=symbol)
+        yield from _split(df, days, days_per_block)
+
+
+# =========================
+# Reduction
+# =========================
+def merge_partials(a, b, add_lists: bool = False):
+    """
+    Combine two partial results of the same hypothesis:
+    numbers add, lists concatenate (per-trade values), dicts and tuples
+    merge element-wise, DataFrames stack; labels (strings, lists of
+    strings) are taken from the first.
+
+    add_lists: lists are fixed-length count vectors, added element-wise.
+    """
+    if a is None:
+        return b
+    if b is None:
+        return a
+    if isinstance(a, dict):
+        return {k: merge_partials(a.get(k), b.get(k), add_lists) for k in {**a, **b}}
+    if isinstance(a, tuple):
+        return tuple(merge_partials(x, y, add_lists) for x, y in zip(a, b))
+    if isinstance(a, list):
+        if any(isinstance(v, str) for v in a):
+            return a
+        if add_lists:
+            return [merge_partials(x, y, add_lists) for x, y in zip(a, b)]
+        return a + b
+    if isinstance(a, pd.DataFrame):
+        if b.empty:
+            return a
+        if a.empty:
+            return b
+        return pd.concat([a, b], ignore_index=isinstance(a.index, pd.RangeIndex))
+    if isinstance(a, (bool, np.bool_)):
+        return a
+    if isinstance(a, (int, float, np.number)):
+        return a + b
+    return a
+
+
+def merge_counts(a, b):
+    """merge_partials for results whose lists are count vectors."""
+    return merge_partials(a, b, add_lists=True)
+
+
+def reduce_blocks(fn, blocks, finalize=None, merge=merge_partials, **kwargs):
+    """
+    Run fn(df, days=days, **kwargs) on every block and fold the partial
+    results with merge. finalize (optional) turns the merged value into
+    the hypothesis' reported form. Only one block is alive at a time.
+    """
+    acc = None
+    for df, days in blocks:
+        acc = merge(acc, fn(df, days=days, **kwargs))
+    return acc if finalize is None else finalize(acc)
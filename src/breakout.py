@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+
+from src.day_index import (
+    build_day_index,
+    first_per_day,
+    hhmm_to_minute,
+    last_per_day,
+    max_per_day,
+    min_per_day,
+)
+from src.ticks import price_array
+
+# -----------------------------------
+# Defaults (the 10AM macro range)
+# -----------------------------------
+RANGE_START = "09:50"
+RANGE_END   = "10:10"
+SESSION_END = "12:00"
+
+
+def find_breakouts(
+    df: pd.DataFrame,
+    range_start: str = RANGE_START,
+    range_end: str = RANGE_END,
+    search_end: str | None = SESSION_END,
+    range_inclusive: str = "both",
+    days: dict | None = None,
+) -> pd.DataFrame:
+    """
+    First breakout of an intraday range, for every day at once.
+
+    range_inclusive:
+      "both" -> range is [range_start, range_end], search starts after range_end
+      "left" -> range is [range_start, range_end), search starts at range_end
+
+    The search window ends at search_end (inclusive), or at the end of the
+    calendar day when search_end is None.
+
+    Returns one row per calendar day (index = date) with:
+      range_high / range_low     NaN when the day has no range bars
+      range_start / range_stop   bar positions [start, stop) of the range
+      after_start / after_stop   bar positions [start, stop) of the search window
+      wick_pos / wick_dir        first bar with high > range_high or low < range_low
+                                 (+1 up, -1 down, 0 none; up wins a two-sided bar)
+      wick_close                 that bar also CLOSED beyond the broken side
+      wick_ambiguous             that bar breached both sides
+      close_pos / close_dir      first close-confirmed breakout
+
+    All positions index into df (iloc), -1 where missing. For a tick_frame
+    the scans run on the int32 ticks and range_high / range_low are in ticks.
+
+    days: precomputed build_day_index(df.index), to share across calls.
+    """
+    if range_inclusive not in {"both", "left"}:
+        raise ValueError("range_inclusive must be 'both' or 'left'")
+
+    if days is None:
+        days = build_day_index(df.index)
+
+    codes = days["code"]
+    minute = days["minute"]
+    n_days = len(days["start"])
+
+    high = price_array(df, "high")
+    low = price_array(df, "low")
+    close = price_array(df, "close")
+
+    rs = hhmm_to_minute(range_start)
+    re = hhmm_to_minute(range_end)
+
+    if range_inclusive == "both":
+        in_range = (minute >= rs) & (minute <= re)
+        after = minute > re
+    else:
+        in_range = (minute >= rs) & (minute < re)
+        after = minute >= re
+
+    if search_end is not None:
+        after &= minute <= hhmm_to_minute(search_end)
+
+    # -----------------------------
+    # Range high / low per day
+    # -----------------------------
+    range_high = max_per_day(high, in_range, codes, n_days)
+    range_low = min_per_day(low, in_range, codes, n_days)
+
+    range_first = first_per_day(in_range, codes, n_days)
+    range_last = last_per_day(in_range, codes, n_days)
+
+    # Search window only counts on days that have a range
+    after &= range_first[codes] >= 0
+    after_first = first_per_day(after, codes, n_days)
+    after_last = last_per_day(after, codes, n_days)
+
+    # NaN levels on range-less days compare False everywhere
+    rh = range_high[codes]
+    rl = range_low[codes]
+
+    up_wick = after & (high > rh)
+    dn_wick = after & (low < rl)
+    up_close = after & (close > rh)
+    dn_close = after & (close < rl)
+
+    # -----------------------------
+    # First wick breach
+    # -----------------------------
+    wick_pos = first_per_day(up_wick | dn_wick, codes, n_days)
+    has_wick = wick_pos >= 0
+    wp = np.where(has_wick, wick_pos, 0)
+
+    wick_up = has_wick & up_wick[wp]
+    wick_dir = np.where(has_wick, np.where(wick_up, 1, -1), 0)
+    wick_close = has_wick & np.where(wick_up, up_close[wp], dn_close[wp])
+    wick_ambiguous = has_wick & up_wick[wp] & dn_wick[wp]
+
+    # -----------------------------
+    # First close-confirmed breakout
+    # -----------------------------
+    close_pos = first_per_day(up_close | dn_close, codes, n_days)
+    has_close = close_pos >= 0
+    cp = np.where(has_close, close_pos, 0)
+    close_dir = np.where(has_close, np.where(up_close[cp], 1, -1), 0)
+
+    return pd.DataFrame(
+        {
+            "range_high": range_high,
+            "range_low": range_low,
+            "range_start": range_first,
+            "range_stop": np.where(range_last >= 0, range_last + 1, -1),
+            "after_start": after_first,
+            "after_stop": np.where(after_last >= 0, after_last + 1, -1),
+            "wick_pos": wick_pos,
+            "wick_dir": wick_dir,
+            "wick_close": wick_close,
+            "wick_ambiguous": wick_ambiguous,
+            "close_pos": close_pos,
+            "close_dir": close_dir,
+        },
+        index=pd.Index(days["dates"], name="date"),
+    )
+
+
+# -----------------------------------
+# Retrace limit entries off the breakout candle
+# -----------------------------------
+STOP_MODES = ["extreme", "range"]
+
+
+def retrace_entries(df: pd.DataFrame, bo: pd.DataFrame, retrace: float = 0.5, stop_mode: str = "extreme") -> dict:
+    """
+    Limit entry at a retrace of the first close-confirmed breakout candle
+    (c0), for every day with one.
+
+      entry = c0 close - dir * retrace * |c0 close - c0 extreme|
+      stop_mode "extreme": stop at c0's far extreme (low for longs)
+                "range":   stop at the opposite side of the range
+
+    Returns arrays over breakout days:
+      day           row of the day in bo
+      pos0 / end    c0 position / end of the search window (exclusive)
+      sign          +1 long, -1 short
+      entry / stop / risk
+      ok            a bar after c0, a non-zero c0 and positive risk
+    """
+    if stop_mode not in STOP_MODES:
+        raise ValueError(f"stop_mode must be one of {STOP_MODES}")
+
+    high = price_array(df, "high")
+    low = price_array(df, "low")
+    close = price_array(df, "close")
+
+    day = np.flatnonzero(bo["close_pos"].to_numpy() >= 0)
+    pos0 = bo["close_pos"].to_numpy()[day]
+    end = bo["after_stop"].to_numpy()[day]
+    sign = bo["close_dir"].to_numpy()[day]
+
+    # Long: full = close - low, Short: full = high - close
+    extreme = np.where(sign > 0, low[pos0], high[pos0])
+    full = sign * (close[pos0] - extreme)
+    entry = close[pos0] - sign * retrace * full
+
+    if stop_mode == "extreme":
+        stop = extreme
+    else:
+        stop = np.where(sign > 0, bo["range_low"].to_numpy()[day], bo["range_high"].to_numpy()[day])
+
+    # True risk after limit entry
+    risk = np.abs(entry - stop)
+
+    return {
+        "day": day,
+        "pos0": pos0,
+        "end": end,
+        "sign": sign,
+        "entry": entry,
+        "stop": stop,
+        "risk": risk,
+        "ok": (pos0 + 1 < end) & (full > 0) & (risk > 0),
+    }
@@ -0,0 +1,259 @@
+"""
+Content-hashed build of the data pipeline.
+
+    python src/build.py              # rebuild whatever is out of date
+    python src/build.py trades       # one target (and anything it needs)
+    python src/build.py --force nq_1h
+    python src/build.py --status
+
+Each target records the sha256 of its inputs, its parameters and the sha256
+of its outputs in data/processed/build_manifest.json. A target is skipped
+when all three still match, so touching one raw part only rebuilds the
+stages downstream of it.
+"""
+import argparse
+import importlib
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.loader import content_hash
+
+RAW = ROOT / "data" / "raw"
+PROCESSED = ROOT / "data" / "processed"
+MANIFEST = PROCESSED / "build_manifest.json"
+
+
+# =========================
+# Targets
+# =========================
+def _merge_parts():
+    return importlib.import_module("src.merge_parts")
+
+
+def _strategy():
+    return importlib.import_module("hypotheses.strategy_backtest")
+
+
+def _nq_5m():
+    mp = _merge_parts()
+    # Same part discovery as merge_parts --incremental, so an incrementally
+    # ingested part is an input of the full rebuild too; with no part at all
+    # the pattern itself is reported as the missing input
+    try:
+        files = mp.raw_files()
+    except FileNotFoundError:
+        files = []
+    return {
+        "deps": [],
+        "inputs": ([RAW / f for f in files] or [RAW / "nq_5m_*.csv"]) + [
+            ROOT / "src" / name
+            for name in (
+                "merge_parts.py", "load_data.py", "store.py", "barfile.py",
+                "day_index.py", "ticks.py", "loader.py",
+            )
+        ],
+        "params": {"files": files, "precedence": mp.PRECEDENCE},
+        "outputs": [PROCESSED / "nq_5m_clean.csv", PROCESSED / "nq_5m", PROCESSED / "nq_5m.bars"],
+        "run": mp.main,
+    }
+
+
+def _nq_1h():
+    return {
+        "deps": [],
+        "inputs": [RAW / "nq_1h.csv", ROOT / "src" / "nq_1h_clean.py"],
+        "params": {},
+        "outputs": [PROCESSED / "nq_1h_clean.csv"],
+        "run": importlib.import_module("src.nq_1h_clean").main,
+    }
+
+
+def _trades():
+    sb = _strategy()
+    return {
+        "deps": ["nq_5m"],
+        "inputs": [
+            PROCESSED / "nq_5m.bars",
+            ROOT / "hypotheses" / "strategy_backtest.py",
+            ROOT / "src" / "breakout.py",
+            ROOT / "src" / "resolver.py",
+            ROOT / "src" / "sessions.py",
+            ROOT / "src" / "day_index.py",
+            ROOT / "src" / "ticks.py",
+            ROOT / "src" / "loader.py",
+        ],
+        "params": {
+            "range": [sb.RANGE_START, sb.RANGE_END],
+            "session": [sb.SESSION_START, sb.SESSION_END],
+            "r_targets": sb.R_TARGETS,
+        },
+        "outputs": [PROCESSED / "final_strategy_trades.csv"],
+        "run": sb.main,
+    }
+
+
+# name -> spec factory, in dependency order
+TARGETS = {
+    "nq_5m": _nq_5m,
+    "nq_1h": _nq_1h,
+    "trades": _trades,
+}
+
+
+# =========================
+# Manifest
+# =========================
+def read_manifest() -> dict:
+    if not MANIFEST.exists():
+        return {}
+    return json.loads(MANIFEST.read_text())
+
+
+def write_manifest(manifest: dict) -> None:
+    MANIFEST.parent.mkdir(parents=True, exist_ok=True)
+    MANIFEST.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+
+
+def _hashes(paths) -> dict:
+    """Relative path -> sha256 (None when the path is missing)."""
+    return {
+        str(p.relative_to(ROOT)): content_hash(p) if p.exists() else None
+        for p in paths
+    }
+
+
+def missing_inputs(spec: dict) -> list[str]:
+    """Inputs that do not exist and that no dependency writes (e.g. an absent raw export)."""
+    produced = {p for d in spec["deps"] for p in TARGETS[d]()["outputs"]}
+    return [str(p.relative_to(ROOT)) for p in spec["inputs"] if not p.exists() and p not in produced]
+
+
+def _blocked(spec: dict, skipped) -> str | None:
+    """Why a target cannot be built now, or None."""
+    behind = [d for d in spec["deps"] if d in skipped]
+    if behind:
+        return f"dependency skipped: {behind}"
+    missing = missing_inputs(spec)
+    if missing:
+        return f"missing inputs: {missing}"
+    return None
+
+
+def stale_reason(name: str, spec: dict, manifest: dict) -> str | None:
+    """Why a target must be rebuilt, or None when it is up to date."""
+    rec = manifest.get(name)
+    if rec is None:
+        return "never built"
+
+    inputs = _hashes(spec["inputs"])
+    if rec["params"] != spec["params"]:
+        return "parameters changed"
+    changed = [p for p, h in inputs.items() if rec["inputs"].get(p) != h]
+    if changed:
+        return f"inputs changed: {changed}"
+    if rec["outputs"] != _hashes(spec["outputs"]):
+        return "outputs missing or modified"
+    return None
+
+
+# =========================
+# Build
+# =========================
+def _closure(names) -> list[str]:
+    """Requested targets plus their dependencies, in TARGETS order."""
+    want = set()
+    stack = list(names)
+    while stack:
+        name = stack.pop()
+        if name not in want:
+            want.add(name)
+            stack.extend(TARGETS[name]()["deps"])
+    return [n for n in TARGETS if n in want]
+
+
+def build(names=None, force: bool = False) -> list[str]:
+    """
+    Bring targets up to date; returns the names that were rebuilt.
+
+    A target whose inputs are missing is skipped and reported, together with
+    everything downstream of it, instead of aborting the whole build.
+    """
+    manifest = read_manifest()
+    built = []
+    skipped = set()
+
+    for name in _closure(names or list(TARGETS)):
+        spec = TARGETS[name]()
+        blocked = _blocked(spec, skipped)
+        if blocked:
+            print(f"[{name}] skipped ({blocked})")
+            skipped.add(name)
+            continue
+
+        reason = "forced" if force else stale_reason(name, spec, manifest)
+
+        if reason is None:
+            print(f"[{name}] up to date")
+            continue
+
+        print(f"[{name}] rebuilding ({reason})")
+        spec["run"]()
+
+        manifest[name] = {
+            "inputs": _hashes(spec["inputs"]),
+            "params": spec["params"],
+            "outputs": _hashes(spec["outputs"]),
+            "built": datetime.now().isoformat(timespec="seconds"),
+        }
+        write_manifest(manifest)
+        built.append(name)
+
+    return built
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("targets", nargs="*", help=f"targets to build (default all: {', '.join(TARGETS)})")
+    parser.add_argument("--force", action="store_true", help="rebuild even if up to date")
+    parser.add_argument("--status", action="store_true", help="report what is stale and exit")
+    args = parser.parse_args(argv)
+
+    unknown = [t for t in args.targets if t not in TARGETS]
+    if unknown:
+        parser.error(f"unknown targets: {unknown}")
+
+    # merge_parts and strategy_backtest use paths relative to the project root
+    os.chdir(ROOT)
+
+    if args.status:
+        manifest = read_manifest()
+        stale, skipped = set(), set()
+        for name in _closure(args.targets or list(TARGETS)):
+            spec = TARGETS[name]()
+            blocked = _blocked(spec, skipped)
+            if blocked:
+                skipped.add(name)
+                print(f"{name}: cannot build ({blocked})")
+                continue
+
+            # A stale dependency will rewrite this target's inputs
+            behind = [d for d in spec["deps"] if d in stale]
+            reason = f"dependency stale: {behind}" if behind else stale_reason(name, spec, manifest)
+            if reason:
+                stale.add(name)
+            print(f"{name}: {reason or 'up to date'}")
+        return
+
+    built = build(args.targets, force=args.force)
+    print(f"\nRebuilt: {', '.join(built) if built else 'nothing'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Checkpointed, resumable jobs: an append-only results store plus a manifest.
+
+    <root>/manifest.json           job parameters and the ordered unit list
+    <root>/parts/unit-00042.parquet   results of one finished work unit
+
+A long sweep is split into work units (a range window, a (symbol,
+hypothesis) pair, ...). Each finished unit is written as its own Parquet
+part, atomically (temp file + rename), the moment it completes. A part is
+never rewritten, so a crash or Ctrl-C loses at most the units in flight.
+Restarting the same job against the same root skips every unit that
+already has a part and only runs the rest.
+
+    job = open_job(root, params, units)
+    for unit in pending(root, job):
+        write_unit(root, job, unit, table)
+    table = read_results(root, job)
+
+The manifest pins the parameters: reopening a root with different
+parameters or units raises instead of mixing results of two jobs.
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+MANIFEST = "manifest.json"
+PARTS = "parts"
+
+
+def _part_path(root: Path, job: dict, unit: str) -> Path:
+    return root / PARTS / f"unit-{job['units'].index(unit):05d}.parquet"
+
+
+def open_job(root: Path, params: dict, units) -> dict:
+    """
+    Create the manifest for a new job, or load and check an existing one.
+
+    params must be JSON-serializable; units are unique string keys in the
+    order results are read back.
+    """
+    units = [str(u) for u in units]
+    if len(set(units)) != len(units):
+        raise ValueError("Duplicate work units")
+
+    # Round-trip so tuples compare equal to the lists a reload returns
+    params = json.loads(json.dumps(params))
+    path = root / MANIFEST
+
+    if path.exists():
+        job = json.loads(path.read_text())
+        if job["params"] != params or job["units"] != units:
+            raise ValueError(f"Checkpoint {root} belongs to a different job (parameters or units differ)")
+        return job
+
+    job = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "params": params,
+        "units": units,
+    }
+    (root / PARTS).mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(job, indent=2))
+    tmp.replace(path)
+    return job
+
+
+def done_units(root: Path, job: dict) -> list:
+    """Units whose results are on disk, in manifest order."""
+    return [u for u in job["units"] if _part_path(root, job, u).exists()]
+
+
+def pending(root: Path, job: dict) -> list:
+    """Units still to run, in manifest order."""
+    done = set(done_units(root, job))
+    return [u for u in job["units"] if u not in done]
+
+
+def write_unit(root: Path, job: dict, unit: str, table: pd.DataFrame) -> None:
+    """Append the results of one finished unit (atomic; never overwritten)."""
+    path = _part_path(root, job, str(unit))
+    if path.exists():
+        raise FileExistsError(f"Unit already written: {unit}")
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    pq.write_table(pa.Table.from_pandas(table, preserve_index=False), tmp)
+    tmp.replace(path)
+
+
+def read_results(root: Path, job: dict, units=None) -> pd.DataFrame:
+    """Results of the finished units (default all), concatenated in manifest order."""
+    units = done_units(root, job) if units is None else [str(u) for u in units]
+    tables = [pq.read_table(_part_path(root, job, u)).to_pandas() for u in units]
+    if not tables:
+        return pd.DataFrame()
+    return pd.concat(tables, ignore_index=True)
@@ -0,0 +1,180 @@
+import numpy as np
+import pandas as pd
+
+MINUTES_PER_DAY = 24 * 60
+
+# CME Globex: the session opening at 18:00 NY belongs to the next trade date
+ROLLOVER = "18:00"
+
+# Intraday session segments (NY clock, [start, end)), code = position
+SESSIONS = [
+    ("asia", "18:00", "02:00"),
+    ("london", "02:00", "09:30"),
+    ("ny", "09:30", "16:00"),
+    ("close", "16:00", "18:00"),
+]
+
+# Per-bar columns written at ingest (see clock_columns)
+CLOCK = ["minute", "trade_date", "session"]
+
+
+def hhmm_to_minute(hhmm: str) -> int:
+    """'09:50' -> 590"""
+    h, m = hhmm.split(":")
+    return int(h) * 60 + int(m)
+
+
+def bar_clock(index: pd.DatetimeIndex):
+    """
+    Wall-clock day number and minute-of-day for every bar.
+
+    The index must already be converted to the session timezone
+    (America/New_York) and sorted. Dropping the tz keeps the local wall
+    time, so both values are DST-correct.
+    """
+    local = index.tz_localize(None) if index.tz is not None else index
+    minutes = local.values.astype("datetime64[m]").astype(np.int64)
+    return minutes // MINUTES_PER_DAY, minutes % MINUTES_PER_DAY
+
+
+def clock_columns(index: pd.DatetimeIndex) -> dict:
+    """
+    Integer clock columns stored with the bars at ingest, so readers never
+    redo the tz conversion:
+
+      minute      int16  NY minute-of-day (DST-correct wall clock)
+      trade_date  int32  CME trade date as days since 1970-01-01
+                         (bars at/after 18:00 roll to the next date)
+      session     int8   index into SESSIONS (asia / london / ny / close)
+    """
+    day, minute = bar_clock(index)
+    rollover = hhmm_to_minute(ROLLOVER)
+
+    # Segments tile the clock, so each starts where the previous one ends:
+    # bin the minute by start times, the bin before the first start wraps
+    starts = np.array([hhmm_to_minute(start) for _, start, _ in SESSIONS])
+    order = np.argsort(starts)
+    lut = np.r_[order[-1], order].astype(np.int8)
+    session = lut[np.searchsorted(starts[order], minute, side="right")]
+
+    return {
+        "minute": minute.astype(np.int16),
+        "trade_date": (day + (minute >= rollover)).astype(np.int32),
+        "session": session,
+    }
+
+
+def day_codes(day: np.ndarray):
+    """
+    Dense 0..n_days-1 code per bar plus the position of each day's first bar.
+    Assumes bars are time-sorted, so each day is one contiguous block.
+    """
+    starts = np.flatnonzero(np.r_[True, day[1:] != day[:-1]]) if len(day) else np.array([], dtype=np.int64)
+    codes = np.zeros(len(day), dtype=np.int64)
+    codes[starts[1:]] = 1
+    codes = np.cumsum(codes)
+    return codes, starts
+
+
+def build_day_index(index: pd.DatetimeIndex, clock: dict | None = None) -> dict:
+    """
+    Per-day bar offsets for a sorted NY-time index, built once and shared
+    by every hypothesis run on the same frame.
+
+    clock: the stored minute / trade_date columns (clock_columns), which
+    skip the tz conversion entirely. Days are NY calendar days either way.
+
+      dates   (n_days,)  datetime.date of each day
+      start   (n_days,)  int64 position of the day's first bar
+      stop    (n_days,)  int64 position one past the day's last bar
+      code    (n_bars,)  int64 day number 0..n_days-1 of each bar
+      minute  (n_bars,)  int16 NY minute-of-day of each bar
+
+    Day d is df.iloc[start[d]:stop[d]] (a view, no copy). Clock windows
+    are integer compares on minute instead of between_time.
+    """
+    if clock is None:
+        day, minute = bar_clock(index)
+    else:
+        minute = np.asarray(clock["minute"], dtype=np.int64)
+        day = np.asarray(clock["trade_date"], dtype=np.int64) - (minute >= hhmm_to_minute(ROLLOVER))
+    code, start = day_codes(day)
+    stop = np.r_[start[1:], len(index)].astype(np.int64)
+
+    dates = pd.Index(day[start].astype("datetime64[D]")).date if len(start) else np.array([], dtype=object)
+
+    return {
+        "dates": dates,
+        "start": start.astype(np.int64),
+        "stop": stop,
+        "code": code,
+        "minute": minute.astype(np.int16),
+    }
+
+
+def frame_day_index(df: pd.DataFrame) -> dict:
+    """build_day_index for a frame, from its stored clock columns when it has them."""
+    if "minute" in df.columns and "trade_date" in df.columns:
+        return build_day_index(df.index, clock={c: df[c].to_numpy() for c in ("minute", "trade_date")})
+    return build_day_index(df.index)
+
+
+def window(days: dict, start: str, end: str, inclusive: str = "left") -> np.ndarray:
+    """
+    Bar mask for a clock window, same bounds semantics as between_time.
+    """
+    m = days["minute"]
+    lo = hhmm_to_minute(start)
+    hi = hhmm_to_minute(end)
+    left = m >= lo if inclusive in {"left", "both"} else m > lo
+    right = m <= hi if inclusive in {"right", "both"} else m < hi
+    return left & right
+
+
+def first_per_day(mask: np.ndarray, codes: np.ndarray, n_days: int) -> np.ndarray:
+    """Position of the first True bar per day, -1 where there is none."""
+    out = np.full(n_days, -1, dtype=np.int64)
+    idx = np.flatnonzero(mask)
+    if len(idx):
+        c = codes[idx]
+        first = np.r_[True, c[1:] != c[:-1]]
+        out[c[first]] = idx[first]
+    return out
+
+
+def last_per_day(mask: np.ndarray, codes: np.ndarray, n_days: int) -> np.ndarray:
+    """Position of the last True bar per day, -1 where there is none."""
+    out = np.full(n_days, -1, dtype=np.int64)
+    idx = np.flatnonzero(mask)
+    if len(idx):
+        c = codes[idx]
+        last = np.r_[c[1:] != c[:-1], True]
+        out[c[last]] = idx[last]
+    return out
+
+
+def any_per_day(mask: np.ndarray, codes: np.ndarray, n_days: int) -> np.ndarray:
+    """True for every day that has at least one True bar."""
+    return np.bincount(codes[mask], minlength=n_days) > 0
+
+
+def max_per_day(values: np.ndarray, mask: np.ndarray, codes: np.ndarray, n_days: int) -> np.ndarray:
+    """Max of values over masked bars per day, NaN where there are none."""
+    out = np.full(n_days, np.nan)
+    idx = np.flatnonzero(mask)
+    if len(idx):
+        c = codes[idx]
+        seg = np.flatnonzero(np.r_[True, c[1:] != c[:-1]])
+        out[c[seg]] = np.maximum.reduceat(values[idx], seg)
+    return out
+
+
+def min_per_day(values: np.ndarray, mask: np.ndarray, codes: np.ndarray, n_days: int) -> np.ndarray:
+    """Min of values over masked bars per day, NaN where there are none."""
+    out = np.full(n_days, np.nan)
+    idx = np.flatnonzero(mask)
+    if len(idx):
+        c = codes[idx]
+        seg = np.flatnonzero(np.r_[True, c[1:] != c[:-1]])
+        out[c[seg]] = np.minimum.reduceat(values[idx], seg)
+    return out
@@ -1,15 +1,33 @@
+import shutil
+import sys
 import pandas as pd
 from pathlib import Path
 
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.store import read_store, write_store
+
 NY_TZ = "America/New_York"
 
+CHUNK_ROWS = 500_000
+
+OHLC = ["open", "high", "low", "close"]
+
+# Explicit schema for the fast path: epoch seconds + float prices
+SCHEMA = {"time": "int64", **{c: "float64" for c in OHLC}}
+
 
 def load_tradingview_csv(path: Path) -> pd.DataFrame:
     if not path.exists():
         raise FileNotFoundError(path)
 
-    df = pd.read_csv(path)
+    return _clean(pd.read_csv(path))
 
+
+def _clean(df: pd.DataFrame) -> pd.DataFrame:
+    """Raw TradingView rows -> NY-indexed, sorted, numeric OHLC."""
     # Normalize column names
     df.columns = [c.strip().lower() for c in df.columns]
 
@@ -38,3 +56,107 @@ def load_tradingview_csv(path: Path) -> pd.DataFrame:
     df = df.dropna(subset=["open", "high", "low", "close"])
 
     return df
+
+
+def read_tradingview_fast(path: Path) -> pd.DataFrame:
+    """
+    Typed fast path of load_tradingview_csv.
+
+    Parses with the multi-threaded pyarrow CSV engine and an explicit schema
+    for time + OHLC, so those are never object-inferred or coerced: a
+    malformed value raises instead of silently becoming NaN. The remaining
+    columns (volume, indicators) are carried through with inferred types,
+    so both paths emit the same columns.
+    """
+    if not path.exists():
+        raise FileNotFoundError(path)
+
+    # Map normalized names back to the header as written
+    header = pd.read_csv(path, nrows=0).columns
+    names = {c.strip().lower(): c for c in header}
+
+    missing = set(SCHEMA) - set(names)
+    if missing:
+        raise ValueError(f"Missing columns: {sorted(missing)}. Columns: {header.tolist()}")
+
+    df = pd.read_csv(
+        path,
+        engine="pyarrow",
+        dtype={names[c]: t for c, t in SCHEMA.items()},
+    )
+    df.columns = [c.strip().lower() for c in df.columns]
+
+    # TradingView exports in UTC
+    index = pd.to_datetime(df["time"].to_numpy(), unit="s", utc=True).tz_convert(NY_TZ)
+    df.index = pd.DatetimeIndex(index, name="timestamp")
+
+    df = df.sort_index()
+    return df.dropna(subset=OHLC)
+
+
+def stream_tradingview_csv(path: Path, chunk_rows: int = CHUNK_ROWS):
+    """
+    Yield cleaned chunks of a TradingView export, chunk_rows raw rows at a time.
+
+    The export must be in time order. Chunks never overlap: bars at or before
+    the end of the previous chunk are dropped as boundary duplicates.
+    """
+    if not path.exists():
+        raise FileNotFoundError(path)
+
+    last = None
+    with pd.read_csv(path, chunksize=chunk_rows) as reader:
+        for raw in reader:
+            df = _clean(raw)
+            df = df[~df.index.duplicated(keep="first")]
+
+            if last is not None:
+                stale = df.index <= last
+                if stale.any():
+                    print(f"  {path.name}: dropping {stale.sum()} bars at/before {last}")
+                    df = df[~stale]
+
+            if df.empty:
+                continue
+
+            last = df.index.max()
+            yield df
+
+
+def ingest_tradingview_csv(path: Path, root: Path, chunk_rows: int = CHUNK_ROWS, on_chunk=None) -> int:
+    """
+    Stream a TradingView export into the partitioned store.
+
+    Chunks are written to an empty staging store next to root
+    (<root>.staging), which is then folded into root one month at a time:
+    the export's bars replace the stored bars they share and every other
+    stored bar of the month is kept, so a partial export never truncates a
+    month. Peak memory is one chunk while staging, one month while folding.
+    on_chunk(df), if given, is called with every cleaned chunk as it is
+    staged. Returns rows ingested.
+    """
+    staging = root.with_name(root.name + ".staging")
+    shutil.rmtree(staging, ignore_errors=True)
+
+    months = set()
+    rows = 0
+
+    for df in stream_tradingview_csv(path, chunk_rows):
+        write_store(df, staging, append=rows > 0)
+        if on_chunk is not None:
+            on_chunk(df)
+        months.update(zip(df.index.year, df.index.month))
+        rows += len(df)
+        print(f"  {path.name}: {rows:,} rows staged")
+
+    for year, month in sorted(months):
+        span = f"{year}-{month:02d}"
+        df = read_store(staging, start=span, end=span)
+        if root.exists():
+            old = read_store(root, start=span, end=span)
+            df = pd.concat([old[~old.index.isin(df.index)], df]).sort_index()
+        write_store(df, root)
+        print(f"  {path.name}: {span} → {root} ({len(df):,} bars)")
+
+    shutil.rmtree(staging, ignore_errors=True)
+    return rows
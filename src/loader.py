@@ -0,0 +1,200 @@
+import hashlib
+from pathlib import Path
+
+import pandas as pd
+
+from src.barfile import read_barfile
+from src.day_index import CLOCK, clock_columns, frame_day_index
+from src.store import read_store
+from src.ticks import TICK_SIZE, tick_frame
+
+NY_TZ = "America/New_York"
+
+ROOT = Path(__file__).resolve().parents[1]
+PROCESSED = ROOT / "data" / "processed"
+
+SYMBOL = "NQ"  # default instrument
+
+DATA_5M = PROCESSED / "nq_5m_clean.csv"
+STORE_5M = PROCESSED / "nq_5m"  # Parquet store written by merge_parts
+BARS_5M = PROCESSED / "nq_5m.bars"  # memory-mapped bar file written by merge_parts
+
+OHLC = ["open", "high", "low", "close"]
+
+# (fingerprint, columns, start, end) -> DataFrame; only the current
+# fingerprint of each path is kept (see _evict_stale)
+_CACHE = {}
+
+# fingerprint -> sha256 hex digest
+_HASHES = {}
+
+
+def fingerprint(path: Path) -> tuple:
+    """
+    (path, mtime, size) of a file, or of every part file in a store
+    directory. Any rewrite of the data changes the fingerprint.
+    """
+    path = path.resolve()
+    if path.is_dir():
+        parts = sorted(path.rglob("*.parquet"))
+        return (
+            str(path),
+            tuple((str(p.relative_to(path)), p.stat().st_mtime_ns, p.stat().st_size) for p in parts),
+        )
+    st = path.stat()
+    return (str(path), st.st_mtime_ns, st.st_size)
+
+
+def _evict_stale(fp: tuple) -> None:
+    """Drop frames and digests cached for earlier versions of fp's path."""
+    for key in [k for k in _CACHE if k[0][0] == fp[0] and k[0] != fp]:
+        del _CACHE[key]
+    for key in [k for k in _HASHES if k[0] == fp[0] and k != fp]:
+        del _HASHES[key]
+
+
+def symbol_files(symbol: str = SYMBOL) -> dict:
+    """
+    Processed 5m outputs of one instrument, partitioned by symbol prefix:
+    <sym>_5m_clean.csv, <sym>_5m/ (Parquet store), <sym>_5m.bars.
+    """
+    s = symbol.lower()
+    return {
+        "csv": PROCESSED / f"{s}_5m_clean.csv",
+        "store": PROCESSED / f"{s}_5m",
+        "bars": PROCESSED / f"{s}_5m.bars",
+    }
+
+
+def symbols() -> list[str]:
+    """Every instrument with processed 5m bars."""
+    found = set()
+    for p in PROCESSED.glob("*_5m*"):
+        if p.name.endswith(("_5m_clean.csv", "_5m.bars")) or (p.is_dir() and p.name.endswith("_5m")):
+            found.add(p.name.split("_5m")[0].upper())
+    return sorted(found)
+
+
+def data_source(symbol: str = SYMBOL) -> Path:
+    """The processed bars the loaders read: bar file, else Parquet store, else the CSV."""
+    files = symbol_files(symbol)
+    source = next((p for p in (files["bars"], files["store"]) if p.exists()), files["csv"])
+
+    if not source.exists():
+        s = symbol.lower()
+        raise FileNotFoundError(
+            f"Expected {s}_5m.bars, {s}_5m/ or {s}_5m_clean.csv in {PROCESSED}. "
+            f"Found: {[p.name for p in PROCESSED.glob('*')]}"
+        )
+    return source
+
+
+def content_hash(path: Path | None = None, symbol: str = SYMBOL) -> str:
+    """
+    sha256 of the processed bars (CSV, or every part file of the store).
+
+    Hashing reads the whole file, so the digest is memoized per stat
+    fingerprint: it is recomputed only after the data is rewritten.
+    """
+    path = data_source(symbol) if path is None else path
+    fp = fingerprint(path)
+
+    if fp not in _HASHES:
+        _evict_stale(fp)
+        h = hashlib.sha256()
+        files = sorted(path.rglob("*.parquet")) if path.is_dir() else [path]
+        for f in files:
+            if path.is_dir():
+                h.update(str(f.relative_to(path)).encode())
+            with open(f, "rb") as fh:
+                for chunk in iter(lambda: fh.read(1 << 20), b""):
+                    h.update(chunk)
+        _HASHES[fp] = h.hexdigest()
+
+    return _HASHES[fp]
+
+
+def _read_csv(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path)
+
+    if "timestamp" not in df.columns:
+        raise ValueError(f"Expected a 'timestamp' column in {path.name}")
+
+    # FORCE UTC → then convert to NY (processed CSV mixes DST offsets)
+    df["timestamp"] = pd.to_datetime(df["timestamp"], utc=True, errors="coerce")
+    df = df.dropna(subset=["timestamp"]).set_index("timestamp").sort_index()
+    df = df.tz_convert(NY_TZ)
+
+    missing = set(OHLC) - set(df.columns)
+    if missing:
+        raise ValueError(f"Missing required columns: {missing}")
+
+    return df[OHLC].dropna()
+
+
+def load_5m(columns=None, start=None, end=None, ticks: bool = False, symbol: str = SYMBOL) -> pd.DataFrame:
+    """
+    Load processed 5m bars (NY time index, float OHLC).
+
+    Maps the binary bar file when present (zero-copy, start / end by binary
+    search), then the Parquet store (columns / start / end pushed down),
+    otherwise nq_5m_clean.csv. Results are memoized per process and
+    keyed by the data fingerprint, so repeated calls never re-parse unless
+    the files on disk change.
+
+    columns may include the integer clock columns (day_index.CLOCK).
+
+    ticks=True returns int32 tick counts of the symbol's tick size instead
+    of float prices (see src.ticks.tick_frame).
+
+    symbol selects the instrument's files (see symbol_files).
+    """
+    cols = tuple(OHLC if columns is None else columns)
+    source = data_source(symbol)
+    fp = fingerprint(source)
+    _evict_stale(fp)
+
+    if ticks:
+        key = (fp, cols, start, end, "ticks")
+        if key not in _CACHE:
+            before = set(_CACHE)
+            _CACHE[key] = tick_frame(load_5m(columns, start, end, symbol=symbol), TICK_SIZE[symbol.upper()])
+
+            # Only the int32 frame is kept: drop the float frames cached on the way
+            for k in set(_CACHE) - before - {key}:
+                del _CACHE[k]
+        return _CACHE[key].copy(deep=False)
+
+    key = (fp, cols, start, end)
+    if key not in _CACHE:
+        if source.suffix == ".bars":
+            df = read_barfile(source, columns=list(cols), start=start, end=end)
+        elif source.is_dir():
+            df = read_store(source, columns=list(cols), start=start, end=end).dropna()
+        else:
+            full_key = (fp, tuple(OHLC), None, None)
+            if full_key not in _CACHE:
+                _CACHE[full_key] = _read_csv(source)
+            df = _CACHE[full_key].loc[start:end, [c for c in cols if c not in CLOCK]]
+
+            # The CSV has no clock columns; derive them
+            if any(c in CLOCK for c in cols):
+                clock = clock_columns(df.index)
+                df = df.assign(**{c: clock[c] for c in cols if c in CLOCK})[list(cols)]
+
+        print(f"Loaded: {source}")
+        _CACHE[key] = df
+
+    # Shallow copy: callers can add columns without touching the cached frame
+    return _CACHE[key].copy(deep=False)
+
+
+def load_5m_indexed(start=None, end=None, symbol: str = SYMBOL):
+    """OHLC bars plus their day index, built from the stored clock columns."""
+    full = load_5m(columns=OHLC + CLOCK, start=start, end=end, symbol=symbol)
+    return full[OHLC], frame_day_index(full)
+
+
+def clear_cache() -> None:
+    _CACHE.clear()
+    _HASHES.clear()
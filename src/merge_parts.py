@@ -1,27 +1,143 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from load_data import load_tradingview_csv
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.barfile import append_barfile, open_barfile, write_barfile
+from src.load_data import CHUNK_ROWS, ingest_tradingview_csv, load_tradingview_csv, read_tradingview_fast
+from src.store import _partitions, read_store, store_end, store_rows, write_store
 
 RAW = Path("data/raw")
 PROCESSED = Path("data/processed")
 
-FILES = [
-    "nq_5m_part4.csv",  # oldest
-    "nq_5m_part3.csv",
-    "nq_5m_part2.csv",
-    "nq_5m_part1.csv",  # newest
-]
+SYMBOL = "NQ"
+
+INGEST_LOG = PROCESSED / "ingested.json"  # raw parts already merged -> (size, mtime)
+CONFLICTS_FILE = PROCESSED / "merge_conflicts.csv"
+
+# Which part wins a timestamp present in several parts: "newest" or "oldest"
+PRECEDENCE = "newest"
+
+# Bar file capacity as a multiple of its bars: room for appends in place
+BAR_SLACK = 2
+
+NY_TZ = "America/New_York"
+OHLC = ["open", "high", "low", "close"]
+
+
+# =========================
+# Per-symbol layout
+# =========================
+def outputs(symbol: str = SYMBOL) -> dict:
+    """
+    Processed files of one instrument (same naming as loader.symbol_files).
+    NQ keeps the original names, including merge_conflicts.csv.
+    """
+    s = symbol.lower()
+    return {
+        "csv": PROCESSED / f"{s}_5m_clean.csv",
+        "store": PROCESSED / f"{s}_5m",  # Parquet, partitioned by year/month
+        "bars": PROCESSED / f"{s}_5m.bars",  # memory-mapped ts + OHLC arrays
+        "conflicts": CONFLICTS_FILE if s == "nq" else PROCESSED / f"{s}_merge_conflicts.csv",
+    }
+
+
+def _raw_paths(symbol: str = SYMBOL) -> list[Path]:
+    return sorted(RAW.glob(f"{symbol.lower()}_5m_*.csv"))
+
+
+def raw_files(symbol: str = SYMBOL) -> list[str]:
+    """
+    Every raw 5m part of one instrument (data/raw/<sym>_5m_*.csv), the same
+    set incremental() discovers. Which part wins an overlapping bar is
+    decided after loading, from the data itself (precedence_order).
+    """
+    names = [p.name for p in _raw_paths(symbol)]
+    if not names:
+        raise FileNotFoundError(f"No raw parts for {symbol}: expected {RAW}/{symbol.lower()}_5m_*.csv")
+    return names
+
+
+def precedence_order(ends) -> list[int]:
+    """
+    Positions of parts in merge priority order, given each part's last bar:
+    the part ending latest first when PRECEDENCE is "newest", the one ending
+    earliest first when "oldest".
+    """
+    return sorted(range(len(ends)), key=lambda i: ends[i], reverse=PRECEDENCE == "newest")
+
+
+# =========================
+# Ingest log
+# =========================
+def _stat(path: Path) -> list:
+    st = path.stat()
+    return [st.st_size, st.st_mtime_ns]
+
+
+def read_log() -> dict:
+    if not INGEST_LOG.exists():
+        return {}
+    return json.loads(INGEST_LOG.read_text())
+
+
+def write_log(log: dict) -> None:
+    INGEST_LOG.write_text(json.dumps(log, indent=2, sort_keys=True))
+
+
+def discover_parts(log: dict, symbol: str = SYMBOL) -> list[Path]:
+    """Raw 5m CSVs of a symbol that are new, or changed since they were ingested."""
+    return [p for p in _raw_paths(symbol) if log.get(p.name) != _stat(p)]
 
-OUTFILE = PROCESSED / "nq_5m_clean.csv"
 
+def _month(index: pd.DatetimeIndex):
+    """YYYYMM of each bar in NY time (same key as the store partitions)."""
+    return index.year * 100 + index.month
 
-def main():
+
+def _parse_timed(path: Path):
+    t0 = time.perf_counter()
+    df = read_tradingview_fast(path)
+    return df, time.perf_counter() - t0
+
+
+def load_parts(paths, fast: bool = False, jobs: int | None = None) -> list[pd.DataFrame]:
+    """
+    Load raw parts (each time-sorted) in the given order.
+
+    fast=True parses every part concurrently (thread pool over the pyarrow
+    engine, typed schema) and reports per-file throughput.
+    """
+    paths = list(paths)
     dfs = []
 
-    for fname in FILES:
-        path = RAW / fname
-        print(f"Loading {fname}...")
-        df = load_tradingview_csv(path)
+    if fast:
+        jobs = jobs or min(len(paths), os.cpu_count() or 1)
+        print(f"Parsing {len(paths)} parts on {jobs} threads...")
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            parsed = list(pool.map(_parse_timed, paths))
+    else:
+        parsed = [(None, None)] * len(paths)
+
+    for path, (df, secs) in zip(paths, parsed):
+        if df is None:
+            print(f"Loading {path.name}...")
+            df = load_tradingview_csv(path)
+        else:
+            mb = path.stat().st_size / 1e6
+            print(
+                f"Parsed {path.name}: {mb:.1f} MB in {secs:.2f}s "
+                f"({mb / secs:.1f} MB/s, {len(df) / secs:,.0f} rows/s)"
+            )
         print(
             f"  rows={len(df)}, "
             f"start={df.index.min()}, "
@@ -30,33 +146,357 @@ def main():
         )
         dfs.append(df)
 
-    print("\nConcatenating...")
-    merged = pd.concat(dfs)
+    return dfs
+
+
+# =========================
+# K-way merge
+# =========================
+def _ny_index(ns: np.ndarray) -> pd.DatetimeIndex:
+    """UTC epoch nanoseconds -> NY DatetimeIndex."""
+    return pd.DatetimeIndex(ns.view("datetime64[ns]")).tz_localize("UTC").tz_convert(NY_TZ)
+
+
+def merge_sorted(parts: list[pd.DataFrame], names: list[str]):
+    """
+    Merge time-sorted parts with one stable sort of all their bars.
+
+    Precedence: parts are given in priority order; on a timestamp present
+    in several parts the earliest part's bar is kept. Bars are ordered by
+    (timestamp, part) and the first bar of every timestamp is kept, so each
+    row is copied once whatever the number of parts. Columns are those
+    shared by every part. A bar repeated within one part keeps its first row.
+
+    Returns (merged, conflicts): conflicts lists every overlapping bar whose
+    OHLC differs between the kept part and a dropped part.
+    """
+    ts, part, rows = [], [], []
+    for p, df in enumerate(parts):
+        if not df.index.is_monotonic_increasing:
+            raise ValueError("Every part must be time-sorted")
+        t = df.index.as_unit("ns").asi8
+        first = np.flatnonzero(np.r_[True, t[1:] != t[:-1]]) if len(t) else np.array([], dtype=np.int64)
+        ts.append(t[first])
+        part.append(np.full(len(first), p, dtype=np.int64))
+        rows.append(first)
 
-    print("Total rows before sort:", len(merged))
-    merged = merged.sort_index()
+    # Bars of all parts, one row per (part, timestamp); stable, so equal
+    # timestamps stay in part order and the first of each is the kept bar
+    ts, part, rows = np.concatenate(ts), np.concatenate(part), np.concatenate(rows)
+    order = np.lexsort((part, ts))
+    ts = ts[order]
+    lead = np.r_[True, ts[1:] != ts[:-1]] if len(ts) else np.array([], dtype=bool)
+    kept, dropped = order[lead], order[~lead]
 
-    dupes = merged.index.duplicated().sum()
-    print("Duplicate timestamps after concat:", dupes)
+    # Row of every bar in the concatenation of all parts
+    offsets = np.r_[0, np.cumsum([len(df) for df in parts])][part] + rows
 
-    if dupes > 0:
-        print("Dropping duplicate timestamps (keeping first)...")
-        merged = merged[~merged.index.duplicated(keep="first")]
+    conflicts = pd.DataFrame()
+    if len(dropped):
+        owner = kept[np.cumsum(lead)[~lead] - 1]
+        ohlc = np.concatenate([df[OHLC].to_numpy(dtype=float) for df in parts])
+        mine, theirs = ohlc[offsets[dropped]], ohlc[offsets[owner]]
 
-    print("Total rows after dedupe:", len(merged))
+        diff = ~((mine == theirs) | (np.isnan(mine) & np.isnan(theirs))).all(axis=1)
+        if diff.any():
+            label = np.asarray(names, dtype=object)
+            conflicts = pd.DataFrame(
+                {
+                    "timestamp": _ny_index(ts[~lead][diff]),
+                    "kept": label[part[owner[diff]]],
+                    "dropped": label[part[dropped[diff]]],
+                    **{f"kept_{c}": theirs[diff, i] for i, c in enumerate(OHLC)},
+                    **{f"dropped_{c}": mine[diff, i] for i, c in enumerate(OHLC)},
+                }
+            )
+
+    cols = [c for c in parts[0].columns if all(c in df.columns for df in parts[1:])]
+    take = offsets[kept]
+    out = {c: np.concatenate([df[c].to_numpy() for df in parts])[take] for c in cols}
+
+    merged = pd.DataFrame(out, index=_ny_index(ts[lead]).rename("timestamp"))
+
+    return merged, conflicts
+
+
+# =========================
+# Full rebuild
+# =========================
+def main(fast: bool = False, jobs: int | None = None, symbol: str = SYMBOL):
+    files = raw_files(symbol)
+    out = outputs(symbol)
+    dfs = load_parts((RAW / fname for fname in files), fast=fast, jobs=jobs)
+
+    order = precedence_order([df.index.max() for df in dfs])
+
+    print(f"\nMerging {symbol}...")
+    print("Total rows before merge:", sum(len(df) for df in dfs))
+    merged, conflicts = merge_sorted([dfs[i] for i in order], [files[i] for i in order])
+
+    print("Total rows after merge:", len(merged))
+    print(f"Conflicting bars (OHLC differs between parts, {PRECEDENCE} part kept):", len(conflicts))
 
     # sanity checks
     if not merged.index.is_monotonic_increasing:
         raise ValueError("Index is not strictly increasing after merge")
 
     PROCESSED.mkdir(parents=True, exist_ok=True)
-    merged.to_csv(OUTFILE)
+    if len(conflicts):
+        conflicts.to_csv(out["conflicts"], index=False)
+        print("Conflict report:", out["conflicts"])
+
+    merged.to_csv(out["csv"])
+    write_store(merged, out["store"])
+    write_barfile(merged, out["bars"], capacity=BAR_SLACK * len(merged))
 
-    print("\nSaved:", OUTFILE)
+    # One log for every symbol: part names carry the symbol prefix
+    prefix = f"{symbol.lower()}_5m_"
+    log = {k: v for k, v in read_log().items() if not k.startswith(prefix)}
+    write_log({**log, **{fname: _stat(RAW / fname) for fname in files}})
+
+    print("\nSaved:", out["csv"])
+    print("Saved:", out["store"])
+    print("Saved:", out["bars"])
     print("Final range:")
     print("  Start:", merged.index.min())
     print("  End:  ", merged.index.max())
 
 
+# =========================
+# Incremental append
+# =========================
+def _csv_offset(path: Path, ts: pd.Timestamp) -> int:
+    """
+    Byte offset of the first row of a time-sorted CSV at or after ts (file
+    size if none): a binary search over byte positions that parses one
+    timestamp per probe, so only O(log size) lines are read.
+    """
+    with open(path, "rb") as f:
+        header = len(f.readline())
+        size = f.seek(0, os.SEEK_END)
+
+        def line_start(pos: int) -> int:
+            """Start of the first row beginning at or after pos."""
+            if pos <= header:
+                return header
+            f.seek(pos - 1)
+            f.readline()
+            return f.tell()
+
+        def at_or_after(start: int) -> bool:
+            if start >= size:
+                return True
+            f.seek(start)
+            return pd.Timestamp(f.readline().split(b",", 1)[0].decode()) >= ts
+
+        lo, hi = header, size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if at_or_after(line_start(mid)):
+                hi = mid
+            else:
+                lo = mid + 1
+        return line_start(lo)
+
+
+def update_csv(path: Path, rows: pd.DataFrame) -> None:
+    """
+    Write new bars into a processed CSV without changing its schema: rows
+    are aligned to the existing header (columns it lacks stay empty, extra
+    ones are dropped).
+
+    The file is cut at the first row at or after the earliest new bar; the
+    rows after the cut are merged with the new ones (new bars replacing the
+    ones they share) and appended back. A pure tail is a plain append, and
+    bars before the cut are never read or rewritten.
+    """
+    header = pd.read_csv(path, nrows=0).columns
+    rows = rows.reindex(columns=header[1:])
+
+    cut = _csv_offset(path, rows.index.min())
+    with open(path, "rb") as f:
+        f.seek(cut)
+        after = pd.read_csv(f, header=None, names=header, index_col=0)
+
+    if len(after):
+        after.index = pd.DatetimeIndex(pd.to_datetime(after.index, utc=True).tz_convert(NY_TZ), name=header[0])
+        rows = pd.concat([after[~after.index.isin(rows.index)], rows]).sort_index()
+
+    with open(path, "r+b") as f:
+        f.truncate(cut)
+    rows.to_csv(path, mode="a", header=False)
+
+
+def refresh_bars(path: Path, store: Path, start: pd.Timestamp) -> None:
+    """
+    Bring the bar file up to date with a store that changed from start on.
+
+    When start is past the file's last bar the new bars are appended in
+    place (append_barfile); when earlier bars changed, or there is no bar
+    file yet, it is re-emitted from the store one month at a time into a
+    file sized for the whole store, then swapped in.
+    """
+    if path.exists():
+        bars = open_barfile(path)
+        tail = bars["n"] == 0 or start.as_unit("ns").value > bars["ts"][-1]
+        del bars
+        if tail:
+            append_barfile(read_store(store, start=start), path)
+            return
+
+    tmp = path.with_suffix(path.suffix + ".new")
+    for i, (year, month) in enumerate(_partitions(store)):
+        span = f"{year}-{month:02d}"
+        df = read_store(store, start=span, end=span)
+        if i == 0:
+            write_barfile(df, tmp, capacity=BAR_SLACK * store_rows(store))
+        else:
+            append_barfile(df, tmp)
+    tmp.replace(path)
+
+
+def incremental(fast: bool = False, jobs: int | None = None, symbol: str = SYMBOL):
+    """
+    Merge only raw parts not yet in the ingest log.
+
+    Only the store months the new bars fall in are read back and rewritten.
+    Within them the store takes part in the merge as one more part, ranked
+    against the new parts by PRECEDENCE from its last bar, so overlapping
+    bars resolve as in a full rebuild; OHLC conflicts are appended to the
+    conflict report. The CSV and the bar file are only rewritten from the
+    first changed bar on (update_csv, refresh_bars), so a new week of bars
+    costs a week of I/O.
+    """
+    out = outputs(symbol)
+    log = read_log()
+    paths = discover_parts(log, symbol)
+
+    if not paths:
+        print(f"No new raw parts for {symbol}.")
+        return
+
+    end = store_end(out["store"])
+    if end is None:
+        print("No existing store, running a full rebuild.")
+        main(fast=fast, jobs=jobs, symbol=symbol)
+        return
+
+    dfs = load_parts(paths, fast=fast, jobs=jobs)
+    names = [p.name for p in paths]
+
+    # write_store replaces whole months, so read back every month the new bars touch
+    months = np.unique(np.concatenate([_month(df.index) for df in dfs]))
+    first, last = months.min(), months.max()
+    existing = read_store(
+        out["store"],
+        start=f"{first // 100}-{first % 100:02d}",
+        end=f"{last // 100}-{last % 100:02d}",
+    )
+    existing = existing[_month(existing.index).isin(months)]
+
+    # The store ranks as a part ending at its last bar
+    stored = f"{out['store'].name} (store)"
+    parts, labels = dfs + [existing], names + [stored]
+    order = precedence_order([df.index.max() for df in dfs] + [end])
+    merged, conflicts = merge_sorted([parts[i] for i in order], [labels[i] for i in order])
+
+    # Bars the new parts add, or replace with different OHLC
+    added = merged.index[~merged.index.isin(existing.index)]
+    replaced = pd.DatetimeIndex(conflicts["timestamp"][conflicts["kept"] != stored]) if len(conflicts) else added[:0]
+    changed = added.union(replaced.intersection(existing.index))
+
+    print(f"\nNew rows: {len(added)}, replaced: {len(changed) - len(added)}")
+    print(f"Conflicting bars (OHLC differs, {PRECEDENCE} part kept): {len(conflicts)}")
+
+    if len(conflicts):
+        conflicts.to_csv(out["conflicts"], mode="a", header=not out["conflicts"].exists(), index=False)
+        print("Conflict report:", out["conflicts"])
+
+    if changed.empty:
+        write_log({**log, **{p.name: _stat(p) for p in paths}})
+        return
+
+    if not merged.index.is_monotonic_increasing:
+        raise ValueError("Index is not strictly increasing after merge")
+
+    write_store(merged[_month(merged.index).isin(_month(changed).unique())], out["store"])
+
+    # CSV rows come from the new parts alone, so their extra columns carry over
+    new_order = [i for i in order if i < len(dfs)]
+    new, _ = merge_sorted([dfs[i] for i in new_order], [names[i] for i in new_order])
+    if changed.min() <= end:
+        print("New bars precede the current end, rewriting the outputs from", changed.min())
+    update_csv(out["csv"], new.loc[changed])
+    refresh_bars(out["bars"], out["store"], changed.min())
+
+    write_log({**log, **{p.name: _stat(p) for p in paths}})
+
+    print("\nSaved:", out["csv"])
+    print("Saved:", out["store"])
+    print("Saved:", out["bars"])
+    print("Changed range:")
+    print("  Start:", changed.min())
+    print("  End:  ", changed.max())
+
+
+# =========================
+# Streaming ingest
+# =========================
+def stream(path: Path, chunk_rows: int = CHUNK_ROWS, symbol: str = SYMBOL):
+    """
+    Ingest one TradingView export chunk by chunk, straight into the store
+    (load_data.ingest_tradingview_csv), for exports too large to load whole.
+
+    The CSV is updated with every chunk (update_csv, so its columns are
+    kept) and the bar file is refreshed from the first streamed bar on
+    (refresh_bars), so loaders reading either see the new bars. An export
+    in data/raw is recorded in the ingest log like a merged part.
+    """
+    out = outputs(symbol)
+    starts = []
+
+    def to_csv(df):
+        starts.append(df.index[0])
+        if out["csv"].exists():
+            update_csv(out["csv"], df)
+        else:
+            df.to_csv(out["csv"])
+
+    PROCESSED.mkdir(parents=True, exist_ok=True)
+    rows = ingest_tradingview_csv(path, out["store"], chunk_rows, on_chunk=to_csv)
+    if not rows:
+        print(f"No bars in {path.name}.")
+        return
+
+    refresh_bars(out["bars"], out["store"], starts[0])
+
+    if path.resolve() in {p.resolve() for p in _raw_paths(symbol)}:
+        write_log({**read_log(), path.name: _stat(path)})
+
+    print("\nSaved:", out["csv"])
+    print("Saved:", out["store"])
+    print("Saved:", out["bars"])
+
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Merge raw TradingView 5m parts into the processed store.")
+    parser.add_argument("--incremental", action="store_true", help="only ingest new data/raw/*.csv parts")
+    parser.add_argument("--fast", action="store_true", help="typed pyarrow parsing of all parts in parallel")
+    parser.add_argument("--jobs", type=int, default=None, help="parser threads for --fast (default: one per part)")
+    parser.add_argument("--symbols", nargs="+", default=[SYMBOL], help="instruments to merge (default NQ)")
+    parser.add_argument("--stream", type=Path, default=None, metavar="CSV",
+                        help="ingest one TradingView export chunk by chunk (bounded memory)")
+    parser.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS, help="rows per chunk for --stream")
+    args = parser.parse_args()
+
+    if args.stream is not None:
+        if len(args.symbols) != 1:
+            parser.error("--stream ingests one export: pass a single --symbols")
+        stream(args.stream, args.chunk_rows, symbol=args.symbols[0])
+        sys.exit()
+
+    for symbol in args.symbols:
+        if args.incremental:
+            incremental(fast=args.fast, jobs=args.jobs, symbol=symbol)
+        else:
+            main(fast=args.fast, jobs=args.jobs, symbol=symbol)
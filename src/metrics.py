@@ -0,0 +1,69 @@
+"""
+Batched strategy metrics: every metric for every result row in one call.
+
+    r = results_matrix([results[rt] for rt in R_TARGETS])   # ragged -> NaN padded
+    table = trade_metrics(r, index=pd.Index(R_TARGETS, name="target_r"))
+
+r is a (rows, trades) R matrix, one row per configuration / target, NaN
+where a row has no trade. Every metric is a reduction along the trade axis
+of the whole matrix, so scoring 100k sweep configurations is one call.
+
+  trades          non-NaN results
+  wins / losses   R > 0 / R < 0
+  unresolved      R == 0 (neither stop nor target before the session end)
+  win_rate        wins / (wins + losses), 0 when nothing resolved
+  profit_factor   gross win / gross loss, NaN without losses
+  expectancy      mean R per trade, 0 without trades
+  expectancy_se   standard error of the expectancy, inf below two trades
+"""
+import numpy as np
+import pandas as pd
+
+METRICS = ["trades", "wins", "losses", "unresolved", "win_rate", "profit_factor", "expectancy", "expectancy_se"]
+
+
+def results_matrix(rows) -> np.ndarray:
+    """Per-row trade results of different lengths -> NaN-padded (rows, max_trades) matrix."""
+    rows = [np.asarray(r, dtype=float).ravel() for r in rows]
+    lengths = np.array([len(r) for r in rows], dtype=np.int64)
+
+    out = np.full((len(rows), max(int(lengths.max(initial=0)), 1)), np.nan)
+    if lengths.sum():
+        row = np.repeat(np.arange(len(rows)), lengths)
+        col = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        out[row, col] = np.concatenate(rows)
+    return out
+
+
+def trade_metrics(r, index=None) -> pd.DataFrame:
+    """METRICS for every row of a (rows, trades) R matrix (NaN = no trade)."""
+    r = np.atleast_2d(np.asarray(r, dtype=float))
+    rows = len(r)
+    missing = np.isnan(r)
+
+    n = (~missing).sum(axis=1)
+    wins = (r > 0).sum(axis=1)
+    losses = (r < 0).sum(axis=1)
+    resolved = wins + losses
+
+    gross_win = np.where(r > 0, r, 0.0).sum(axis=1)
+    gross_loss = -np.where(r < 0, r, 0.0).sum(axis=1)
+    total = np.where(missing, 0.0, r).sum(axis=1)
+    expectancy = np.divide(total, n, out=np.zeros(rows), where=n > 0)
+
+    dev = np.where(missing, 0.0, r - expectancy[:, None])
+    var = np.divide((dev ** 2).sum(axis=1), n - 1, out=np.zeros(rows), where=n > 1)
+
+    return pd.DataFrame(
+        {
+            "trades": n,
+            "wins": wins,
+            "losses": losses,
+            "unresolved": (r == 0).sum(axis=1),
+            "win_rate": np.divide(wins, resolved, out=np.zeros(rows), where=resolved > 0),
+            "profit_factor": np.divide(gross_win, gross_loss, out=np.full(rows, np.nan), where=gross_loss > 0),
+            "expectancy": expectancy,
+            "expectancy_se": np.where(n > 1, np.sqrt(var / np.maximum(n, 1)), np.inf),
+        },
+        index=index,
+    )
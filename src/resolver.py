@@ -0,0 +1,111 @@
+import numpy as np
+
+
+def _windows(start: np.ndarray, end: np.ndarray):
+    """
+    Padded (n_trades, width) matrix of bar positions start..end-1 per trade,
+    plus the mask of which cells are real bars.
+    """
+    width = int((end - start).max()) if len(start) else 0
+    width = max(width, 1)
+    pos = start[:, None] + np.arange(width)[None, :]
+    valid = pos < end[:, None]
+    return np.where(valid, pos, 0), valid
+
+
+def _first_true(mask: np.ndarray) -> np.ndarray:
+    """Column of the first True along the last axis, -1 where there is none."""
+    first = mask.argmax(axis=-1)
+    return np.where(mask.any(axis=-1), first, -1)
+
+
+def resolve_trades(
+    high: np.ndarray,
+    low: np.ndarray,
+    start: np.ndarray,
+    end: np.ndarray,
+    direction: np.ndarray,
+    entry: np.ndarray,
+    stop: np.ndarray,
+    targets: np.ndarray,
+    market: bool = False,
+) -> dict:
+    """
+    Limit-entry fill + stop/target first passage for many trades at once.
+
+    high / low     bar arrays for the whole history (float prices or int ticks)
+    start / end    per trade: bar positions [start, end) to search
+    direction      per trade: +1 long, -1 short
+    entry / stop   per trade price levels, in the same units as high / low
+    targets        (n_trades, n_targets) target prices
+    market         entries are market orders already filled at entry before
+                   start: every trade with a bar in its window is live from
+                   start (fill_pos = start)
+
+    Otherwise the entry is a limit that fills on the first bar that trades
+    through it (low <= entry for longs). From the fill bar (inclusive) each target is resolved
+    independently: first bar that hits the stop or the target. If both are
+    hit in the same bar the stop is assumed (conservative) and the bar is
+    flagged ambiguous.
+
+    Returns a dict of arrays:
+      fill_pos   (n_trades,)            bar position of the fill, -1 if never filled
+      exit_pos   (n_trades, n_targets)  bar position of the exit, -1 if unresolved
+      outcome    (n_trades, n_targets)  +1 target, -1 stop, 0 unresolved / unfilled
+      ambiguous  (n_trades, n_targets)  stop & target in the same bar
+    """
+    start = np.asarray(start, dtype=np.int64)
+    end = np.asarray(end, dtype=np.int64)
+    sign = np.asarray(direction, dtype=float)[:, None]
+    entry = np.asarray(entry, dtype=float)[:, None]
+    stop = np.asarray(stop, dtype=float)[:, None]
+    targets = np.asarray(targets, dtype=float)
+    if targets.ndim == 1:
+        targets = targets[:, None]
+
+    n, n_targets = targets.shape
+    pos, valid = _windows(start, end)
+
+    # Adverse / favorable side of each bar, oriented so "hit" is one compare
+    adverse = np.where(sign > 0, low[pos], high[pos])
+    favorable = np.where(sign > 0, high[pos], low[pos])
+
+    # -----------------------------
+    # Entry fill
+    # -----------------------------
+    if market:
+        fill_col = np.where(valid[:, 0], 0, -1)
+    else:
+        fill_col = _first_true(valid & (sign * (adverse - entry) <= 0))
+    filled = fill_col >= 0
+
+    live = valid & filled[:, None] & (np.arange(pos.shape[1])[None, :] >= fill_col[:, None])
+
+    # -----------------------------
+    # Stop / target first passage
+    # -----------------------------
+    stop_col = _first_true(live & (sign * (adverse - stop) <= 0))
+    tp_hit = live[:, None, :] & (sign[:, :, None] * (favorable[:, None, :] - targets[:, :, None]) >= 0)
+    tp_col = _first_true(tp_hit)
+
+    stop_col = np.broadcast_to(stop_col[:, None], (n, n_targets))
+    never = np.iinfo(np.int64).max
+    s = np.where(stop_col >= 0, stop_col, never)
+    t = np.where(tp_col >= 0, tp_col, never)
+
+    win = t < s
+    loss = (s <= t) & (s != never)
+    ambiguous = loss & (s == t)
+
+    outcome = np.where(win, 1, np.where(loss, -1, 0)).astype(np.int8)
+    exit_col = np.where(win, t, np.where(loss, s, -1))
+    rows = np.arange(n)[:, None]
+    exit_pos = np.where(exit_col >= 0, pos[rows, np.maximum(exit_col, 0)], -1)
+    fill_pos = np.where(filled, pos[np.arange(n), np.maximum(fill_col, 0)], -1)
+
+    return {
+        "fill_pos": fill_pos,
+        "exit_pos": exit_pos,
+        "outcome": outcome,
+        "ambiguous": ambiguous,
+    }
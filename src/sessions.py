@@ -0,0 +1,259 @@
+"""
+CME equity-index futures session calendar (NQ / ES), vectorized.
+
+Named sessions.py rather than calendar.py so it never shadows the stdlib.
+
+Each calendar date is one of:
+
+  regular    09:30–16:00 cash session, Globex 18:00 (prior day) – 17:00
+  half_day   early close: cash 13:00, futures halt 13:15
+             (day after Thanksgiving, Christmas Eve, July 3)
+  holiday    cash closed, futures trade an abbreviated session halting at
+             13:00 (MLK, Presidents, Memorial, Juneteenth, Independence,
+             Labor, Thanksgiving); those trades belong to the next trade date
+  closed     no trading at all (New Year's Day, Good Friday, Christmas)
+  weekend    Saturday / Sunday
+
+The rules are computed, not downloaded, so any year works offline.
+Exchange-announced one-offs (e.g. national days of mourning) are listed in
+SPECIAL_CLOSURES.
+"""
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.day_index import ROLLOVER, bar_clock, build_day_index, hhmm_to_minute
+
+REGULAR = "regular"
+HALF_DAY = "half_day"
+HOLIDAY = "holiday"
+CLOSED = "closed"
+WEEKEND = "weekend"
+
+KINDS = [REGULAR, HALF_DAY, HOLIDAY, CLOSED, WEEKEND]
+
+# Session end on the NY clock (minutes) per kind: cash close, futures close
+CASH_CLOSE = {REGULAR: "16:00", HALF_DAY: "13:00", HOLIDAY: None, CLOSED: None, WEEKEND: None}
+FUTURES_CLOSE = {REGULAR: "17:00", HALF_DAY: "13:15", HOLIDAY: "13:00", CLOSED: None, WEEKEND: None}
+
+SPECIAL_CLOSURES = {
+    date(2018, 12, 5): CLOSED,   # President G.H.W. Bush day of mourning (cash closed)
+    date(2025, 1, 9): CLOSED,    # President Carter day of mourning (cash closed)
+}
+
+
+# =========================
+# Holiday rules
+# =========================
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """n-th weekday (Mon=0) of a month; n=-1 for the last one."""
+    if n > 0:
+        d = date(year, month, 1)
+        d += timedelta(days=(weekday - d.weekday()) % 7)
+        return d + timedelta(weeks=n - 1)
+    d = date(year + (month == 12), month % 12 + 1, 1) - timedelta(days=1)
+    return d - timedelta(days=(d.weekday() - weekday) % 7)
+
+
+def _easter(year: int) -> date:
+    """Gregorian Easter Sunday (anonymous Gregorian algorithm)."""
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    l = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l) // 451
+    month, day = divmod(h + l - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def _observed(d: date) -> date:
+    """Saturday holidays move to Friday, Sunday holidays to Monday."""
+    if d.weekday() == 5:
+        return d - timedelta(days=1)
+    if d.weekday() == 6:
+        return d + timedelta(days=1)
+    return d
+
+
+def holidays(year: int) -> dict:
+    """{date: kind} for every non-regular weekday of a year."""
+    out = {}
+
+    # New Year's Day: a Saturday holiday is not moved back into the old year
+    ny = date(year, 1, 1)
+    if ny.weekday() != 5:
+        out[_observed(ny)] = CLOSED
+
+    out[_easter(year) - timedelta(days=2)] = CLOSED       # Good Friday
+    out[_observed(date(year, 12, 25))] = CLOSED          # Christmas
+
+    out[_nth_weekday(year, 1, 0, 3)] = HOLIDAY           # Martin Luther King Jr.
+    out[_nth_weekday(year, 2, 0, 3)] = HOLIDAY           # Presidents
+    out[_nth_weekday(year, 5, 0, -1)] = HOLIDAY          # Memorial
+    if year >= 2022:
+        out[_observed(date(year, 6, 19))] = HOLIDAY      # Juneteenth
+    july4 = _observed(date(year, 7, 4))
+    out[july4] = HOLIDAY                                 # Independence
+    out[_nth_weekday(year, 9, 0, 1)] = HOLIDAY           # Labor
+    thanksgiving = _nth_weekday(year, 11, 3, 4)
+    out[thanksgiving] = HOLIDAY                          # Thanksgiving
+
+    # Early closes
+    out.setdefault(thanksgiving + timedelta(days=1), HALF_DAY)
+    eve = date(year, 12, 24)
+    if eve.weekday() < 5:
+        out.setdefault(eve, HALF_DAY)
+    july3 = date(year, 7, 3)
+    if july3.weekday() < 5 and july4 == date(year, 7, 4):
+        out.setdefault(july3, HALF_DAY)
+
+    for d, kind in SPECIAL_CLOSURES.items():
+        if d.year == year:
+            out[d] = kind
+
+    return out
+
+
+# =========================
+# Calendar
+# =========================
+def day_kinds(dates) -> np.ndarray:
+    """Kind of every date (datetime.date / datetime64[D] array-like)."""
+    d = pd.DatetimeIndex(np.asarray(dates, dtype="datetime64[D]"))
+    out = np.where(d.dayofweek >= 5, WEEKEND, REGULAR).astype(object)
+
+    if len(d):
+        table = {}
+        for year in range(d.year.min(), d.year.max() + 1):
+            table.update(holidays(year))
+        special = pd.DatetimeIndex(list(table)).values.astype("datetime64[D]")
+        kinds = np.array(list(table.values()), dtype=object)
+        pos = pd.Index(special).get_indexer(d.values.astype("datetime64[D]"))
+        hit = pos >= 0
+        out[hit] = kinds[pos[hit]]
+
+    return out
+
+
+def session_calendar(start, end) -> pd.DataFrame:
+    """
+    One row per calendar date in [start, end]:
+      kind            see module docstring
+      cash_close      NY minute-of-day of the cash close, -1 if none
+      futures_close   NY minute-of-day of the Globex halt, -1 if none
+      complete        full regular session (the hypotheses' 09:30–16:00 is intact)
+    """
+    dates = pd.date_range(pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize(), freq="D")
+    kind = day_kinds(dates.values)
+
+    def minutes(table):
+        lookup = {k: (hhmm_to_minute(v) if v else -1) for k, v in table.items()}
+        return np.array([lookup[k] for k in kind], dtype=np.int16)
+
+    return pd.DataFrame(
+        {
+            "kind": kind,
+            "cash_close": minutes(CASH_CLOSE),
+            "futures_close": minutes(FUTURES_CLOSE),
+            "complete": kind == REGULAR,
+        },
+        index=pd.Index(dates.date, name="date"),
+    )
+
+
+def next_trading_day(days: np.ndarray) -> np.ndarray:
+    """
+    Roll day ordinals (days since 1970-01-01) forward onto the next date
+    with a trade date of its own (regular or half_day).
+    """
+    days = np.asarray(days, dtype=np.int64)
+    if not len(days):
+        return days
+
+    lo, hi = int(days.min()), int(days.max()) + 10
+    span = np.arange(lo, hi + 1)
+    kinds = day_kinds(span.astype("datetime64[D]"))
+    tradable = np.isin(kinds, [REGULAR, HALF_DAY])
+
+    # For every day in the span, the first tradable day at/after it
+    idx = np.where(tradable, np.arange(len(span)), len(span) - 1)
+    nxt = np.minimum.accumulate(idx[::-1])[::-1]
+    return span[nxt[days - lo]]
+
+
+# =========================
+# Per-bar mapping
+# =========================
+def assign_sessions(index: pd.DatetimeIndex) -> dict:
+    """
+    Map a sorted NY-time index to exchange sessions in one pass:
+
+      trade_date  int32  exchange trade date (days since 1970-01-01): the
+                         18:00 rollover date moved past weekends and holidays,
+                         so a holiday's abbreviated session counts toward
+                         the next trade date
+      date        int32  NY calendar date of the bar
+      kind        object kind of the bar's calendar date
+      after_close bool   bar before 18:00 but past that date's futures halt,
+                         or on a date with no session (should not exist);
+                         18:00+ bars open the next session and never count
+    """
+    day, minute = bar_clock(index)
+    evening = minute >= hhmm_to_minute(ROLLOVER)
+    rolled = day + evening
+    kind = day_kinds(day.astype("datetime64[D]"))
+
+    close = np.array(
+        [hhmm_to_minute(FUTURES_CLOSE[k]) if FUTURES_CLOSE[k] else -1 for k in KINDS]
+    )[pd.Index(KINDS).get_indexer(kind)]
+
+    return {
+        "trade_date": next_trading_day(rolled).astype(np.int32),
+        "date": day.astype(np.int32),
+        "kind": kind,
+        "after_close": ~evening & ((close < 0) | (minute >= close)),
+    }
+
+
+def complete_days(days: dict) -> np.ndarray:
+    """
+    Per-day mask for a build_day_index result: True where the calendar says
+    the day has a full regular session. Known before any bar is scanned.
+    """
+    return day_kinds(np.asarray(days["dates"], dtype="datetime64[D]")) == REGULAR
+
+
+def window_days(dates, end: str) -> np.ndarray:
+    """
+    Per-day mask over calendar dates: True where the cash session is open
+    through end (NY HH:MM). Regular days always qualify and half-days for
+    windows ending by their 13:00 close; holidays, closures and weekends
+    never do. run_strategy, sweep, successive halving and walk-forward all
+    trade exactly these days, so their numbers compare.
+    """
+    kind = day_kinds(dates)
+    close = np.array([hhmm_to_minute(CASH_CLOSE[k]) if CASH_CLOSE[k] else -1 for k in KINDS])
+    return close[pd.Index(KINDS).get_indexer(kind)] >= hhmm_to_minute(end)
+
+
+def regular_only(df: pd.DataFrame, days: dict):
+    """
+    Keep only bars on complete regular-session days.
+
+    Returns (df, days) with the day index rebuilt for the subset, so every
+    hypothesis skips holidays and half-days without scanning them.
+    """
+    keep = complete_days(days)[days["code"]]
+    sub = df[keep]
+    return sub, build_day_index(sub.index)
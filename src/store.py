@@ -0,0 +1,164 @@
+import sys
+import uuid
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.day_index import CLOCK, clock_columns
+
+NY_TZ = "America/New_York"
+
+OHLC = ["open", "high", "low", "close"]
+
+# Hive layout: <root>/year=2024/month=3/part-0.parquet
+PARTITION_COLS = ["year", "month"]
+
+
+def write_store(df: pd.DataFrame, root: Path, append: bool = False) -> None:
+    """
+    Write NY-indexed OHLC bars as a Parquet dataset partitioned by year/month.
+
+    Timestamps are stored as a typed tz-aware column, so readers never parse
+    strings, next to the integer clock columns (minute / trade_date /
+    session, see day_index.clock_columns). Existing partitions touched by df
+    are replaced, or with append=True kept and extended by a new part file.
+    """
+    if not isinstance(df.index, pd.DatetimeIndex) or df.index.tz is None:
+        raise TypeError("Expected a tz-aware DatetimeIndex")
+
+    local = df.index.tz_convert(NY_TZ)
+
+    out = pd.DataFrame(
+        {
+            "timestamp": local,
+            **{c: df[c].to_numpy(dtype="float64") for c in OHLC},
+            **clock_columns(local),
+            "year": local.year.astype("int16"),
+            "month": local.month.astype("int8"),
+        }
+    )
+
+    table = pa.Table.from_pandas(out, preserve_index=False)
+
+    root.mkdir(parents=True, exist_ok=True)
+    if append:
+        pq.write_to_dataset(
+            table,
+            root_path=str(root),
+            partition_cols=PARTITION_COLS,
+            basename_template=f"part-{uuid.uuid4().hex}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+    else:
+        pq.write_to_dataset(
+            table,
+            root_path=str(root),
+            partition_cols=PARTITION_COLS,
+            existing_data_behavior="delete_matching",
+        )
+
+
+def _as_ny(ts, side: str) -> pd.Timestamp:
+    """
+    Bound as a NY Timestamp. Strings follow pandas partial-string slicing:
+    end="2024" means through the last bar of 2024, not 2024-01-01 00:00.
+    """
+    if isinstance(ts, str):
+        period = pd.Period(ts)
+        ts = period.start_time if side == "start" else period.end_time
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize(NY_TZ) if ts.tz is None else ts.tz_convert(NY_TZ)
+
+
+def _month_filter(field_year, field_month, ts: pd.Timestamp, op: str):
+    """(year, month) >= / <= (ts.year, ts.month) as a partition expression."""
+    if op == ">=":
+        return (field_year > ts.year) | ((field_year == ts.year) & (field_month >= ts.month))
+    return (field_year < ts.year) | ((field_year == ts.year) & (field_month <= ts.month))
+
+
+def read_store(root: Path, columns=None, start=None, end=None) -> pd.DataFrame:
+    """
+    Read bars from the partitioned store.
+
+    columns: subset of OHLC + CLOCK to load (default the four OHLC)
+    start / end: inclusive bounds (str / Timestamp; naive values are NY time)
+
+    The date range prunes year/month partitions before any file is opened
+    and is also pushed down to row-group statistics.
+    """
+    if not root.exists():
+        raise FileNotFoundError(f"Missing bar store: {root}")
+
+    columns = list(OHLC if columns is None else columns)
+    unknown = set(columns) - set(OHLC) - set(CLOCK)
+    if unknown:
+        raise ValueError(f"Unknown columns: {sorted(unknown)}")
+
+    dataset = ds.dataset(str(root), format="parquet", partitioning="hive")
+
+    year = ds.field("year")
+    month = ds.field("month")
+    ts_field = ds.field("timestamp")
+
+    flt = None
+    if start is not None:
+        start = _as_ny(start, "start")
+        flt = _month_filter(year, month, start, ">=") & (ts_field >= pa.scalar(start))
+    if end is not None:
+        end = _as_ny(end, "end")
+        cond = _month_filter(year, month, end, "<=") & (ts_field <= pa.scalar(end))
+        flt = cond if flt is None else flt & cond
+
+    # Stores written before the clock columns existed: derive them on read
+    stored = set(dataset.schema.names)
+    derive = [c for c in columns if c in CLOCK and c not in stored]
+
+    table = dataset.to_table(columns=["timestamp"] + [c for c in columns if c not in derive], filter=flt)
+    df = table.to_pandas()
+
+    df = df.set_index("timestamp").sort_index()
+    df.index = df.index.tz_convert(NY_TZ)
+
+    if derive:
+        clock = clock_columns(df.index)
+        for c in derive:
+            df[c] = clock[c]
+        df = df[columns]
+
+    return df
+
+
+def _partitions(root: Path) -> list[tuple[int, int]]:
+    """(year, month) of every partition directory, sorted."""
+    out = []
+    for d in root.glob("year=*/month=*"):
+        if d.is_dir():
+            out.append((int(d.parent.name.split("=")[1]), int(d.name.split("=")[1])))
+    return sorted(out)
+
+
+def store_rows(root: Path) -> int:
+    """Bars in the store, from the Parquet footers (no data is read)."""
+    return ds.dataset(str(root), format="parquet", partitioning="hive").count_rows()
+
+
+def store_end(root: Path) -> pd.Timestamp | None:
+    """Last bar timestamp in the store (reads only the newest partition), None if empty."""
+    if not root.exists():
+        return None
+
+    parts = _partitions(root)
+    if not parts:
+        return None
+
+    year, month = parts[-1]
+    ts = read_store(root, columns=[], start=f"{year}-{month:02d}", end=f"{year}-{month:02d}").index
+    return ts.max() if len(ts) else None
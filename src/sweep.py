@@ -0,0 +1,443 @@
+"""
+Parameter sweep for the retrace-entry strategy (hypotheses/strategy_backtest).
+
+    python src/sweep.py --jobs 8
+    python src/sweep.py --retraces 0.382 0.5 0.618 --targets 1 1.5 2 3
+
+    from src.sweep import sweep
+    table = sweep(ranges=[("09:45", "10:05"), ("09:50", "10:10")], retraces=[0.5, 0.618])
+
+Grid: range windows x retrace fractions x stop modes x R targets.
+
+Per range window the breakout scan (find_breakouts) runs once. Every
+(retrace, stop mode) combination of that window is stacked into a single
+batched resolve_trades call covering all targets, so a window costs about
+one backtest however many combinations it carries. Windows are spread
+over a process pool; each worker maps the bars once. Like run_strategy,
+only days whose cash session covers the window are traded
+(sessions.window_days).
+
+Output is a tidy table, one row per configuration: the src/metrics.py
+METRICS (trades, wins, losses, unresolved, win_rate of resolved,
+profit_factor, expectancy and its standard error) plus ambiguous.
+
+--halving runs successive halving instead of the full grid: every
+configuration is scored on a random subset of days, the losing part is
+dropped (ranked by the upper confidence bound of expectancy, so thinly
+sampled configurations get the benefit of the doubt), and the survivors
+are re-scored on eta times more days until the full history.
+
+--checkpoint DIR writes every finished range window to a results store in
+DIR (src/checkpoint.py) as it completes; running the same command again
+skips the finished windows, so an interrupted sweep resumes.
+"""
+import argparse
+import math
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import product
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.breakout import SESSION_END, STOP_MODES, find_breakouts, retrace_entries
+from src.checkpoint import open_job, pending, read_results, write_unit
+from src.day_index import build_day_index
+from src.loader import PROCESSED, SYMBOL, content_hash, load_5m_indexed
+from src.metrics import trade_metrics
+from src.sessions import window_days
+from src.resolver import resolve_trades
+from src.ticks import price_array
+
+OUTFILE = PROCESSED / "strategy_sweep.csv"
+
+# Default grid (the published strategy is 09:50–10:10, 0.5, extreme)
+GRID = {
+    "ranges": [("09:45", "10:05"), ("09:50", "10:10"), ("09:55", "10:15"), ("09:30", "10:00")],
+    "retraces": [0.25, 0.382, 0.5, 0.618, 0.75],
+    "stop_modes": STOP_MODES,
+    "targets": [1.0, 1.5, 2.0, 3.0],
+}
+
+CONFIG = ["range_start", "range_end", "retrace", "stop_mode", "target_r"]
+
+
+# =========================
+# One range window
+# =========================
+def _window_trades(df, days, range_start, range_end, retraces, stop_modes, targets, session_end):
+    """
+    Resolve every (retrace, stop mode) combination of one range window in a
+    single batched pass. Trades are stacked combination after combination.
+
+    Returns (keys, counts, day, result_r, ambiguous):
+      keys       [(retrace, stop_mode)]
+      counts     trades per combination
+      day        day row of every trade
+      result_r   (trades, n_targets) R, NaN where the entry never filled
+      ambiguous  (trades, n_targets) stop & target in the same bar
+    """
+    targets = np.asarray(targets, dtype=float)
+    bo = find_breakouts(df, range_start=range_start, range_end=range_end, search_end=session_end, days=days)
+
+    # Only days whose cash session covers the window; rows stay aligned with days
+    bo.loc[~window_days(bo.index, session_end), "close_pos"] = -1
+
+    high = price_array(df, "high")
+    low = price_array(df, "low")
+
+    keys = list(product(retraces, stop_modes))
+    levels = [retrace_entries(df, bo, retrace=rt, stop_mode=mode) for rt, mode in keys]
+
+    def stack(field):
+        return np.concatenate([lv[field][lv["ok"]] for lv in levels])
+
+    counts = np.array([int(lv["ok"].sum()) for lv in levels])
+    sign, entry, stop, risk = stack("sign"), stack("entry"), stack("stop"), stack("risk")
+    tps = entry[:, None] + sign[:, None] * targets[None, :] * risk[:, None]
+
+    # Every combination and target of the window in one pass
+    res = resolve_trades(high, low, stack("pos0") + 1, stack("end"), sign, entry, stop, tps)
+
+    filled = res["fill_pos"] >= 0
+    result_r = np.where(res["outcome"] > 0, targets[None, :], res["outcome"].astype(float))
+    result_r[~filled] = np.nan  # never filled: not a trade
+
+    return keys, counts, stack("day"), result_r, res["ambiguous"] & filled[:, None]
+
+
+def window_results(df, days, range_start, range_end, retraces, stop_modes, targets, session_end=SESSION_END):
+    """
+    Trade results of every (retrace, stop mode) combination for one range window.
+
+    Returns (keys, r, ambiguous):
+      keys       [(retrace, stop_mode)] in row-block order
+      r          (len(keys) * n_targets, max_trades) R matrix, NaN padded;
+                 row k * n_targets + j is combination k at target j
+      ambiguous  (len(keys) * n_targets,) stop & target in the same bar
+    """
+    keys, counts, _, result_r, amb = _window_trades(
+        df, days, range_start, range_end, retraces, stop_modes, targets, session_end
+    )
+    filled = ~np.isnan(result_r[:, 0])
+
+    n_t = len(targets)
+    r = np.full((len(keys) * n_t, max(int(counts.max()) if len(counts) else 0, 1)), np.nan)
+    ambiguous = np.zeros(len(keys) * n_t, dtype=np.int64)
+
+    offsets = np.r_[0, np.cumsum(counts)]
+    for k in range(len(keys)):
+        lo, hi = offsets[k], offsets[k + 1]
+        f = filled[lo:hi]
+        n = int(f.sum())
+        r[k * n_t:(k + 1) * n_t, :n] = result_r[lo:hi][f].T
+        ambiguous[k * n_t:(k + 1) * n_t] = amb[lo:hi].sum(axis=0)
+
+    return keys, r, ambiguous
+
+
+def window_day_results(df, days, range_start, range_end, retraces, stop_modes, targets, session_end=SESSION_END):
+    """
+    Like window_results, but aligned by day: r is (len(keys) * n_targets,
+    n_days) with the trade of each day in that day's column (NaN: no trade).
+    Any subset of days can then be scored by slicing columns.
+    """
+    keys, counts, day, result_r, _ = _window_trades(
+        df, days, range_start, range_end, retraces, stop_modes, targets, session_end
+    )
+
+    n_t = len(targets)
+    r = np.full((len(keys) * n_t, len(days["start"])), np.nan)
+
+    offsets = np.r_[0, np.cumsum(counts)]
+    for k in range(len(keys)):
+        lo, hi = offsets[k], offsets[k + 1]
+        r[k * n_t:(k + 1) * n_t, day[lo:hi]] = result_r[lo:hi].T
+
+    return keys, r
+
+
+def window_table(df, days, range_start, range_end, retraces, stop_modes, targets, session_end=SESSION_END, day_ids=None):
+    """
+    Tidy rows (one per configuration) for one range window.
+
+    day_ids: evaluate on those days (rows of days) only.
+    """
+    if day_ids is not None:
+        df, days = take_days(df, days, day_ids)
+    keys, r, ambiguous = window_results(df, days, range_start, range_end, retraces, stop_modes, targets, session_end)
+
+    rows = [
+        (range_start, range_end, rt, mode, float(t))
+        for rt, mode in keys
+        for t in targets
+    ]
+    out = pd.concat([pd.DataFrame(rows, columns=CONFIG), trade_metrics(r)], axis=1)
+    out["ambiguous"] = ambiguous
+    return out
+
+
+def take_days(df: pd.DataFrame, days: dict, day_ids) -> tuple:
+    """Bars of the given days (rows of days), with their own day index."""
+    ids = np.sort(np.asarray(day_ids, dtype=np.int64))
+    lo, length = days["start"][ids], days["stop"][ids] - days["start"][ids]
+
+    # Positions lo..stop-1 of every day, concatenated
+    pos = np.arange(length.sum()) + np.repeat(lo - (np.cumsum(length) - length), length)
+    sub = df.iloc[pos]
+    return sub, build_day_index(sub.index)
+
+
+# =========================
+# Pool
+# =========================
+# Per-worker bars, set once by the pool initializer
+_WORKER = {}
+
+
+def _init_worker(df=None, symbol: str = SYMBOL):
+    if df is None:
+        df, days = load_5m_indexed(symbol=symbol)
+    else:
+        days = build_day_index(df.index)
+    _WORKER["df"] = df
+    _WORKER["days"] = days
+
+
+def _run_window(window, retraces, stop_modes, targets, session_end, day_ids=None):
+    return window_table(_WORKER["df"], _WORKER["days"], *window, retraces, stop_modes, targets, session_end, day_ids)
+
+
+def sweep(
+    df: pd.DataFrame | None = None,
+    ranges=GRID["ranges"],
+    retraces=GRID["retraces"],
+    stop_modes=GRID["stop_modes"],
+    targets=GRID["targets"],
+    session_end: str = SESSION_END,
+    jobs: int = 1,
+    symbol: str = SYMBOL,
+    checkpoint: Path | None = None,
+) -> pd.DataFrame:
+    """
+    Evaluate the whole grid and return one row per configuration
+    (CONFIG columns + metrics), in grid order.
+
+    df defaults to the processed bars of symbol; with jobs > 1 each worker
+    loads (maps) them itself, or receives df once at start-up.
+
+    checkpoint: directory of a resumable results store. Each range window
+    is written there when it finishes and skipped when already present.
+    """
+    unknown = set(stop_modes) - set(STOP_MODES)
+    if unknown:
+        raise ValueError(f"Unknown stop modes: {sorted(unknown)}")
+
+    ranges = [tuple(w) for w in ranges]
+    args = (list(retraces), list(stop_modes), list(targets), session_end)
+
+    job = None
+    todo = ranges
+    if checkpoint is not None:
+        params = {
+            "job": "sweep",
+            "retraces": args[0],
+            "stop_modes": args[1],
+            "targets": args[2],
+            "session_end": session_end,
+            "symbol": symbol,
+            "data_hash": content_hash(symbol=symbol) if df is None else None,
+        }
+        job = open_job(checkpoint, params, ["-".join(w) for w in ranges])
+        left = set(pending(checkpoint, job))
+        todo = [w for w in ranges if "-".join(w) in left]
+        if len(todo) < len(ranges):
+            print(f"  resuming: {len(ranges) - len(todo)} of {len(ranges)} windows already done")
+
+    tables = {}
+
+    def record(window, table):
+        if job is None:
+            tables[window] = table
+        else:
+            write_unit(checkpoint, job, "-".join(window), table)
+
+    if jobs <= 1:
+        if todo:
+            _init_worker(df, symbol)
+        for w in todo:
+            record(w, _run_window(w, *args))
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(df, symbol)) as pool:
+            futures = {pool.submit(_run_window, w, *args): w for w in todo}
+            for fut in as_completed(futures):
+                record(futures[fut], fut.result())
+
+    if job is not None:
+        return read_results(checkpoint, job)
+    return pd.concat([tables[w] for w in ranges], ignore_index=True)
+
+
+# =========================
+# Successive halving
+# =========================
+def _rungs(n_days: int, eta: int, min_days: int) -> list[int]:
+    """Trading-day budgets, smallest first, growing by eta up to all of them."""
+    budgets = [n_days]
+    while math.ceil(budgets[0] / eta) >= min_days:
+        budgets.insert(0, math.ceil(budgets[0] / eta))
+    return budgets
+
+
+def _evaluate(configs: pd.DataFrame, day_ids, session_end: str, pool=None) -> pd.DataFrame:
+    """Score only the given configurations, on the given days (one task per range window)."""
+    tasks = []
+    for (rs, re), g in configs.groupby(["range_start", "range_end"], sort=False):
+        tasks.append(
+            ((rs, re), sorted(g["retrace"].unique()), sorted(g["stop_mode"].unique()),
+             sorted(g["target_r"].unique()), session_end, day_ids)
+        )
+
+    if pool is None:
+        tables = [_run_window(*t) for t in tasks]
+    else:
+        tables = list(pool.map(_run_window, *zip(*tasks)))
+
+    # The window tasks cover the cross product; keep the requested configurations
+    return configs[CONFIG].merge(pd.concat(tables, ignore_index=True), on=CONFIG, how="left")
+
+
+def successive_halving(
+    df: pd.DataFrame | None = None,
+    ranges=GRID["ranges"],
+    retraces=GRID["retraces"],
+    stop_modes=GRID["stop_modes"],
+    targets=GRID["targets"],
+    session_end: str = SESSION_END,
+    eta: int = 2,
+    min_days: int = 40,
+    z: float = 1.0,
+    seed: int = 0,
+    jobs: int = 1,
+    symbol: str = SYMBOL,
+) -> pd.DataFrame:
+    """
+    Adaptive search over the same grid as sweep.
+
+    Rung 0 scores every configuration on a random subset of min_days or
+    more trading days (days whose session covers the window,
+    sessions.window_days, the days sweep trades); each later rung uses eta
+    times more (nested subsets) until every trading day of the history.
+    After each rung the configurations are ranked by the upper confidence
+    bound of their expectancy (expectancy + z * se) and the top 1/eta
+    survive: a configuration is dropped only once even its optimistic
+    estimate ranks in the losing part, and configurations with too few
+    trades to judge (infinite se) always survive. A lone survivor goes
+    straight to the last rung, so finalists are always scored on the full
+    history and their rows match sweep().
+
+    Returns one row per configuration with the metrics of the last rung it
+    reached, plus rung and days; rows ranked by rung, then expectancy.
+    """
+    unknown = set(stop_modes) - set(STOP_MODES)
+    if unknown:
+        raise ValueError(f"Unknown stop modes: {sorted(unknown)}")
+    if eta < 2:
+        raise ValueError("eta must be >= 2")
+
+    _init_worker(df, symbol)
+    tradable = np.flatnonzero(window_days(_WORKER["days"]["dates"], session_end))
+    n_days = len(tradable)
+
+    alive = pd.DataFrame(
+        [(rs, re, rt, mode, float(t)) for (rs, re), rt, mode, t in product(ranges, retraces, stop_modes, targets)],
+        columns=CONFIG,
+    )
+    order = tradable[np.random.default_rng(seed).permutation(n_days)]
+
+    pool = None
+    if jobs > 1:
+        pool = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(df, symbol))
+
+    rungs = _rungs(n_days, eta, min_days)
+    rung = 0
+    done = []
+    try:
+        while True:
+            budget = rungs[rung]
+            t0 = time.perf_counter()
+            table = _evaluate(alive, order[:budget], session_end, pool)
+            table["rung"] = rung
+            table["days"] = budget
+            print(f"  rung {rung}: {len(table)} configs on {budget} days in {time.perf_counter() - t0:.2f}s")
+
+            if rung == len(rungs) - 1:
+                done.append(table)
+                break
+
+            ucb = table["expectancy"] + z * table["expectancy_se"]
+            ranked = table.assign(_ucb=ucb).sort_values("_ucb", ascending=False, kind="stable").drop(columns="_ucb")
+            cut = math.ceil(len(ranked) / eta)
+
+            done.append(ranked.iloc[cut:])
+            alive = ranked.iloc[:cut][CONFIG]
+            rung = len(rungs) - 1 if len(alive) == 1 else rung + 1
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    out = pd.concat(done, ignore_index=True)
+    return out.sort_values(["rung", "expectancy"], ascending=False, kind="stable").reset_index(drop=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Grid sweep of the retrace-entry strategy.")
+    parser.add_argument("--ranges", nargs="+", default=None, help="range windows as HH:MM-HH:MM")
+    parser.add_argument("--retraces", nargs="+", type=float, default=GRID["retraces"])
+    parser.add_argument("--stop-modes", nargs="+", default=GRID["stop_modes"], choices=STOP_MODES)
+    parser.add_argument("--targets", nargs="+", type=float, default=GRID["targets"])
+    parser.add_argument("--session-end", default=SESSION_END)
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes (one range window per task)")
+    parser.add_argument("--symbol", default=SYMBOL)
+    parser.add_argument("--out", type=Path, default=OUTFILE)
+    parser.add_argument("--checkpoint", type=Path, default=None, help="resumable results directory (full grid)")
+    parser.add_argument("--halving", action="store_true", help="successive halving instead of the full grid")
+    parser.add_argument("--eta", type=int, default=2, help="halving: keep 1/eta per rung, eta x more days")
+    parser.add_argument("--min-days", type=int, default=40, help="halving: days in the first rung (at least)")
+    parser.add_argument("--z", type=float, default=1.0, help="halving: confidence bound width in standard errors")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    ranges = GRID["ranges"] if args.ranges is None else [tuple(w.split("-")) for w in args.ranges]
+    grid = dict(
+        ranges=ranges,
+        retraces=args.retraces,
+        stop_modes=args.stop_modes,
+        targets=args.targets,
+        session_end=args.session_end,
+        jobs=args.jobs,
+        symbol=args.symbol,
+    )
+
+    t0 = time.perf_counter()
+    if args.halving:
+        table = successive_halving(**grid, eta=args.eta, min_days=args.min_days, z=args.z, seed=args.seed)
+    else:
+        table = sweep(**grid, checkpoint=args.checkpoint)
+    secs = time.perf_counter() - t0
+
+    args.out.parent.mkdir(parents=True, exist_ok=True)
+    table.to_csv(args.out, index=False)
+
+    print(table.sort_values("expectancy", ascending=False).head(20).to_string(index=False))
+    print(f"\n{len(table)} configurations in {secs:.2f}s → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
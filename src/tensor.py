@@ -0,0 +1,88 @@
+import numpy as np
+import pandas as pd
+
+from src.day_index import build_day_index, hhmm_to_minute
+
+SLOT_MINUTES = 5
+N_SLOTS = 24 * 60 // SLOT_MINUTES  # 288
+
+FIELDS = ["open", "high", "low", "close"]
+OPEN, HIGH, LOW, CLOSE = range(4)
+
+
+def slot(hhmm: str) -> int:
+    """NY clock time -> slot number ('09:50' -> 118)."""
+    return hhmm_to_minute(hhmm) // SLOT_MINUTES
+
+
+def build_day_tensor(df: pd.DataFrame, days: dict | None = None) -> dict:
+    """
+    Reshape 5m bars into a dense (n_days, 288, 4) OHLC array aligned to NY
+    clock slots (slot 0 = 00:00, slot 118 = 09:50, ...).
+
+      ohlc    (n_days, 288, 4) float64, NaN where there is no bar
+      valid   (n_days, 288)    bar present in that slot
+      pos     (n_days, 288)    int64 position of the bar in df, -1 if none
+      dates   (n_days,)        datetime.date of each day
+
+    Clock windows become slices on axis 1. On the DST fall-back day the
+    repeated 01:xx hour maps to the same slots; the first bar is kept.
+    """
+    if days is None:
+        days = build_day_index(df.index)
+
+    n_days = len(days["start"])
+    day = days["code"]
+    sl = days["minute"].astype(np.int64) // SLOT_MINUTES
+
+    ohlc = np.full((n_days, N_SLOTS, 4), np.nan)
+    pos = np.full((n_days, N_SLOTS), -1, dtype=np.int64)
+
+    # Reverse order so the first bar wins on duplicate slots
+    rev = np.arange(len(df))[::-1]
+    ohlc[day[rev], sl[rev]] = df[FIELDS].to_numpy(dtype=float)[rev]
+    pos[day[rev], sl[rev]] = rev
+
+    return {
+        "ohlc": ohlc,
+        "valid": pos >= 0,
+        "pos": pos,
+        "dates": days["dates"],
+    }
+
+
+def window_max(t: dict, field: int, start: int, stop: int) -> np.ndarray:
+    """Per-day max of a field over slots [start, stop), NaN if no bars."""
+    x = t["ohlc"][:, start:stop, field]
+    out = np.where(t["valid"][:, start:stop], x, -np.inf).max(axis=1, initial=-np.inf)
+    return np.where(np.isneginf(out), np.nan, out)
+
+
+def window_min(t: dict, field: int, start: int, stop: int) -> np.ndarray:
+    """Per-day min of a field over slots [start, stop), NaN if no bars."""
+    x = t["ohlc"][:, start:stop, field]
+    out = np.where(t["valid"][:, start:stop], x, np.inf).min(axis=1, initial=np.inf)
+    return np.where(np.isposinf(out), np.nan, out)
+
+
+def first_slot(mask: np.ndarray) -> np.ndarray:
+    """First True slot per day (axis 1), -1 where there is none."""
+    return np.where(mask.any(axis=1), mask.argmax(axis=1), -1)
+
+
+def from_slot(first: np.ndarray, n_slots: int = N_SLOTS) -> np.ndarray:
+    """(n_days, n_slots) mask of slots at/after first[d]; all False where first is -1."""
+    s = np.arange(n_slots)[None, :]
+    return (first[:, None] >= 0) & (s >= first[:, None])
+
+
+def post_mask(t: dict, days: dict, pos: np.ndarray, end: str) -> np.ndarray:
+    """
+    (n_days, 288) mask of bars from bar position pos[d] (e.g. a breakout
+    candle from find_breakouts) through clock time end, inclusive.
+    """
+    has = pos >= 0
+    first = np.where(has, days["minute"][np.where(has, pos, 0)] // SLOT_MINUTES, -1)
+    mask = from_slot(first) & t["valid"]
+    mask[:, slot(end) + 1:] = False
+    return mask
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+OHLC = ["open", "high", "low", "close"]
+
+# Minimum price increment per instrument
+TICK_SIZE = {
+    "NQ": 0.25,
+    "MNQ": 0.25,
+    "ES": 0.25,
+    "MES": 0.25,
+    "YM": 1.0,
+    "MYM": 1.0,
+    "RTY": 0.1,
+    "M2K": 0.1,
+}
+
+# Largest distance from the tick grid still treated as float noise
+GRID_TOL = 1e-6
+
+
+def to_ticks(prices, tick_size: float) -> np.ndarray:
+    """
+    Prices -> int32 tick counts (15000.25 at 0.25 -> 60001).
+
+    Raises if a price is NaN, off the tick grid or outside int32 range.
+    """
+    x = np.asarray(prices, dtype=float) / tick_size
+    t = np.rint(x)
+
+    if np.isnan(t).any():
+        raise ValueError("Cannot convert NaN prices to ticks")
+    off = np.abs(x - t) > GRID_TOL
+    if off.any():
+        raise ValueError(f"{int(off.sum())} prices are not multiples of tick size {tick_size}")
+    info = np.iinfo(np.int32)
+    if len(t) and (t.min() < info.min or t.max() > info.max):
+        raise ValueError("Prices out of int32 tick range")
+
+    return t.astype(np.int32)
+
+
+def from_ticks(ticks, tick_size: float) -> np.ndarray:
+    """Tick counts (int or fractional, e.g. a 50% level) -> float prices."""
+    return np.asarray(ticks, dtype=float) * tick_size
+
+
+def tick_frame(df: pd.DataFrame, tick_size: float = TICK_SIZE["NQ"]) -> pd.DataFrame:
+    """
+    Same bars with OHLC as int32 tick counts (half the memory of float64).
+    Other columns (the integer clock columns, volume) pass through unchanged.
+
+    The tick size travels in df.attrs["tick_size"], so kernels that report
+    prices can convert levels back with tick_size_of().
+    """
+    out = pd.DataFrame(
+        {c: to_ticks(df[c].to_numpy(), tick_size) if c in OHLC else df[c].to_numpy() for c in df.columns},
+        index=df.index,
+    )
+    out.attrs["tick_size"] = tick_size
+    return out
+
+
+def tick_size_of(df: pd.DataFrame) -> float | None:
+    """Tick size of a tick_frame, None for float price frames."""
+    return df.attrs.get("tick_size")
+
+
+def price_array(df: pd.DataFrame, col: str) -> np.ndarray:
+    """
+    Column as a numpy array for the OHLC kernels: int32 ticks stay integer
+    (exact compares, no float copy), anything else becomes float64.
+    """
+    s = df[col]
+    if pd.api.types.is_integer_dtype(s.dtype):
+        return s.to_numpy()
+    return s.to_numpy(dtype=float)
@@ -0,0 +1,253 @@
+"""
+Walk-forward (rolling out-of-sample) evaluation of the retrace-entry strategy.
+
+    python src/walk_forward.py --train-days 250 --test-days 60 --jobs 4
+
+    from src.walk_forward import walk_forward
+    wf = walk_forward(train_days=250, test_days=60)
+    wf["folds"], wf["trades"], wf["summary"]
+
+The whole grid (src/sweep.py GRID) is resolved once into a configs x days
+R table (sweep.window_day_results: one batched pass per range window, the
+windows spread over a process pool). Every fold then only slices columns of
+that shared table: score the train days, pick the configuration with the
+best train expectancy, and keep its trades on the following test days. The
+folds are vectorized column slices, so a walk-forward costs about one sweep.
+
+Only the table build runs in the process pool. The folds run serially on
+purpose: each is a few numpy reductions over a slice of the table (a few
+milliseconds), so shipping the table to workers would cost more than it
+saves.
+
+Folds roll by test_days (step) over trading days: the days whose cash
+session covers the window (sessions.window_days), the same days sweep and
+run_strategy trade. Sunday-evening stubs and holidays are not columns of
+the table, so train_days=250 is 250 sessions. anchored=True grows the train
+window from the first day instead of rolling it.
+"""
+import argparse
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from src.breakout import SESSION_END, STOP_MODES
+from src.loader import PROCESSED, SYMBOL
+from src.metrics import METRICS, trade_metrics
+from src.sessions import window_days
+from src.sweep import CONFIG, GRID, _WORKER, _init_worker, window_day_results
+
+FOLDS_FILE = PROCESSED / "walk_forward_folds.csv"
+TRADES_FILE = PROCESSED / "walk_forward_trades.csv"
+
+TRAIN_DAYS = 250
+TEST_DAYS = 60
+MIN_TRADES = 20
+
+
+# =========================
+# Shared day table
+# =========================
+def _run_window_days(window, retraces, stop_modes, targets, session_end):
+    keys, r = window_day_results(_WORKER["df"], _WORKER["days"], *window, retraces, stop_modes, targets, session_end)
+    rows = [(*window, rt, mode, float(t)) for rt, mode in keys for t in targets]
+    return rows, r
+
+
+def day_table(
+    df: pd.DataFrame | None = None,
+    ranges=GRID["ranges"],
+    retraces=GRID["retraces"],
+    stop_modes=GRID["stop_modes"],
+    targets=GRID["targets"],
+    session_end: str = SESSION_END,
+    jobs: int = 1,
+    symbol: str = SYMBOL,
+):
+    """
+    Resolve the grid once. Returns (configs, r, dates):
+      configs  one row per configuration (CONFIG columns)
+      r        (configs, days) R table, NaN where a configuration has no trade
+      dates    trade date of every column
+
+    Columns are trading days only (sessions.window_days).
+    """
+    unknown = set(stop_modes) - set(STOP_MODES)
+    if unknown:
+        raise ValueError(f"Unknown stop modes: {sorted(unknown)}")
+
+    ranges = [tuple(w) for w in ranges]
+    args = (list(retraces), list(stop_modes), list(targets), session_end)
+
+    _init_worker(df, symbol)
+    tradable = window_days(_WORKER["days"]["dates"], session_end)
+    dates = pd.Index(_WORKER["days"]["dates"], name="date")[tradable]
+
+    if jobs <= 1:
+        parts = [_run_window_days(w, *args) for w in ranges]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(df, symbol)) as pool:
+            parts = list(pool.map(_run_window_days, ranges, *[[a] * len(ranges) for a in args]))
+
+    configs = pd.DataFrame([row for rows, _ in parts for row in rows], columns=CONFIG)
+    return configs, np.vstack([r for _, r in parts])[:, tradable], dates
+
+
+# =========================
+# Folds
+# =========================
+def make_folds(n_days: int, train_days: int, test_days: int, step: int | None = None, anchored: bool = False) -> list:
+    """[(train_lo, train_hi, test_lo, test_hi)] trading-day column ranges, half-open."""
+    if train_days < 1 or test_days < 1:
+        raise ValueError("train_days and test_days must be >= 1")
+
+    step = test_days if step is None else step
+    folds = []
+    for test_lo in range(train_days, n_days, step):
+        test_hi = min(test_lo + test_days, n_days)
+        train_lo = 0 if anchored else test_lo - train_days
+        folds.append((train_lo, test_lo, test_lo, test_hi))
+    return folds
+
+
+def walk_forward(
+    df: pd.DataFrame | None = None,
+    train_days: int = TRAIN_DAYS,
+    test_days: int = TEST_DAYS,
+    step: int | None = None,
+    anchored: bool = False,
+    min_trades: int = MIN_TRADES,
+    ranges=GRID["ranges"],
+    retraces=GRID["retraces"],
+    stop_modes=GRID["stop_modes"],
+    targets=GRID["targets"],
+    session_end: str = SESSION_END,
+    jobs: int = 1,
+    symbol: str = SYMBOL,
+    table=None,
+) -> dict:
+    """
+    Rolling train/test evaluation over the grid.
+
+    On every fold the configuration with the highest train expectancy (among
+    those with at least min_trades train trades) is selected and its test-day
+    trades are recorded. table: a day_table result to reuse.
+
+    Returns:
+      folds    one row per fold: day ranges, selected configuration, train
+               and test metrics
+      trades   every out-of-sample trade: fold, date, configuration, result_r
+      summary  out-of-sample metrics of all test trades together, next to
+               the best configuration picked in-sample on the whole history
+    """
+    configs, r, dates = table if table is not None else day_table(
+        df, ranges, retraces, stop_modes, targets, session_end, jobs, symbol
+    )
+
+    fold_rows = []
+    trades = []
+    for i, (a, b, c, d) in enumerate(make_folds(len(dates), train_days, test_days, step, anchored)):
+        train = trade_metrics(r[:, a:b])
+        eligible = train["trades"].to_numpy() >= min_trades
+
+        row = {
+            "fold": i,
+            "train_start": dates[a],
+            "train_end": dates[b - 1],
+            "test_start": dates[c],
+            "test_end": dates[d - 1],
+        }
+        if not eligible.any():
+            fold_rows.append(row)
+            continue
+
+        best = int(np.argmax(np.where(eligible, train["expectancy"].to_numpy(), -np.inf)))
+        test_r = r[best, c:d]
+        test = trade_metrics(test_r)
+
+        row.update(configs.iloc[best].to_dict())
+        row.update({f"train_{k}": v.iloc[best] for k, v in train.items()})
+        row.update({f"test_{k}": v.iloc[0] for k, v in test.items()})
+        fold_rows.append(row)
+
+        hit = ~np.isnan(test_r)
+        trades.append(
+            pd.DataFrame({"fold": i, "date": dates[c:d][hit], **configs.iloc[best].to_dict(), "result_r": test_r[hit]})
+        )
+
+    trades = pd.concat(trades, ignore_index=True) if trades else pd.DataFrame(columns=["fold", "date", *CONFIG, "result_r"])
+
+    # Out-of-sample vs the single best configuration over the whole history
+    # (NaN when no configuration reaches min_trades)
+    full = trade_metrics(r)
+    eligible = full["trades"].to_numpy() >= min_trades
+    in_sample = {"sample": "in_sample_best"}
+    if eligible.any():
+        best = int(np.argmax(np.where(eligible, full["expectancy"].to_numpy(), -np.inf)))
+        in_sample.update({**configs.iloc[best].to_dict(), **{k: v.iloc[best] for k, v in full.items()}})
+
+    oos = trade_metrics(trades["result_r"].to_numpy(dtype=float))
+    summary = pd.DataFrame(
+        [{"sample": "out_of_sample", **{k: v.iloc[0] for k, v in oos.items()}}, in_sample],
+        columns=["sample", *CONFIG, *METRICS],
+    )
+
+    return {"folds": pd.DataFrame(fold_rows), "trades": trades, "summary": summary}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Walk-forward evaluation of the retrace-entry strategy.")
+    parser.add_argument("--train-days", type=int, default=TRAIN_DAYS)
+    parser.add_argument("--test-days", type=int, default=TEST_DAYS)
+    parser.add_argument("--step", type=int, default=None, help="days between folds (default: test days)")
+    parser.add_argument("--anchored", action="store_true", help="expanding train window from the first day")
+    parser.add_argument("--min-trades", type=int, default=MIN_TRADES, help="train trades a configuration needs")
+    parser.add_argument("--ranges", nargs="+", default=None, help="range windows as HH:MM-HH:MM")
+    parser.add_argument("--retraces", nargs="+", type=float, default=GRID["retraces"])
+    parser.add_argument("--stop-modes", nargs="+", default=GRID["stop_modes"], choices=STOP_MODES)
+    parser.add_argument("--targets", nargs="+", type=float, default=GRID["targets"])
+    parser.add_argument("--session-end", default=SESSION_END)
+    parser.add_argument("--jobs", type=int, default=1, help="worker processes (one range window per task)")
+    parser.add_argument("--symbol", default=SYMBOL)
+    args = parser.parse_args(argv)
+
+    ranges = GRID["ranges"] if args.ranges is None else [tuple(w.split("-")) for w in args.ranges]
+
+    t0 = time.perf_counter()
+    wf = walk_forward(
+        train_days=args.train_days,
+        test_days=args.test_days,
+        step=args.step,
+        anchored=args.anchored,
+        min_trades=args.min_trades,
+        ranges=ranges,
+        retraces=args.retraces,
+        stop_modes=args.stop_modes,
+        targets=args.targets,
+        session_end=args.session_end,
+        jobs=args.jobs,
+        symbol=args.symbol,
+    )
+    secs = time.perf_counter() - t0
+
+    FOLDS_FILE.parent.mkdir(parents=True, exist_ok=True)
+    wf["folds"].to_csv(FOLDS_FILE, index=False)
+    wf["trades"].to_csv(TRADES_FILE, index=False)
+
+    cols = ["fold", "test_start", "test_end", *CONFIG, "train_expectancy", "test_trades", "test_expectancy"]
+    print(wf["folds"].reindex(columns=cols).to_string(index=False))
+    print()
+    print(wf["summary"].to_string(index=False))
+    print(f"\n{len(wf['folds'])} folds, {len(wf['trades'])} out-of-sample trades in {secs:.2f}s "
+          f"→ {FOLDS_FILE}, {TRADES_FILE}")
+
+
+if __name__ == "__main__":
+    main()
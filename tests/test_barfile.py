@@ -0,0 +1,53 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.barfile import append_barfile, open_barfile, read_barfile, write_barfile
+
+NY_TZ = "America/New_York"
+COLUMNS = ["open", "high", "low", "close", "minute", "trade_date", "session"]
+
+
+def _bars(start: str, periods: int) -> pd.DataFrame:
+    index = pd.date_range(start, periods=periods, freq="5min", tz=NY_TZ, name="timestamp", unit="ns")
+    close = 100 + np.arange(periods) * 0.25
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close}, index=index)
+
+
+def test_round_trip_and_range(tmp_path):
+    df = _bars("2024-03-04 17:30", 20)
+    write_barfile(df, tmp_path / "x.bars")
+
+    pd.testing.assert_frame_equal(read_barfile(tmp_path / "x.bars"), df, check_freq=False)
+    out = read_barfile(tmp_path / "x.bars", start="2024-03-04 18:00", end="2024-03-04 18:10")
+    assert out.index.tolist() == df.index[6:9].tolist()
+
+
+@pytest.mark.parametrize("capacity", [0, 40])
+def test_append_matches_a_full_write(tmp_path, capacity):
+    df = _bars("2024-03-04 09:30", 30)
+    write_barfile(df.iloc[:10], tmp_path / "x.bars", capacity=capacity)
+    append_barfile(df.iloc[10:25], tmp_path / "x.bars")
+    append_barfile(df.iloc[25:], tmp_path / "x.bars")
+    write_barfile(df, tmp_path / "full.bars")
+
+    assert open_barfile(tmp_path / "x.bars")["n"] == 30
+    pd.testing.assert_frame_equal(
+        read_barfile(tmp_path / "x.bars", columns=COLUMNS),
+        read_barfile(tmp_path / "full.bars", columns=COLUMNS),
+    )
+
+
+def test_append_within_capacity_keeps_the_file_size(tmp_path):
+    df = _bars("2024-03-04 09:30", 30)
+    write_barfile(df.iloc[:10], tmp_path / "x.bars", capacity=40)
+    size = (tmp_path / "x.bars").stat().st_size
+    append_barfile(df.iloc[10:], tmp_path / "x.bars")
+    assert (tmp_path / "x.bars").stat().st_size == size
+
+
+def test_append_must_follow_the_last_bar(tmp_path):
+    df = _bars("2024-03-04 09:30", 10)
+    write_barfile(df, tmp_path / "x.bars", capacity=20)
+    with pytest.raises(ValueError):
+        append_barfile(df.iloc[5:], tmp_path / "x.bars")
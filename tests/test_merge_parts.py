@@ -0,0 +1,90 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import merge_parts
+from src.merge_parts import merge_sorted, precedence_order, update_csv
+
+NY_TZ = "America/New_York"
+
+
+def _part(start: str, periods: int, price: float, volume: int = 1) -> pd.DataFrame:
+    index = pd.date_range(start, periods=periods, freq="5min", tz=NY_TZ, name="timestamp")
+    close = np.full(periods, price)
+    return pd.DataFrame(
+        {"open": close, "high": close + 1, "low": close - 1, "close": close, "volume": volume},
+        index=index,
+    )
+
+
+def test_earlier_part_wins_shared_bars():
+    a = _part("2024-03-04 09:30", 4, 100.0, volume=1)  # 09:30 .. 09:45
+    b = _part("2024-03-04 09:40", 4, 200.0, volume=2)  # 09:40 .. 09:55
+
+    merged, conflicts = merge_sorted([b, a], ["b", "a"])
+
+    assert merged.index.is_monotonic_increasing and merged.index.is_unique
+    assert len(merged) == 6
+    assert merged["close"].tolist() == [100.0, 100.0, 200.0, 200.0, 200.0, 200.0]
+    assert merged["volume"].tolist() == [1, 1, 2, 2, 2, 2]
+
+    assert len(conflicts) == 2
+    assert set(conflicts["kept"]) == {"b"} and set(conflicts["dropped"]) == {"a"}
+    assert conflicts["kept_close"].tolist() == [200.0, 200.0]
+    assert conflicts["dropped_close"].tolist() == [100.0, 100.0]
+
+
+def test_identical_overlap_is_not_a_conflict():
+    a = _part("2024-03-04 09:30", 4, 100.0)
+    merged, conflicts = merge_sorted([a, a.iloc[1:3]], ["a", "copy"])
+    assert len(merged) == 4
+    assert conflicts.empty
+
+
+def test_duplicate_within_a_part_keeps_its_first_row():
+    a = _part("2024-03-04 09:30", 3, 100.0)
+    dup = pd.concat([a.iloc[:2], a.iloc[[1]].assign(close=999.0), a.iloc[2:]])
+    merged, conflicts = merge_sorted([dup], ["dup"])
+    assert merged["close"].tolist() == [100.0, 100.0, 100.0]
+    assert conflicts.empty
+
+
+def test_unsorted_part_raises():
+    a = _part("2024-03-04 09:30", 3, 100.0)
+    with pytest.raises(ValueError):
+        merge_sorted([a.iloc[::-1]], ["a"])
+
+
+@pytest.mark.parametrize("precedence, expected", [("newest", [1, 2, 0]), ("oldest", [0, 2, 1])])
+def test_precedence_order(monkeypatch, precedence, expected):
+    monkeypatch.setattr(merge_parts, "PRECEDENCE", precedence)
+    ends = [pd.Timestamp("2024-01-31"), pd.Timestamp("2024-03-31"), pd.Timestamp("2024-02-29")]
+    assert precedence_order(ends) == expected
+
+
+def test_update_csv_rewrites_only_from_the_first_new_bar(tmp_path):
+    path = tmp_path / "bars.csv"
+    old = _part("2024-03-04 09:30", 6, 100.0)
+    old.to_csv(path)
+
+    new = _part("2024-03-04 09:45", 5, 300.0, volume=3).drop(columns="volume")
+    update_csv(path, new)
+
+    out = pd.read_csv(path, index_col=0)
+    expected = pd.concat([old.iloc[:3], new.assign(volume=np.nan)])
+    assert out.index.tolist() == [str(t) for t in expected.index]
+    assert out["close"].tolist() == expected["close"].tolist()
+    assert out["volume"].iloc[:3].tolist() == [1, 1, 1]
+    assert out["volume"].iloc[3:].isna().all()
+
+
+def test_update_csv_keeps_rows_after_replaced_bars(tmp_path):
+    path = tmp_path / "bars.csv"
+    old = _part("2024-03-04 09:30", 6, 100.0)
+    old.to_csv(path)
+
+    update_csv(path, _part("2024-03-04 09:40", 1, 300.0))
+
+    out = pd.read_csv(path, index_col=0)
+    assert out.index.tolist() == [str(t) for t in old.index]
+    assert out["close"].tolist() == [100.0, 100.0, 300.0, 100.0, 100.0, 100.0]
@@ -0,0 +1,81 @@
+import numpy as np
+
+from src.resolver import resolve_trades
+
+
+def _resolve(high, low, entry=100.0, stop=95.0, target=110.0, direction=1, market=False):
+    return resolve_trades(
+        np.asarray(high, dtype=float),
+        np.asarray(low, dtype=float),
+        start=np.array([0]),
+        end=np.array([len(high)]),
+        direction=np.array([direction]),
+        entry=np.array([entry]),
+        stop=np.array([stop]),
+        targets=np.array([[target]]),
+        market=market,
+    )
+
+
+def test_limit_fills_on_first_bar_through_entry():
+    res = _resolve(high=[103, 102, 111], low=[101, 99, 100])
+    assert res["fill_pos"][0] == 1
+    assert res["outcome"][0, 0] == 1
+    assert res["exit_pos"][0, 0] == 2
+
+
+def test_unfilled_limit_is_not_a_trade():
+    res = _resolve(high=[105, 112], low=[101, 102])
+    assert res["fill_pos"][0] == -1
+    assert res["outcome"][0, 0] == 0
+    assert res["exit_pos"][0, 0] == -1
+
+
+def test_stop_and_target_in_one_bar_counts_as_stop():
+    res = _resolve(high=[101, 111], low=[99, 94])
+    assert res["outcome"][0, 0] == -1
+    assert res["ambiguous"][0, 0]
+    assert res["exit_pos"][0, 0] == 1
+
+
+def test_fill_bar_can_resolve_the_trade():
+    # Fill and stop in the same bar: the stop is live from the fill bar on
+    res = _resolve(high=[101], low=[94])
+    assert res["fill_pos"][0] == 0
+    assert res["outcome"][0, 0] == -1
+
+
+def test_short_side_mirrors_long():
+    res = _resolve(high=[99, 101, 100], low=[95, 97, 89], stop=105, target=90, direction=-1)
+    assert res["fill_pos"][0] == 1
+    assert res["outcome"][0, 0] == 1
+
+
+def test_market_entry_is_live_from_start_without_touching_entry():
+    high, low = [112, 113], [104, 105]
+    assert _resolve(high, low)["fill_pos"][0] == -1
+
+    res = _resolve(high, low, market=True)
+    assert res["fill_pos"][0] == 0
+    assert res["outcome"][0, 0] == 1
+    assert res["exit_pos"][0, 0] == 0
+
+
+def test_market_entry_needs_a_bar_in_its_window():
+    res = resolve_trades(
+        np.array([101.0]), np.array([99.0]),
+        start=np.array([1]), end=np.array([1]), direction=np.array([1]),
+        entry=np.array([100.0]), stop=np.array([95.0]), targets=np.array([[110.0]]),
+        market=True,
+    )
+    assert res["fill_pos"][0] == -1
+
+
+def test_targets_resolve_independently():
+    res = resolve_trades(
+        np.array([101.0, 106.0, 111.0, 100.0]), np.array([99.0, 100.0, 104.0, 94.0]),
+        start=np.array([0]), end=np.array([4]), direction=np.array([1]),
+        entry=np.array([100.0]), stop=np.array([95.0]), targets=np.array([[105.0, 110.0, 120.0]]),
+    )
+    assert res["outcome"][0].tolist() == [1, 1, -1]
+    assert res["exit_pos"][0].tolist() == [1, 2, 3]
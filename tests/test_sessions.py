@@ -0,0 +1,64 @@
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from src.sessions import CLOSED, HALF_DAY, HOLIDAY, REGULAR, assign_sessions, day_kinds, window_days
+
+NY_TZ = "America/New_York"
+
+
+def _day(d: str) -> int:
+    return int(np.datetime64(d, "D").astype(np.int64))
+
+
+def _sessions(*stamps):
+    return assign_sessions(pd.DatetimeIndex([pd.Timestamp(s, tz=NY_TZ) for s in stamps]))
+
+
+def test_holiday_kinds_2024():
+    kinds = day_kinds([date(2024, 7, 3), date(2024, 7, 4), date(2024, 11, 29), date(2024, 12, 25), date(2024, 12, 26)])
+    assert kinds.tolist() == [HALF_DAY, HOLIDAY, HALF_DAY, CLOSED, REGULAR]
+
+
+def test_evening_bars_roll_to_the_next_trade_date():
+    s = _sessions("2024-03-12 17:55", "2024-03-12 18:00", "2024-03-13 09:30")
+    assert s["trade_date"].tolist() == [_day("2024-03-12"), _day("2024-03-13"), _day("2024-03-13")]
+    assert s["date"].tolist() == [_day("2024-03-12"), _day("2024-03-12"), _day("2024-03-13")]
+
+
+def test_sunday_open_belongs_to_monday():
+    s = _sessions("2024-03-10 18:00")
+    assert s["trade_date"][0] == _day("2024-03-11")
+    assert not s["after_close"][0]
+
+
+def test_holiday_session_counts_toward_the_next_trade_date():
+    # Independence Day 2024 (Thursday): Globex trades until 13:00
+    s = _sessions("2024-07-03 18:00", "2024-07-04 10:00", "2024-07-04 13:00", "2024-07-04 18:00")
+    assert s["trade_date"].tolist() == [_day("2024-07-05")] * 4
+    assert s["kind"].tolist() == [HALF_DAY, HOLIDAY, HOLIDAY, HOLIDAY]
+    assert s["after_close"].tolist() == [False, False, True, False]
+
+
+def test_half_day_halts_at_1315():
+    s = _sessions("2024-11-29 13:10", "2024-11-29 13:15")
+    assert s["after_close"].tolist() == [False, True]
+
+
+def test_closed_day_reopen_rolls_past_it():
+    # Christmas 2024 is closed: the Christmas Eve reopen trades for Dec 26
+    s = _sessions("2024-12-24 18:00", "2024-12-25 18:00")
+    assert s["trade_date"].tolist() == [_day("2024-12-26")] * 2
+    assert not s["after_close"].any()
+
+
+def test_dst_change_keeps_the_wall_clock():
+    s = _sessions("2024-03-10 18:00", "2024-11-03 18:00")
+    assert s["trade_date"].tolist() == [_day("2024-03-11"), _day("2024-11-04")]
+
+
+def test_window_days_keeps_half_days_for_a_morning_window():
+    dates = [date(2024, 11, 28), date(2024, 11, 29), date(2024, 12, 2)]
+    assert window_days(dates, "12:00").tolist() == [False, True, True]
+    assert window_days(dates, "15:00").tolist() == [False, False, True]
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.day_index import CLOCK
+from src.store import read_store, store_end, write_store
+
+NY_TZ = "America/New_York"
+OHLC = ["open", "high", "low", "close"]
+
+
+def _bars(start: str, periods: int, price: float = 100.0) -> pd.DataFrame:
+    index = pd.date_range(start, periods=periods, freq="5min", tz=NY_TZ, name="timestamp")
+    close = price + np.arange(periods) * 0.25
+    return pd.DataFrame({"open": close, "high": close + 1, "low": close - 1, "close": close}, index=index)
+
+
+def test_round_trip(tmp_path):
+    df = _bars("2024-02-29 23:00", 48)  # spans two month partitions
+    write_store(df, tmp_path / "store")
+
+    out = read_store(tmp_path / "store")
+    pd.testing.assert_frame_equal(out, df, check_freq=False)
+    assert sorted(p.name for p in (tmp_path / "store").glob("year=2024/*")) == ["month=2", "month=3"]
+    assert store_end(tmp_path / "store") == df.index[-1]
+
+
+def test_read_range_and_clock_columns(tmp_path):
+    df = _bars("2024-03-04 17:50", 6)
+    write_store(df, tmp_path / "store")
+
+    out = read_store(tmp_path / "store", columns=OHLC + CLOCK, start="2024-03-04 18:00", end="2024-03-04 18:05")
+    assert out.index.tolist() == df.index[2:4].tolist()
+    assert out["minute"].tolist() == [18 * 60, 18 * 60 + 5]
+    assert (out["trade_date"] == int(np.datetime64("2024-03-05", "D").astype(np.int64))).all()
+
+
+def test_write_replaces_only_the_months_it_touches(tmp_path):
+    root = tmp_path / "store"
+    write_store(pd.concat([_bars("2024-02-01", 10), _bars("2024-03-01", 10)]), root)
+    write_store(_bars("2024-03-15", 3, price=200.0), root)
+
+    out = read_store(root)
+    assert len(out.loc["2024-02"]) == 10
+    assert out.loc["2024-03"].index.tolist() == _bars("2024-03-15", 3).index.tolist()
+
+
+def test_append_keeps_the_month(tmp_path):
+    root = tmp_path / "store"
+    first, second = _bars("2024-03-01", 10), _bars("2024-03-02", 5)
+    write_store(first, root)
+    write_store(second, root, append=True)
+
+    pd.testing.assert_frame_equal(read_store(root), pd.concat([first, second]), check_freq=False)
+
+
+def test_rejects_naive_index(tmp_path):
+    df = _bars("2024-03-01", 3)
+    with pytest.raises(TypeError):
+        write_store(df.tz_localize(None), tmp_path / "store")
@@ -0,0 +1,39 @@
+import pytest
+
+from src.walk_forward import make_folds
+
+
+def test_rolling_folds_tile_the_test_days():
+    folds = make_folds(10, train_days=4, test_days=3)
+    assert folds == [(0, 4, 4, 7), (3, 7, 7, 10)]
+
+
+def test_last_test_window_is_clipped():
+    folds = make_folds(11, train_days=4, test_days=3)
+    assert folds[-1] == (6, 10, 10, 11)
+
+
+def test_anchored_train_window_starts_at_day_zero():
+    folds = make_folds(10, train_days=4, test_days=3, anchored=True)
+    assert [f[0] for f in folds] == [0, 0]
+    assert [f[1] for f in folds] == [4, 7]
+
+
+def test_step_sets_the_fold_spacing():
+    folds = make_folds(10, train_days=4, test_days=3, step=1)
+    assert [f[2] for f in folds] == [4, 5, 6, 7, 8, 9]
+    assert folds[-1] == (5, 9, 9, 10)
+
+
+def test_train_window_never_overlaps_its_test_days():
+    for a, b, c, d in make_folds(100, train_days=30, test_days=7, step=5):
+        assert b - a == 30 and b == c and c < d <= 100
+
+
+def test_no_fold_without_test_days():
+    assert make_folds(4, train_days=4, test_days=3) == []
+
+
+def test_rejects_empty_windows():
+    with pytest.raises(ValueError):
+        make_folds(10, train_days=0, test_days=3)